@@ -0,0 +1,43 @@
+import timeit
+import numpy as np
+
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.model.plant import DoublePendulumPlant
+
+# model parameters
+mpar = model_parameters()
+plant = DoublePendulumPlant(model_pars=mpar)
+
+x = np.array([0.5, -0.3, 1.2, -2.1])
+u = np.array([0.1, 0.4])
+
+n_calls = 20000
+n_batch = 1000
+
+
+# reference: matrix based forward dynamics with np.linalg.inv
+def forward_dynamics_matrix(x, tau):
+    M = plant.mass_matrix(x)
+    C = plant.coriolis_matrix(x)
+    G = plant.gravity_vector(x)
+    F = plant.coulomb_vector(x)
+    Minv = np.linalg.inv(M)
+    force = G + plant.B.dot(tau) - C.dot(x[2:])
+    return Minv.dot(force - F)
+
+
+err = np.max(np.abs(plant.forward_dynamics(x, u) - forward_dynamics_matrix(x, u)))
+print(f"max deviation from matrix formulation: {err:.2e}")
+
+t_matrix = timeit.timeit(lambda: forward_dynamics_matrix(x, u), number=n_calls)
+t_closed = timeit.timeit(lambda: plant.forward_dynamics(x, u), number=n_calls)
+print(f"matrix formulation:      {1e6*t_matrix/n_calls:8.2f} us/call")
+print(f"closed form:             {1e6*t_closed/n_calls:8.2f} us/call")
+print(f"speedup:                 {t_matrix/t_closed:8.2f}x")
+
+# batched evaluation
+X = np.random.uniform(-np.pi, np.pi, (n_batch, 4))
+U = np.random.uniform(-1.0, 1.0, (n_batch, 2))
+n_rep = 200
+t_batch = timeit.timeit(lambda: plant.forward_dynamics(X, U), number=n_rep)
+print(f"closed form, batch of {n_batch}: {1e6*t_batch/(n_rep*n_batch):8.2f} us/state")
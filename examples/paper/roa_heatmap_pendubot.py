@@ -4,7 +4,7 @@ import multiprocessing
 import time
 import numpy as np
 
-from double_pendulum.controller.lqr.roa.coopt_interface import caprr_coopt_interface
+from double_pendulum.controller.lqr.roa.roa_grid_map import roa_grid_map
 
 robot = "pendubot"
 
@@ -12,9 +12,12 @@ backend = "sos_con" # or "najafi"
 
 filename = "heatmap_l1l2_"+robot+".pickle"
 
-N_PROC = int(min(multiprocessing.cpu_count() - 1, 50))
+N_PROC = int(max(min(multiprocessing.cpu_count() - 1, 50), 1))
 evals = 100000
 n = 50
+# adaptive refinement: the volumes are computed on a grid with spacing
+# 2**refine_levels first and then only refined where they change strongly
+refine_levels = 2
 
 pars = np.loadtxt("../../results/design_optimization/acrobot/lqr/roa_designopt/model_par.csv")
 
@@ -31,6 +34,8 @@ save_dir = os.path.join("../../results", "design_optimization", robot, "lqr", "h
 if not os.path.exists(save_dir):
     os.makedirs(save_dir)
 save_file = os.path.join(save_dir, filename)
+# intermediate results, an interrupted computation is resumed from this file
+grid_file = os.path.join(save_dir, "heatmap_l1l2_"+robot+"_grid.npy")
 
 if robot == "pendubot":
     tau_max = [torque_limit, 0.0]
@@ -47,63 +52,27 @@ design_params = {
     "tau_max": tau_max,
 }
 
-caprr_roaEst = caprr_coopt_interface(
-    design_params, Q_init, R_init, backend=backend,
-    najafi_evals=evals, estimate_clbk=None, robot=robot)
-
-
-def roa(roa_interface, m2, l1, l2, idx1, idx2, array_size, array):
-    vol = roa_interface.design_opt_obj([m2, l1, l2])
-    array[idx1*array_size[1]+idx2] = vol
-
 
 l1Vals = np.linspace(0.1, 0.4, n)
 l2Vals = np.linspace(0.1, 0.4, n)
 
-comp_list = []
-for idx1, l1 in enumerate(l1Vals):
-    for idx2, l2 in enumerate(l2Vals):
-        comp_list.append([l1, l2, idx1, idx2])
-
-comp_list2 = []
-cc = []
-for i, c in enumerate(comp_list):
-    if i > 0 and i % N_PROC == 0:
-        comp_list2.append(cc)
-        cc = []
-    cc.append(c)
-if len(cc) > 0:
-    comp_list2.append(cc)
-
-i = 0
 init = time.time()
-vol_array = multiprocessing.Array('d', [0]*len(l1Vals)*len(l2Vals))
-for c in comp_list2:
-    manager = multiprocessing.Manager()
-    jobs = []
-    for cc in c:
-        p = multiprocessing.Process(target=roa, args=(caprr_roaEst,
-                                                      m2,
-                                                      cc[0],
-                                                      cc[1],
-                                                      cc[2],
-                                                      cc[3],
-                                                      [len(l1Vals), len(l2Vals)],
-                                                      vol_array))
-        jobs.append(p)
-        p.start()
-    for proc in jobs:
-        proc.join()
-        i = i+1
-        #print(f"{i} jobs done...")
+vols, computed = roa_grid_map({"l1": l1Vals, "l2": l2Vals},
+                              design_params, Q_init, R_init,
+                              backend=backend,
+                              najafi_evals=evals,
+                              robot=robot,
+                              n_workers=N_PROC,
+                              save_file=grid_file,
+                              refine_levels=refine_levels,
+                              verbose=True)
 end = time.time()
 
-prob_vols = np.zeros((len(l1Vals), len(l2Vals)))
-for idx1, q1 in enumerate(l1Vals):
-    for idx2, q2 in enumerate(l2Vals):
-        prob_vols[idx1][idx2] = vol_array[idx1*len(l2Vals)+idx2]
+# negative volumes as returned by caprr_coopt_interface.design_opt_obj
+prob_vols = -vols
 
 results = {"prob_vols": prob_vols,
+           "computed": computed,
            "yticks": l1Vals,
            "xticks": l2Vals,
            "backend": backend,
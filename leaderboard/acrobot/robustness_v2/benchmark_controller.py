@@ -1,6 +1,7 @@
 import os
 import argparse
 import importlib
+from functools import partial
 import numpy as np
 import yaml
 
@@ -26,7 +27,13 @@ from sim_parameters import (
 )
 
 
-def benchmark_controller(controller, save_dir, controller_name=""):
+def load_controller(module_name):
+    return importlib.import_module(module_name).controller
+
+
+def benchmark_controller(
+    controller, save_dir, controller_name="", n_workers=1, controller_factory=None
+):
     if not os.path.exists(save_dir):
         os.makedirs(save_dir)
 
@@ -117,6 +124,11 @@ def benchmark_controller(controller, save_dir, controller_name=""):
     )
     ben.set_model_parameter(model_pars=mpar)
     ben.set_cost_par(Q=Q, R=R, Qf=Qf)
+    ben.set_parallel_execution(
+        n_workers=n_workers, controller_factory=controller_factory
+    )
+    # unfinished benchmarks are resumed from the checkpoint
+    ben.set_checkpointing(os.path.join(save_dir, "checkpoint"))
     ben.compute_ref_cost()
     res = ben.benchmark(
         compute_model_robustness=True,
@@ -166,7 +178,15 @@ def benchmark_controller(controller, save_dir, controller_name=""):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("controller", help="name of the controller to simulate")
+    parser.add_argument(
+        "--n-workers",
+        dest="n_workers",
+        help="Number of worker processes for the simulations.",
+        default=1,
+        type=int,
+    )
     controller_arg = parser.parse_args().controller
+    n_workers = parser.parse_args().n_workers
     if controller_arg[-3:] == ".py":
         controller_arg = controller_arg[:-3]
 
@@ -178,4 +198,9 @@ if __name__ == "__main__":
     imp = importlib.import_module(controller_arg)
     controller = imp.controller
 
-    benchmark_controller(controller, save_dir)
+    benchmark_controller(
+        controller,
+        save_dir,
+        n_workers=n_workers,
+        controller_factory=partial(load_controller, controller_arg),
+    )
@@ -7,109 +7,135 @@ from double_pendulum.analysis.leaderboard import leaderboard_scores
 from exp_parameters import mpar
 
 
-parser = argparse.ArgumentParser()
-parser.add_argument(
-    "--data-dir",
-    dest="data_dir",
-    help="Directory for loading data. Existing data will be kept.",
-    default="src_data",
-    required=False,
-)
-parser.add_argument(
-    "--save_to",
-    dest="save_to",
-    help="Path for saving the leaderbaord csv file.",
-    default="leaderboard.csv",
-    required=False,
-)
-parser.add_argument(
-    "--force-recompute",
-    dest="recompute",
-    help="Whether to force the recomputation of the leaderboard even without new data.",
-    default=False,
-    required=False,
-    type=int,
-)
-parser.add_argument(
-    "--link-base",
-    dest="link",
-    help="base-link for hosting data. Not needed for local execution",
-    default="",
-    required=False,
-)
-
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--data-dir",
+        dest="data_dir",
+        help="Directory for loading data. Existing data will be kept.",
+        default="src_data",
+        required=False,
+    )
+    parser.add_argument(
+        "--save_to",
+        dest="save_to",
+        help="Path for saving the leaderbaord csv file.",
+        default="leaderboard.csv",
+        required=False,
+    )
+    parser.add_argument(
+        "--force-recompute",
+        dest="recompute",
+        help="Whether to force the recomputation of the leaderboard even without new data.",
+        default=False,
+        required=False,
+        type=int,
+    )
+    parser.add_argument(
+        "--no-score-cache",
+        dest="no_score_cache",
+        help="Whether to rescore all trajectories without using the score cache.",
+        default=False,
+        required=False,
+        type=int,
+    )
+    parser.add_argument(
+        "--n-workers",
+        dest="n_workers",
+        help="Number of worker processes for scoring the experiments.",
+        default=1,
+        required=False,
+        type=int,
+    )
+    parser.add_argument(
+        "--link-base",
+        dest="link",
+        help="base-link for hosting data. Not needed for local execution",
+        default="",
+        required=False,
+    )
 
-data_dir = parser.parse_args().data_dir
-save_to = parser.parse_args().save_to
-recompute_leaderboard = bool(parser.parse_args().recompute)
-link_base = parser.parse_args().link
+    data_dir = parser.parse_args().data_dir
+    save_to = parser.parse_args().save_to
+    recompute_leaderboard = bool(parser.parse_args().recompute)
+    use_score_cache = not bool(parser.parse_args().no_score_cache)
+    link_base = parser.parse_args().link
+    n_workers = parser.parse_args().n_workers
+    score_cache_dir = os.path.join(os.path.dirname(save_to), "score_cache")
 
-if not os.path.exists(save_to):
-    recompute_leaderboard = True
+    if not os.path.exists(save_to):
+        recompute_leaderboard = True
 
-if not os.path.exists(data_dir):
-    os.makedirs(data_dir)
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
 
-existing_list = os.listdir(data_dir)
-for con in existing_list:
-    if not os.path.exists(os.path.join(data_dir, con, "data_paths.csv")):
-        existing_list.remove(con)
+    existing_list = os.listdir(data_dir)
+    for con in existing_list:
+        if not os.path.exists(os.path.join(data_dir, con, "data_paths.csv")):
+            existing_list.remove(con)
 
-if recompute_leaderboard:
-    src_dir = "."
-    data_paths = {}
+    if recompute_leaderboard:
+        src_dir = "."
+        data_paths = {}
 
-    for con_dir in os.listdir(data_dir):
-        if os.path.isdir(os.path.join(data_dir, con_dir)):
-            paths = []
-            for exp_dir in os.listdir(os.path.join(data_dir, con_dir)):
-                if exp_dir[:10] == "experiment":
-                    paths.append(
-                        os.path.join(data_dir, con_dir, exp_dir, "trajectory.csv")
-                    )
-            with open(os.path.join(data_dir, con_dir, "name.txt"), "r") as file:
-                name = file.read().replace("\n", "")
-            with open(os.path.join(data_dir, con_dir, "username.txt"), "r") as file:
-                username = file.read().replace("\n", "")
-            with open(
-                os.path.join(data_dir, con_dir, "short_description.txt"), "r"
-            ) as file:
-                short_description = file.read().replace("\n", "")
-            data_paths[name] = {}
-            data_paths[name]["csv_path"] = paths
-            data_paths[name]["name"] = name
-            data_paths[name]["username"] = username
-            data_paths[name]["short_description"] = short_description
+        for con_dir in os.listdir(data_dir):
+            if os.path.isdir(os.path.join(data_dir, con_dir)):
+                paths = []
+                for exp_dir in os.listdir(os.path.join(data_dir, con_dir)):
+                    if exp_dir[:10] == "experiment":
+                        paths.append(
+                            os.path.join(data_dir, con_dir, exp_dir, "trajectory.csv")
+                        )
+                with open(os.path.join(data_dir, con_dir, "name.txt"), "r") as file:
+                    name = file.read().replace("\n", "")
+                with open(os.path.join(data_dir, con_dir, "username.txt"), "r") as file:
+                    username = file.read().replace("\n", "")
+                with open(
+                    os.path.join(data_dir, con_dir, "short_description.txt"), "r"
+                ) as file:
+                    short_description = file.read().replace("\n", "")
+                data_paths[name] = {}
+                data_paths[name]["csv_path"] = paths
+                data_paths[name]["name"] = name
+                data_paths[name]["username"] = username
+                data_paths[name]["short_description"] = short_description
 
-    leaderboard_scores(
-        data_paths=data_paths,
-        save_to=save_to,
-        mpar=mpar,
-        weights={
-            "swingup_time": 0.2,
-            "max_tau": 0.1,
-            "energy": 0.1,
-            "integ_tau": 0.1,
-            "tau_cost": 0.1,
-            "tau_smoothness": 0.2,
-            "velocity_cost": 0.2,
-        },
-        normalize={
-            "swingup_time": 10.0,
-            "max_tau": 6.0,
-            "energy": 100.0,
-            "integ_tau": 60.0,
-            "tau_cost": 360.0,
-            "tau_smoothness": 12.0,
-            "velocity_cost": 1000,
-        },
-        link_base=link_base,
-        simulation=False,
-    )
-    df = pandas.read_csv(save_to)
-    df = df.drop(df.columns[1], axis=1)
-    print(
-        df.sort_values(by=["Average RealAI Score"], ascending=False).to_markdown(
-            index=False
+        leaderboard_scores(
+            data_paths=data_paths,
+            save_to=save_to,
+            mpar=mpar,
+            weights={
+                "swingup_time": 0.2,
+                "max_tau": 0.1,
+                "energy": 0.1,
+                "integ_tau": 0.1,
+                "tau_cost": 0.1,
+                "tau_smoothness": 0.2,
+                "velocity_cost": 0.2,
+            },
+            normalize={
+                "swingup_time": 10.0,
+                "max_tau": 6.0,
+                "energy": 100.0,
+                "integ_tau": 60.0,
+                "tau_cost": 360.0,
+                "tau_smoothness": 12.0,
+                "velocity_cost": 1000,
+            },
+            link_base=link_base,
+            n_workers=n_workers,
+            cache_dir=score_cache_dir if use_score_cache else None,
+            chunksize=100000,
+            simulation=False,
         )
-    )
+        df = pandas.read_csv(save_to)
+        df = df.drop(df.columns[1], axis=1)
+        print(
+            df.sort_values(by=["Average RealAI Score"], ascending=False).to_markdown(
+                index=False
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
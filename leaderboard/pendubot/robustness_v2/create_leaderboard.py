@@ -1,12 +1,13 @@
 import os
 import importlib
 import argparse
+from functools import partial
 import pandas
 import numpy as np
 
 from double_pendulum.analysis.benchmark_scores import get_scores
 
-from benchmark_controller import benchmark_controller
+from benchmark_controller import benchmark_controller, load_controller
 
 
 parser = argparse.ArgumentParser()
@@ -39,11 +40,20 @@ parser.add_argument(
     default="",
     required=False,
 )
+parser.add_argument(
+    "--n-workers",
+    dest="n_workers",
+    help="Number of worker processes for the benchmark simulations.",
+    default=1,
+    required=False,
+    type=int,
+)
 
 data_dir = parser.parse_args().data_dir
 save_to = parser.parse_args().save_to
 recompute_leaderboard = bool(parser.parse_args().recompute)
 link_base = parser.parse_args().link
+n_workers = parser.parse_args().n_workers
 
 if not os.path.exists(save_to):
     recompute_leaderboard = True
@@ -72,7 +82,12 @@ for file in os.listdir("."):
             if not os.path.exists(save_dir):
                 os.makedirs(save_dir)
 
-            benchmark_controller(controller, save_dir)
+            benchmark_controller(
+                controller,
+                save_dir,
+                n_workers=n_workers,
+                controller_factory=partial(load_controller, controller_arg),
+            )
 
             recompute_leaderboard = True
 
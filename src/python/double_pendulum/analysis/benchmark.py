@@ -1,15 +1,67 @@
 import os
+import copy
+import time
+import zlib
 import pickle
 import yaml
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
 from double_pendulum.model.plant import DoublePendulumPlant
 from double_pendulum.utils.wrap_angles import wrap_angles_top
 from double_pendulum.simulation.simulation import Simulator
 from double_pendulum.simulation.perturbations import get_random_gauss_perturbation_array
+from double_pendulum.simulation.termination import VelocityLimit, GoalDwell
 from double_pendulum.utils.csv_trajectory import load_trajectory
 from double_pendulum.utils.lists import obj_to_list
+from double_pendulum.utils.cache import hash_key
+
+# benchmarker of a worker process (see benchmarker.run_jobs)
+_worker_benchmarker = None
+
+
+def _init_worker(ben, controller_factory):
+    global _worker_benchmarker
+    if controller_factory is not None:
+        ben.controller = controller_factory()
+    _worker_benchmarker = ben
+
+
+def _run_worker_job(job):
+    return _worker_benchmarker.simulate_job(job)
+
+
+def _to_builtin(obj):
+    # full precision, non-summarized representation for hashing
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(o) for o in obj]
+    if isinstance(obj, dict):
+        return {k: _to_builtin(v) for k, v in obj.items()}
+    return obj
+
+
+def _print_progress(counter, n_jobs, elapsed, width=30):
+    n_done = int(width * counter / max(n_jobs, 1))
+    bar = "#" * n_done + "-" * (width - n_done)
+    print("\r", end="")
+    print(f"  [{bar}] {counter}/{n_jobs} ({elapsed:.1f}s)", end="", flush=True)
+
+
+def _print_timing_report(jobs, results, wall_time):
+    times = {}
+    for job, res in zip(jobs, results):
+        times.setdefault(job["id"][0], []).append(res["time"])
+    print(f"  {'criterion':<30} {'jobs':>6} {'total [s]':>10} {'mean [s]':>9} {'max [s]':>9}")
+    for criterion, t in times.items():
+        print(
+            f"  {criterion:<30} {len(t):>6} {np.sum(t):>10.2f} {np.mean(t):>9.3f} {np.max(t):>9.3f}"
+        )
+    print(f"  wall time: {wall_time:.2f}s")
 
 
 class benchmarker:
@@ -63,6 +115,14 @@ class benchmarker:
         self.ref_cost_free = None
         self.ref_cost_tf = None
 
+        self.n_workers = 1
+        self.controller_factory = None
+        self.seed = None
+        self.checkpoint_dir = None
+
+        self.max_velocity = None
+        self.goal_dwell_time = None
+
     def set_model_parameter(
         self,
         mass=[0.608, 0.630],
@@ -125,25 +185,47 @@ class benchmarker:
         self.Qf = Qf
 
     def compute_cost(self, x_traj, u_traj, mode="free"):
-        len_traj = len(x_traj)
+        """
+        Quadratic cost of a trajectory or of a stack of trajectories.
+
+        Parameters
+        ----------
+        x_traj : array_like
+            shape=(..., N, 4), state trajectory/trajectories
+        u_traj : array_like
+            shape=(..., M, 2), control trajectory/trajectories
+        mode : string
+            "free" for the cost relative to the goal state,
+            "trajectory_following" for the cost relative to the reference
+            trajectory
+            (Default value="free")
+
+        Returns
+        -------
+        float or numpy_array
+            cost, shape=(...)
+        """
+        x_traj = np.asarray(x_traj)
+        u_traj = np.asarray(u_traj)
+        len_traj = x_traj.shape[-2]
 
         if mode == "free":
-            X = x_traj[:-1] - self.goal
+            X = x_traj[..., :-1, :] - self.goal
             U = u_traj
-            xf = x_traj[-1] - self.goal
+            xf = x_traj[..., -1, :] - self.goal
         elif mode == "trajectory_following":
-            n = min([len(x_traj), len(self.x_traj)])
-            X = x_traj[:n] - self.x_traj[:n]
-            nu = min([len(u_traj), len(self.u_traj)])
-            U = u_traj[:nu] - self.u_traj[:nu]
-            xf = x_traj[-1] - self.x_traj[-1]
+            n = min([len_traj, len(self.x_traj)])
+            X = x_traj[..., :n, :] - self.x_traj[:n]
+            nu = min([u_traj.shape[-2], len(self.u_traj)])
+            U = u_traj[..., :nu, :] - self.u_traj[:nu]
+            xf = x_traj[..., -1, :] - self.x_traj[-1]
 
-        X_cost = np.einsum("jl, jk, lk", X.T, self.Q, X) / (len_traj - 1)
-        U_cost = np.einsum("jl, jk, lk", U.T, self.R, U) / (len_traj - 1)
-        Xf_cost = np.einsum("i, ij, j", xf, self.Qf, xf)
+        X_cost = np.einsum("...ni, ij, ...nj -> ...", X, self.Q, X)
+        U_cost = np.einsum("...ni, ij, ...nj -> ...", U, self.R, U)
+        Xf_cost = np.einsum("...i, ij, ...j -> ...", xf, self.Qf, xf)
 
-        cost = X_cost + U_cost + Xf_cost
-        return cost
+        cost = (X_cost + U_cost) / (len_traj - 1) + Xf_cost
+        return cost[()]
 
     def compute_ref_cost(self):
         if self.traj_following:
@@ -154,53 +236,110 @@ class benchmarker:
                 self.x_traj, self.u_traj, mode="trajectory_following"
             )
 
-    def check_goal_success(self, x_traj):
+    def goal_success_mask(self, x_traj):
+        """
+        Mask of the states which reach the goal, according to the goal
+        check method (epsilon environment around the goal or end effector
+        height).
+
+        Parameters
+        ----------
+        x_traj : array_like
+            shape=(..., N, 4), state trajectory/trajectories
+
+        Returns
+        -------
+        numpy_array
+            shape=(..., N), dtype=bool
+        """
+        x_traj = np.asarray(x_traj)
         if self.goal_check_method == "epsilon":
-            if self.check_only_final_state:
-                lp = wrap_angles_top(x_traj[-1])
-                pos1_succ = np.abs(lp[0] - self.goal[0]) < self.epsilon[0]
-                pos2_succ = np.abs(lp[1] - self.goal[1]) < self.epsilon[1]
-                vel1_succ = np.abs(lp[2] - self.goal[2]) < self.epsilon[2]
-                vel2_succ = np.abs(lp[3] - self.goal[3]) < self.epsilon[3]
-                succ = pos1_succ and pos2_succ and vel1_succ and vel2_succ
-            else:
-                succ = False
-                for x in x_traj:
-                    lp = wrap_angles_top(x)
-                    pos1_succ = np.abs(lp[0] - self.goal[0]) < self.epsilon[0]
-                    pos2_succ = np.abs(lp[1] - self.goal[1]) < self.epsilon[1]
-                    vel1_succ = np.abs(lp[2] - self.goal[2]) < self.epsilon[2]
-                    vel2_succ = np.abs(lp[3] - self.goal[3]) < self.epsilon[3]
-                    succ = pos1_succ and pos2_succ and vel1_succ and vel2_succ
-                    if succ:
-                        break
+            lp = wrap_angles_top(x_traj)
+            close = np.abs(lp - self.goal) < self.epsilon
+            return np.all(close, axis=-1)
         elif self.goal_check_method == "height":
-            fk = self.plant.forward_kinematics(x_traj.T[:2])
+            fk = self.plant.forward_kinematics([x_traj[..., 0], x_traj[..., 1]])
             ee_pos_y = fk[1][1]
 
             goal_height = self.goal_check_method_height * (
                 self.length[0] + self.length[1]
             )
+            return ee_pos_y > goal_height
 
-            up = np.where(ee_pos_y > goal_height, True, False)
+    def check_goal_success(self, x_traj, mask=None):
+        """
+        Whether a trajectory or the trajectories of a stack reach the goal.
 
+        Parameters
+        ----------
+        x_traj : array_like
+            shape=(..., N, 4), state trajectory/trajectories
+        mask : numpy_array
+            shape=(..., N), precomputed goal_success_mask of x_traj
+            (Default value=None)
+
+        Returns
+        -------
+        bool or numpy_array
+            shape=(...)
+        """
+        if mask is None:
+            mask = self.goal_success_mask(x_traj)
+        if self.goal_check_method == "epsilon":
             if self.check_only_final_state:
-                succ = True in up
+                succ = mask[..., -1]
             else:
-                succ = up[-1]
+                succ = np.any(mask, axis=-1)
+        elif self.goal_check_method == "height":
+            if self.check_only_final_state:
+                succ = np.any(mask, axis=-1)
+            else:
+                succ = mask[..., -1]
+        return succ[()]
 
-        return succ
+    def evaluate_trajectories(self, x_traj, u_traj):
+        """
+        Evaluate a trajectory or a stack of trajectories (e.g. batched
+        rollouts) in one pass.
 
-    def compute_success_measure(self, x_traj, u_traj):
+        Parameters
+        ----------
+        x_traj : array_like
+            shape=(..., N, 4), state trajectory/trajectories
+        u_traj : array_like
+            shape=(..., M, 2), control trajectory/trajectories
+
+        Returns
+        -------
+        dict
+            "success_mask": shape=(..., N), states which reach the goal
+            "first_success": shape=(...), index of the first state which
+            reaches the goal, -1 if there is none
+            "success": shape=(...), goal success (see check_goal_success)
+            "cost_free": shape=(...), free cost
+            "cost_tf": shape=(...), trajectory following cost
+            (0 if there is no reference trajectory)
+        """
         X = np.asarray(x_traj)
         U = np.asarray(u_traj)
+        mask = self.goal_success_mask(X)
+        first = np.where(np.any(mask, axis=-1), np.argmax(mask, axis=-1), -1)
         cost_free = self.compute_cost(X, U, mode="free")
         if self.traj_following:
             cost_tf = self.compute_cost(X, U, mode="trajectory_following")
         else:
-            cost_tf = 0.0
-        succ = self.check_goal_success(X)
-        return cost_free, cost_tf, succ
+            cost_tf = np.zeros(np.shape(cost_free))[()]
+        return {
+            "success_mask": mask,
+            "first_success": first[()],
+            "success": self.check_goal_success(X, mask=mask),
+            "cost_free": cost_free,
+            "cost_tf": cost_tf,
+        }
+
+    def compute_success_measure(self, x_traj, u_traj):
+        ev = self.evaluate_trajectories(x_traj, u_traj)
+        return ev["cost_free"], ev["cost_tf"], ev["success"]
 
     def simulate_and_get_cost(
         self,
@@ -243,7 +382,383 @@ class benchmarker:
         cost_free, cost_tf, succ = self.compute_success_measure(X, U)
         return cost_free, cost_tf, succ
 
-    def check_modelpar_robustness(
+    def set_parallel_execution(self, n_workers=1, controller_factory=None, seed=None):
+        """
+        Set the execution parameters of the robustness sweeps.
+        All simulations of a sweep are independent jobs. With n_workers > 1
+        the jobs are distributed to a process pool.
+
+        Parameters
+        ----------
+        n_workers : int
+            number of worker processes, 1 runs all jobs in this process
+            (Default value = 1)
+        controller_factory : callable
+            picklable function without arguments which returns a new
+            controller, e.g. functools.partial(make_controller, pars).
+            Every worker process creates its own controller with this
+            function. If None, the benchmarker's controller is copied to the
+            workers (requires a picklable controller when processes are not
+            forked).
+            (Default value = None)
+        seed : int
+            base seed of the random number generators. Every job is seeded
+            with a seed derived from this base seed and the job id, from
+            which independent generators for the simulator noise and the
+            perturbations are spawned. I.e. the results do not depend on the
+            number of workers or the order of execution. If None, the base
+            seed is drawn from the global numpy random state.
+            (Default value = None)
+        """
+        self.n_workers = n_workers
+        self.controller_factory = controller_factory
+        self.seed = seed
+
+    def set_early_termination(self, max_velocity=None, goal_dwell_time=None):
+        """
+        Stop the simulations as soon as their outcome is decided.
+        Costs are computed on the simulated part of the trajectory only and
+        the success is checked with the shortened trajectory, i.e. the
+        results can deviate from the results of full simulations.
+        By default, early termination is disabled.
+
+        Parameters
+        ----------
+        max_velocity : float
+            stop (failure) if a joint velocity exceeds this limit,
+            units=[rad/s], None disables this check
+            (Default value = None)
+        goal_dwell_time : float
+            stop (success) if the state stayed within epsilon around the goal
+            for this time, units=[s], None disables this check.
+            Only used with goal_check_method="epsilon".
+            (Default value = None)
+        """
+        self.max_velocity = max_velocity
+        self.goal_dwell_time = goal_dwell_time
+
+    def get_termination_predicates(self):
+        """
+        Termination predicates of the simulations
+        (see set_early_termination).
+
+        Returns
+        -------
+        list of TerminationPredicate objects
+            None if early termination is disabled
+        """
+        termination = []
+        if self.max_velocity is not None:
+            termination.append(VelocityLimit(self.max_velocity))
+        if self.goal_dwell_time is not None and self.goal_check_method == "epsilon":
+            termination.append(
+                GoalDwell(self.goal, self.epsilon, dwell_time=self.goal_dwell_time)
+            )
+        if len(termination) == 0:
+            return None
+        return termination
+
+    def set_checkpointing(self, checkpoint_dir=None):
+        """
+        Store the result of every finished simulation job in checkpoint_dir.
+        When the benchmark is run again with the same configuration, finished
+        jobs are loaded from the checkpoint and only the missing jobs are
+        simulated.
+        A job is identified by its criterion, parameter values, repetition,
+        seed and the benchmark configuration (model parameters, x0, dt,
+        t_final, goal, success and cost parameters). The controller is not
+        part of the key, i.e. use one checkpoint_dir per controller.
+
+        If no seed is set (set_parallel_execution), the base seed is stored
+        in the checkpoint_dir as well.
+
+        Parameters
+        ----------
+        checkpoint_dir : string or path object
+            directory for the checkpoint files,
+            None disables checkpointing
+            (Default value = None)
+        """
+        self.checkpoint_dir = checkpoint_dir
+        if checkpoint_dir is not None:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def _config_key(self):
+        return hash_key(
+            _to_builtin(self._plant_parameters()),
+            _to_builtin(self.x0),
+            self.dt,
+            self.t_final,
+            _to_builtin(self.goal),
+            _to_builtin(self.epsilon),
+            self.check_only_final_state,
+            self.goal_check_method,
+            self.goal_check_method_height,
+            self.integrator,
+            _to_builtin(self.Q),
+            _to_builtin(self.R),
+            _to_builtin(self.Qf),
+            self.traj_following,
+            _to_builtin(self.t_traj),
+            _to_builtin(self.x_traj),
+            _to_builtin(self.u_traj),
+            self.max_velocity,
+            self.goal_dwell_time,
+        )
+
+    def _job_key(self, job, config_key):
+        return hash_key(
+            config_key,
+            _to_builtin(job["id"]),
+            _to_builtin(job["plant"]),
+            _to_builtin(job["meas"]),
+            _to_builtin(job["motor"]),
+            _to_builtin(job["perturbation"]),
+            job["seed"],
+        )
+
+    def _checkpoint_seed(self):
+        path = os.path.join(self.checkpoint_dir, "benchmark_checkpoint.yml")
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                return yaml.safe_load(f)["seed"]
+        seed = int(np.random.randint(0, 2**31 - 1))
+        with open(path, "w") as f:
+            yaml.dump({"seed": seed}, f)
+        return seed
+
+    def _load_checkpoint(self):
+        finished = {}
+        path = os.path.join(self.checkpoint_dir, "benchmark_jobs.pkl")
+        if not os.path.exists(path):
+            return finished
+        with open(path, "rb+") as f:
+            end = 0
+            while True:
+                try:
+                    key, result = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError):
+                    # end of file, an incomplete last record (e.g. after a
+                    # crash) is removed
+                    f.truncate(end)
+                    break
+                finished[key] = result
+                end = f.tell()
+        return finished
+
+    def _plant_parameters(self):
+        return {
+            "mass": self.mass,
+            "length": self.length,
+            "com": self.com,
+            "damping": self.damping,
+            "gravity": self.gravity,
+            "cfric": self.cfric,
+            "inertia": self.inertia,
+            "motor_inertia": self.motor_inertia,
+            "torque_limit": self.torque_limit,
+        }
+
+    def _job(self, job_id, plant=None, meas=None, motor=None, perturbation=None):
+        return {
+            "id": job_id,
+            "plant": {} if plant is None else plant,
+            "meas": meas,
+            "motor": motor,
+            "perturbation": perturbation,
+            "seed": None,
+        }
+
+    def simulate_job(self, job):
+        """
+        Simulate a single job of a robustness sweep and compute the
+        success measures.
+
+        Parameters
+        ----------
+        job : dict
+            job as created by the get_*_jobs methods
+
+        Returns
+        -------
+        dict
+            "free_cost", "following_cost", "success", "stop_reason" (see
+            Simulator.simulate), "time" (computation time in s) and for
+            perturbation jobs "mu", "sigma", "amplitude"
+        """
+        if job["seed"] is None:
+            return self._simulate_job(job, None, None)
+
+        # independent streams for the noise and the perturbations of this
+        # job, the global random state is seeded for components without
+        # explicit generator (e.g. stochastic controllers) and restored
+        # afterwards, so that serial runs leave the caller's state untouched
+        noise_seq, perturbation_seq = np.random.SeedSequence(job["seed"]).spawn(2)
+        global_state = np.random.get_state()
+        np.random.seed(job["seed"])
+        try:
+            return self._simulate_job(
+                job,
+                np.random.default_rng(noise_seq),
+                np.random.default_rng(perturbation_seq),
+            )
+        finally:
+            np.random.set_state(global_state)
+
+    def _simulate_job(self, job, noise_rng, perturbation_rng):
+        t0 = time.time()
+        pars = self._plant_parameters()
+        pars.update(job["plant"])
+        plant = DoublePendulumPlant(
+            mass=pars["mass"],
+            length=pars["length"],
+            com=pars["com"],
+            damping=pars["damping"],
+            gravity=pars["gravity"],
+            coulomb_fric=pars["cfric"],
+            inertia=pars["inertia"],
+            motor_inertia=pars["motor_inertia"],
+            torque_limit=pars["torque_limit"],
+        )
+        simulator = Simulator(plant=plant)
+        simulator.set_random_generator(noise_rng)
+        if job["meas"] is not None:
+            simulator.set_measurement_parameters(**job["meas"])
+        if job["motor"] is not None:
+            simulator.set_motor_parameters(**job["motor"])
+
+        self.controller.reset()
+        self.controller.init()
+
+        result = {}
+        if job["perturbation"] is not None:
+            (
+                perturbation_array,
+                mu,
+                sigma,
+                amplitude,
+            ) = get_random_gauss_perturbation_array(
+                self.t_final, self.dt, rng=perturbation_rng, **job["perturbation"]
+            )
+            simulator.set_disturbances(perturbation_array)
+            result["mu"] = list(mu)
+            result["sigma"] = list(sigma)
+            result["amplitude"] = list(amplitude)
+
+        T, X, U = simulator.simulate(
+            t0=0.0,
+            x0=self.x0,
+            tf=self.t_final,
+            dt=self.dt,
+            controller=self.controller,
+            integrator=self.integrator,
+            termination=self.get_termination_predicates(),
+        )
+
+        cost_free, cost_tf, succ = self.compute_success_measure(X, U)
+        result["free_cost"] = cost_free
+        result["following_cost"] = cost_tf
+        result["success"] = succ
+        result["stop_reason"] = simulator.stop_reason
+        result["time"] = time.time() - t0
+        return result
+
+    def _seed_jobs(self, jobs):
+        base_seed = self.seed
+        if base_seed is None and self.checkpoint_dir is not None:
+            base_seed = self._checkpoint_seed()
+        elif base_seed is None:
+            base_seed = np.random.randint(0, 2**31 - 1)
+        for job in jobs:
+            job_hash = zlib.crc32(repr(job["id"]).encode("utf-8"))
+            seed_seq = np.random.SeedSequence([base_seed, job_hash])
+            job["seed"] = int(seed_seq.generate_state(1)[0])
+
+    def run_jobs(self, jobs):
+        """
+        Run jobs of a robustness sweep, in parallel if n_workers > 1
+        (see set_parallel_execution).
+        If checkpointing is enabled (see set_checkpointing), finished jobs are
+        loaded from the checkpoint and new results are appended to it.
+        Prints a progress bar and a timing report.
+
+        Parameters
+        ----------
+        jobs : list of dicts
+            jobs as created by the get_*_jobs methods
+
+        Returns
+        -------
+        list of dicts
+            results of the jobs (see simulate_job), same order as jobs
+        """
+        self._seed_jobs(jobs)
+        n_jobs = len(jobs)
+        results = [None] * n_jobs
+
+        checkpoint_file = None
+        todo = list(range(n_jobs))
+        if self.checkpoint_dir is not None:
+            config_key = self._config_key()
+            keys = [self._job_key(job, config_key) for job in jobs]
+            finished = self._load_checkpoint()
+            todo = []
+            for i, key in enumerate(keys):
+                if key in finished:
+                    results[i] = finished[key]
+                else:
+                    todo.append(i)
+            if len(todo) < n_jobs:
+                print(f"  {n_jobs - len(todo)} jobs loaded from checkpoint")
+            checkpoint_file = open(
+                os.path.join(self.checkpoint_dir, "benchmark_jobs.pkl"), "ab"
+            )
+
+        def finish_job(i, result):
+            results[i] = result
+            if checkpoint_file is not None:
+                pickle.dump((keys[i], result), checkpoint_file)
+                checkpoint_file.flush()
+
+        t0 = time.time()
+        n_todo = len(todo)
+        _print_progress(0, n_todo, 0.0)
+        try:
+            self._run_jobs(jobs, todo, finish_job, t0)
+        finally:
+            if checkpoint_file is not None:
+                checkpoint_file.close()
+        print("")
+        _print_timing_report(
+            [jobs[i] for i in todo], [results[i] for i in todo], time.time() - t0
+        )
+        return results
+
+    def _run_jobs(self, jobs, todo, finish_job, t0):
+        n_todo = len(todo)
+        if self.n_workers <= 1 or n_todo <= 1:
+            for counter, i in enumerate(todo):
+                finish_job(i, self.simulate_job(jobs[i]))
+                _print_progress(counter + 1, n_todo, time.time() - t0)
+        else:
+            worker_ben = copy.copy(self)
+            worker_ben.simulator = None
+            worker_ben.plant = None
+            if self.controller_factory is not None:
+                worker_ben.controller = None
+            with ProcessPoolExecutor(
+                max_workers=min(self.n_workers, n_todo),
+                initializer=_init_worker,
+                initargs=(worker_ben, self.controller_factory),
+            ) as executor:
+                futures = {
+                    executor.submit(_run_worker_job, jobs[i]): i for i in todo
+                }
+                for counter, future in enumerate(as_completed(futures)):
+                    finish_job(futures[future], future.result())
+                    _print_progress(counter + 1, n_todo, time.time() - t0)
+
+    def get_modelpar_jobs(
         self,
         mpar_vars=["Ir", "m1r1", "I1", "b1", "cf1", "m2r2", "m2", "I2", "b2", "cf2"],
         var_lists={
@@ -259,189 +774,96 @@ class benchmarker:
             "cf2": [],
         },
     ):
-        n_sims = 0
-        for k in var_lists.keys():
-            n_sims += len(var_lists[k])
-        print(f"Computing model parameter robustness ({n_sims} simulations)")
-
-        res_dict = {}
+        jobs = []
         for mp in mpar_vars:
-            counter = 0
-            nn_sims = len(var_lists[mp])
-            print(
-                "  Computing robustness to model parameter",
-                mp,
-                f" ({nn_sims} simulations)",
-            )
-            print(f"  {counter}/{nn_sims}", end="")
-            C_free = []
-            C_tf = []
-            SUCC = []
-            for var in var_lists[mp]:
+            for i, var in enumerate(var_lists[mp]):
                 if mp == "Ir":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=var,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
+                    plant = {"motor_inertia": var}
                 elif mp == "m1r1":
-                    m1 = self.mass[0]
-                    r1 = var / m1
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=[m1, self.mass[1]],
-                        length=self.length,
-                        com=[r1, self.com[1]],
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
+                    plant = {"com": [var / self.mass[0], self.com[1]]}
                 elif mp == "I1":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=[var, self.inertia[1]],
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
+                    plant = {"inertia": [var, self.inertia[1]]}
                 elif mp == "b1":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=[var, self.damping[1]],
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
+                    plant = {"damping": [var, self.damping[1]]}
                 elif mp == "cf1":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=[var, self.cfric[1]],
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
+                    plant = {"cfric": [var, self.cfric[1]]}
                 elif mp == "m2r2":
-                    m2 = self.mass[1]
-                    r2 = var / m2
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=[self.mass[0], m2],
-                        length=self.length,
-                        com=[self.com[0], r2],
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
+                    plant = {"com": [self.com[0], var / self.mass[1]]}
                 elif mp == "m2":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=[self.mass[0], var],
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
+                    plant = {"mass": [self.mass[0], var]}
                 elif mp == "I2":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=[self.inertia[0], var],
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
+                    plant = {"inertia": [self.inertia[0], var]}
                 elif mp == "b2":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=[self.damping[0], var],
-                        gravity=self.gravity,
-                        cfric=self.cfric,
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
+                    plant = {"damping": [self.damping[0], var]}
                 elif mp == "cf2":
-                    cost_free, cost_tf, succ = self.simulate_and_get_cost(
-                        mass=self.mass,
-                        length=self.length,
-                        com=self.com,
-                        damping=self.damping,
-                        gravity=self.gravity,
-                        cfric=[self.cfric[0], var],
-                        inertia=self.inertia,
-                        motor_inertia=self.motor_inertia,
-                        torque_limit=self.torque_limit,
-                    )
-                    C_free.append(cost_free)
-                    C_tf.append(cost_tf)
-                    SUCC.append(succ)
-                counter += 1
-                print("\r", end="")
-                print(f"  {counter}/{nn_sims}", end="")
+                    plant = {"cfric": [self.cfric[0], var]}
+                jobs.append(self._job(("model_robustness", mp, i), plant=plant))
+        return jobs
+
+    def _modelpar_results(self, mpar_vars, var_lists, results):
+        res_dict = {}
+        for mp in mpar_vars:
+            res = results[: len(var_lists[mp])]
+            results = results[len(var_lists[mp]) :]
             res_dict[mp] = {}
             res_dict[mp]["values"] = var_lists[mp]
-            res_dict[mp]["free_costs"] = C_free
+            res_dict[mp]["free_costs"] = [r["free_cost"] for r in res]
             if self.traj_following:
-                res_dict[mp]["following_costs"] = C_tf
-            res_dict[mp]["successes"] = SUCC
-            print("")
+                res_dict[mp]["following_costs"] = [r["following_cost"] for r in res]
+            res_dict[mp]["successes"] = [r["success"] for r in res]
+            res_dict[mp]["stop_reasons"] = [r["stop_reason"] for r in res]
+        return res_dict
+
+    def check_modelpar_robustness(
+        self,
+        mpar_vars=["Ir", "m1r1", "I1", "b1", "cf1", "m2r2", "m2", "I2", "b2", "cf2"],
+        var_lists={
+            "Ir": [],
+            "m1r1": [],
+            "I1": [],
+            "b1": [],
+            "cf1": [],
+            "m2r2": [],
+            "m2": [],
+            "I2": [],
+            "b2": [],
+            "cf2": [],
+        },
+    ):
+        jobs = self.get_modelpar_jobs(mpar_vars, var_lists)
+        print(f"Computing model parameter robustness ({len(jobs)} simulations)")
+        results = self.run_jobs(jobs)
+        return self._modelpar_results(mpar_vars, var_lists, results)
+
+    def get_perturbation_jobs(
+        self,
+        repetitions=20,
+        n_pert_per_joint=3,
+        min_t_dist=1.0,
+        sigma_minmax=[0.01, 0.05],
+        amplitude_min_max=[0.1, 1.0],
+    ):
+        perturbation = {
+            "n_per_joint": n_pert_per_joint,
+            "min_t_dist": min_t_dist,
+            "sigma_minmax": sigma_minmax,
+            "amplitude_min_max": amplitude_min_max,
+        }
+        return [
+            self._job(("perturbation_robustness", rep), perturbation=perturbation)
+            for rep in range(repetitions)
+        ]
+
+    def _perturbation_results(self, results):
+        res_dict = {}
+        res_dict["mu_list"] = [r["mu"] for r in results]
+        res_dict["sigma_list"] = [r["sigma"] for r in results]
+        res_dict["amplitudes_list"] = [r["amplitude"] for r in results]
+        res_dict["free_costs"] = [r["free_cost"] for r in results]
+        if self.traj_following:
+            res_dict["following_costs"] = [r["following_cost"] for r in results]
+        res_dict["successes"] = [r["success"] for r in results]
+        res_dict["stop_reasons"] = [r["stop_reason"] for r in results]
         return res_dict
 
     def check_perturbation_robustness(
@@ -452,63 +874,55 @@ class benchmarker:
         sigma_minmax=[0.01, 0.05],
         amplitude_min_max=[0.1, 1.0],
     ):
-        n_sims = repetitions
-        print(f"Computing pertubation robustness ({n_sims} simulations)")
+        jobs = self.get_perturbation_jobs(
+            repetitions, n_pert_per_joint, min_t_dist, sigma_minmax, amplitude_min_max
+        )
+        print(f"Computing pertubation robustness ({len(jobs)} simulations)")
+        results = self.run_jobs(jobs)
+        return self._perturbation_results(results)
+
+    def get_meas_noise_jobs(
+        self,
+        repetitions=10,
+        meas_noise_mode="vel",
+        meas_noise_sigma_list=[],
+    ):
+        jobs = []
+        for i, na in enumerate(meas_noise_sigma_list):
+            if meas_noise_mode == "posvel":
+                meas_noise_sigmas = [na, na, na, na]
+            elif meas_noise_mode == "vel":
+                meas_noise_sigmas = [0.0, 0.0, na, na]
+            for rep in range(repetitions):
+                jobs.append(
+                    self._job(
+                        ("meas_noise_robustness", i, rep),
+                        meas={"meas_noise_sigmas": meas_noise_sigmas},
+                    )
+                )
+        return jobs
 
-        counter = 0
+    def _meas_noise_results(
+        self, repetitions, meas_noise_mode, meas_noise_sigma_list, results
+    ):
+        # leave for now for consitency with older data
+        nf = "None"
+
+        res = [
+            results[i * repetitions : (i + 1) * repetitions]
+            for i in range(len(meas_noise_sigma_list))
+        ]
         res_dict = {}
-        C_free = []
-        C_tf = []
-        SUCC = []
-        mus = []
-        sigmas = []
-        amplitudes = []
-        print(f"{counter}/{n_sims}", end="")
-        for _ in range(repetitions):
-            self.controller.reset()
-            self.controller.init()
-            (
-                perturbation_array,
-                mu,
-                sigma,
-                amplitude,
-            ) = get_random_gauss_perturbation_array(
-                self.t_final,
-                self.dt,
-                n_pert_per_joint,
-                min_t_dist,
-                sigma_minmax,
-                amplitude_min_max,
-            )
-            self.simulator.set_disturbances(perturbation_array)
-            T, X, U = self.simulator.simulate(
-                t0=0.0,
-                tf=self.t_final,
-                dt=self.dt,
-                x0=self.x0,
-                controller=self.controller,
-                integrator=self.integrator,
-            )
-            self.simulator.reset()
-
-            cost_free, cost_tf, succ = self.compute_success_measure(X, U)
-            mus.append(list(mu))
-            sigmas.append(list(sigma))
-            amplitudes.append(list(amplitude))
-            C_free.append(cost_free)
-            C_tf.append(cost_tf)
-            SUCC.append(succ)
-            counter += 1
-            print("\r", end="")
-            print(f"{counter}/{n_sims}", end="")
-        res_dict["mu_list"] = mus
-        res_dict["sigma_list"] = sigmas
-        res_dict["amplitudes_list"] = amplitudes
-        res_dict["free_costs"] = C_free
+        res_dict[nf] = {}
+        res_dict[nf]["noise_sigma_list"] = meas_noise_sigma_list
+        res_dict[nf]["free_costs"] = [[r["free_cost"] for r in rr] for rr in res]
         if self.traj_following:
-            res_dict["following_costs"] = C_tf
-        res_dict["successes"] = SUCC
-        print("")
+            res_dict[nf]["following_costs"] = [
+                [r["following_cost"] for r in rr] for rr in res
+            ]
+        res_dict[nf]["successes"] = [[r["success"] for r in rr] for rr in res]
+        res_dict[nf]["stop_reasons"] = [[r["stop_reason"] for r in rr] for rr in res]
+        res_dict[nf]["noise_mode"] = meas_noise_mode
         return res_dict
 
     def check_meas_noise_robustness(
@@ -520,204 +934,103 @@ class benchmarker:
         # maybe add noise frequency
         # (on the real system noise frequency seems so be higher than
         # control frequency -> no frequency neccessary here)
+        jobs = self.get_meas_noise_jobs(
+            repetitions, meas_noise_mode, meas_noise_sigma_list
+        )
+        print(f"Computing noise robustness ({len(jobs)} simulations)")
+        results = self.run_jobs(jobs)
+        return self._meas_noise_results(
+            repetitions, meas_noise_mode, meas_noise_sigma_list, results
+        )
 
-        # leave for now for consitency with older data
-        meas_noise_vfilters = ["None"]
-
-        n_sims = repetitions * len(meas_noise_sigma_list) * len(meas_noise_vfilters)
-        print(f"Computing noise robustness ({n_sims} simulations)")
+    def get_unoise_jobs(self, repetitions=10, u_noise_sigma_list=[]):
+        jobs = []
+        for i, uns in enumerate(u_noise_sigma_list):
+            u_noise_sigmas = np.zeros(len(self.torque_limit))
+            for j in range(len(self.torque_limit)):
+                if self.torque_limit[j] != 0.0:
+                    u_noise_sigmas[j] = uns
+            for rep in range(repetitions):
+                jobs.append(
+                    self._job(
+                        ("u_noise_robustness", i, rep),
+                        motor={"u_noise_sigmas": u_noise_sigmas},
+                    )
+                )
+        return jobs
 
+    def _unoise_results(self, repetitions, u_noise_sigma_list, results):
+        res = [
+            results[i * repetitions : (i + 1) * repetitions]
+            for i in range(len(u_noise_sigma_list))
+        ]
         res_dict = {}
-        for nf in meas_noise_vfilters:
-            counter = 0
-            nn_sims = repetitions * len(meas_noise_sigma_list)
-            # print("  Using Noise filter: ", nf, f"({nn_sims} simulations)")
-            print(f"  {counter}/{n_sims}", end="")
-            C_free = []
-            C_tf = []
-            SUCC = []
-            for na in meas_noise_sigma_list:
-                rep_C_free = []
-                rep_C_tf = []
-                rep_SUCC = []
-                for _ in range(repetitions):
-                    self.controller.reset()
-                    self.controller.init()
-                    if meas_noise_mode == "posvel":
-                        meas_noise_sigmas = [na, na, na, na]
-                    elif meas_noise_mode == "vel":
-                        meas_noise_sigmas = [0.0, 0.0, na, na]
-                    self.simulator.set_measurement_parameters(
-                        meas_noise_sigmas=meas_noise_sigmas
-                    )
-                    # self.simulator.set_filter_parameters(
-                    #         meas_noise_cut=meas_noise_cut,
-                    #         meas_noise_vfilter=nf,
-                    #         meas_noise_vfilter_args=meas_noise_vfilter_args)
-                    T, X, U = self.simulator.simulate(
-                        t0=0.0,
-                        tf=self.t_final,
-                        dt=self.dt,
-                        x0=self.x0,
-                        controller=self.controller,
-                        integrator=self.integrator,
-                    )
-                    self.simulator.reset()
-
-                    cost_free, cost_tf, succ = self.compute_success_measure(X, U)
-                    rep_C_free.append(cost_free)
-                    rep_C_tf.append(cost_tf)
-                    rep_SUCC.append(succ)
-                    counter += 1
-                    print("\r", end="")
-                    print(f"  {counter}/{n_sims}", end="")
-                C_free.append(rep_C_free)
-                C_tf.append(rep_C_tf)
-                SUCC.append(rep_SUCC)
-            res_dict[nf] = {}
-            res_dict[nf]["noise_sigma_list"] = meas_noise_sigma_list
-            res_dict[nf]["free_costs"] = C_free
-            if self.traj_following:
-                res_dict[nf]["following_costs"] = C_tf
-            res_dict[nf]["successes"] = SUCC
-            res_dict[nf]["noise_mode"] = meas_noise_mode
-            # res_dict[nf]["noise_cut"] = meas_noise_cut
-            # res_dict[nf]["noise_vfilter"] = nf
-            # res_dict[nf]["noise_vfilter_args"] = meas_noise_vfilter_args
-            print("")
+        res_dict["u_noise_sigma_list"] = u_noise_sigma_list
+        res_dict["free_costs"] = [[r["free_cost"] for r in rr] for rr in res]
+        if self.traj_following:
+            res_dict["following_costs"] = [
+                [r["following_cost"] for r in rr] for rr in res
+            ]
+        res_dict["successes"] = [[r["success"] for r in rr] for rr in res]
+        res_dict["stop_reasons"] = [[r["stop_reason"] for r in rr] for rr in res]
         return res_dict
 
     def check_unoise_robustness(self, repetitions=10, u_noise_sigma_list=[]):
         # maybe add noise frequency
-        n_sims = repetitions * len(u_noise_sigma_list)
-        print(f"Computing torque noise robustness ({n_sims} simulations)")
+        jobs = self.get_unoise_jobs(repetitions, u_noise_sigma_list)
+        print(f"Computing torque noise robustness ({len(jobs)} simulations)")
+        results = self.run_jobs(jobs)
+        return self._unoise_results(repetitions, u_noise_sigma_list, results)
+
+    def get_uresponsiveness_jobs(self, u_responses=[]):
+        return [
+            self._job(
+                ("u_responsiveness_robustness", i), motor={"u_responsiveness": ur}
+            )
+            for i, ur in enumerate(u_responses)
+        ]
 
-        counter = 0
+    def _uresponsiveness_results(self, u_responses, results):
         res_dict = {}
-        C_free = []
-        C_tf = []
-        SUCC = []
-        print(f"{counter}/{n_sims}", end="")
-        for uns in u_noise_sigma_list:
-            rep_C_free = []
-            rep_C_tf = []
-            rep_SUCC = []
-            for _ in range(repetitions):
-                self.controller.reset()
-                self.controller.init()
-                u_noise_sigmas = np.zeros(len(self.torque_limit))
-                for i in range(len(self.torque_limit)):
-                    if self.torque_limit[i] != 0.0:
-                        u_noise_sigmas[i] = uns
-
-                self.simulator.set_motor_parameters(u_noise_sigmas=u_noise_sigmas)
-                T, X, U = self.simulator.simulate(
-                    t0=0.0,
-                    tf=self.t_final,
-                    dt=self.dt,
-                    x0=self.x0,
-                    controller=self.controller,
-                    integrator=self.integrator,
-                )
-                self.simulator.reset()
-
-                cost_free, cost_tf, succ = self.compute_success_measure(X, U)
-                rep_C_free.append(cost_free)
-                rep_C_tf.append(cost_tf)
-                rep_SUCC.append(succ)
-                counter += 1
-                print("\r", end="")
-                print(f"{counter}/{n_sims}", end="")
-            C_free.append(rep_C_free)
-            C_tf.append(rep_C_tf)
-            SUCC.append(rep_SUCC)
-        res_dict["u_noise_sigma_list"] = u_noise_sigma_list
-        res_dict["free_costs"] = C_free
+        res_dict["u_responsivenesses"] = u_responses
+        res_dict["free_costs"] = [r["free_cost"] for r in results]
         if self.traj_following:
-            res_dict["following_costs"] = C_tf
-        res_dict["successes"] = SUCC
-        print("")
+            res_dict["following_costs"] = [r["following_cost"] for r in results]
+        res_dict["successes"] = [r["success"] for r in results]
+        res_dict["stop_reasons"] = [r["stop_reason"] for r in results]
         return res_dict
 
     def check_uresponsiveness_robustness(self, u_responses=[]):
-        n_sims = len(u_responses)
-        print(f"Computing torque responsiveness robustness ({n_sims} simulations)")
+        jobs = self.get_uresponsiveness_jobs(u_responses)
+        print(f"Computing torque responsiveness robustness ({len(jobs)} simulations)")
+        results = self.run_jobs(jobs)
+        return self._uresponsiveness_results(u_responses, results)
 
-        counter = 0
-        res_dict = {}
-        C_free = []
-        C_tf = []
-        SUCC = []
-        print(f"{counter}/{n_sims}", end="")
-        for ur in u_responses:
-            self.controller.reset()
-            self.controller.init()
-            self.simulator.set_motor_parameters(u_responsiveness=ur)
-            T, X, U = self.simulator.simulate(
-                t0=0.0,
-                tf=self.t_final,
-                dt=self.dt,
-                x0=self.x0,
-                controller=self.controller,
-                integrator=self.integrator,
+    def get_delay_jobs(self, delay_mode="posvel", delays=[]):
+        return [
+            self._job(
+                ("delay_robustness", i), meas={"delay": de, "delay_mode": delay_mode}
             )
-            self.simulator.reset()
-
-            cost_free, cost_tf, succ = self.compute_success_measure(X, U)
-            C_free.append(cost_free)
-            C_tf.append(cost_tf)
-            SUCC.append(succ)
-            counter += 1
-            print("\r", end="")
-            print(f"{counter}/{n_sims}", end="")
-        res_dict["u_responsivenesses"] = u_responses
-        res_dict["free_costs"] = C_free
-        if self.traj_following:
-            res_dict["following_costs"] = C_tf
-        res_dict["successes"] = SUCC
-        print("")
-        return res_dict
-
-    def check_delay_robustness(self, delay_mode="posvel", delays=[]):
-        n_sims = len(delays)
-        print(f"Computing delay robustness ({n_sims} simulations)")
+            for i, de in enumerate(delays)
+        ]
 
-        counter = 0
+    def _delay_results(self, delay_mode, delays, results):
         res_dict = {}
-        C_free = []
-        C_tf = []
-        SUCC = []
-        print(f"{counter}/{n_sims}", end="")
-        for de in delays:
-            self.controller.reset()
-            self.controller.init()
-            self.simulator.set_measurement_parameters(delay=de, delay_mode=delay_mode)
-            T, X, U = self.simulator.simulate(
-                t0=0.0,
-                tf=self.t_final,
-                dt=self.dt,
-                x0=self.x0,
-                controller=self.controller,
-                integrator=self.integrator,
-            )
-            self.simulator.reset()
-
-            cost_free, cost_tf, succ = self.compute_success_measure(X, U)
-            C_free.append(cost_free)
-            C_tf.append(cost_tf)
-            SUCC.append(succ)
-            counter += 1
-            print("\r", end="")
-            print(f"{counter}/{n_sims}", end="")
         res_dict["delay_mode"] = delay_mode
         res_dict["measurement_delay"] = delays
-        res_dict["free_costs"] = C_free
+        res_dict["free_costs"] = [r["free_cost"] for r in results]
         if self.traj_following:
-            res_dict["following_costs"] = C_tf
-        res_dict["successes"] = SUCC
-        print("")
+            res_dict["following_costs"] = [r["following_cost"] for r in results]
+        res_dict["successes"] = [r["success"] for r in results]
+        res_dict["stop_reasons"] = [r["stop_reason"] for r in results]
         return res_dict
 
+    def check_delay_robustness(self, delay_mode="posvel", delays=[]):
+        jobs = self.get_delay_jobs(delay_mode, delays)
+        print(f"Computing delay robustness ({len(jobs)} simulations)")
+        results = self.run_jobs(jobs)
+        return self._delay_results(delay_mode, delays, results)
+
     def benchmark(
         self,
         compute_model_robustness=True,
@@ -773,62 +1086,79 @@ class benchmarker:
         self.perturbation_sigma_minmax = perturbation_sigma_minmax
         self.perturbation_amp_minmax = perturbation_amp_minmax
 
-        n_sims = 0
+        # the whole sweep is expanded into independent jobs
+        # (the torque noise robustness always uses 10 repetitions)
+        jobs = {}
         if compute_model_robustness:
-            for k in modelpar_var_lists.keys():
-                n_sims += len(modelpar_var_lists[k])
-        if compute_noise_robustness:
-            n_sims += repetitions * len(meas_noise_sigma_list)
-        if compute_unoise_robustness:
-            n_sims += repetitions * len(u_noise_sigma_list)
-        if compute_uresponsiveness_robustness:
-            n_sims += len(u_responses)
-        if compute_delay_robustness:
-            n_sims += len(delays)
-        if compute_perturbation_robustness:
-            n_sims += perturbation_repetitions
-        print(
-            f"\nWill in total compute {n_sims} simulations for testing the robustness of the controller\n"
-        )
-
-        self.res = {}
-        if compute_model_robustness:
-            res_model = self.check_modelpar_robustness(
+            jobs["model_robustness"] = self.get_modelpar_jobs(
                 mpar_vars=mpar_vars, var_lists=modelpar_var_lists
             )
-            self.res["model_robustness"] = res_model
         if compute_noise_robustness:
-            res_noise = self.check_meas_noise_robustness(
+            jobs["meas_noise_robustness"] = self.get_meas_noise_jobs(
                 repetitions=repetitions,
                 meas_noise_mode=meas_noise_mode,
                 meas_noise_sigma_list=meas_noise_sigma_list,
-                # meas_noise_cut=meas_noise_cut,
-                # meas_noise_vfilters=meas_noise_vfilters,
-                # meas_noise_vfilter_args=meas_noise_vfilter_args,
             )
-            self.res["meas_noise_robustness"] = res_noise
         if compute_unoise_robustness:
-            res_unoise = self.check_unoise_robustness(
+            jobs["u_noise_robustness"] = self.get_unoise_jobs(
                 u_noise_sigma_list=u_noise_sigma_list
             )
-            self.res["u_noise_robustness"] = res_unoise
         if compute_uresponsiveness_robustness:
-            res_uresp = self.check_uresponsiveness_robustness(u_responses=u_responses)
-            self.res["u_responsiveness_robustness"] = res_uresp
+            jobs["u_responsiveness_robustness"] = self.get_uresponsiveness_jobs(
+                u_responses=u_responses
+            )
         if compute_delay_robustness:
-            res_delay = self.check_delay_robustness(
+            jobs["delay_robustness"] = self.get_delay_jobs(
                 delay_mode=delay_mode, delays=delays
             )
-            self.res["delay_robustness"] = res_delay
         if compute_perturbation_robustness:
-            res_pertub = self.check_perturbation_robustness(
+            jobs["perturbation_robustness"] = self.get_perturbation_jobs(
                 repetitions=perturbation_repetitions,
                 n_pert_per_joint=perturbations_per_joint,
                 min_t_dist=perturbation_min_t_dist,
                 sigma_minmax=perturbation_sigma_minmax,
                 amplitude_min_max=perturbation_amp_minmax,
             )
-            self.res["perturbation_robustness"] = res_pertub
+
+        all_jobs = [job for criterion_jobs in jobs.values() for job in criterion_jobs]
+        print(
+            f"\nWill in total compute {len(all_jobs)} simulations for testing the robustness of the controller\n"
+        )
+        all_results = self.run_jobs(all_jobs)
+
+        results = {}
+        for criterion, criterion_jobs in jobs.items():
+            results[criterion] = all_results[: len(criterion_jobs)]
+            all_results = all_results[len(criterion_jobs) :]
+
+        self.res = {}
+        if compute_model_robustness:
+            self.res["model_robustness"] = self._modelpar_results(
+                mpar_vars, modelpar_var_lists, results["model_robustness"]
+            )
+        if compute_noise_robustness:
+            self.res["meas_noise_robustness"] = self._meas_noise_results(
+                repetitions,
+                meas_noise_mode,
+                meas_noise_sigma_list,
+                results["meas_noise_robustness"],
+            )
+        if compute_unoise_robustness:
+            self.res["u_noise_robustness"] = self._unoise_results(
+                10, u_noise_sigma_list, results["u_noise_robustness"]
+            )
+        if compute_uresponsiveness_robustness:
+            self.res["u_responsiveness_robustness"] = self._uresponsiveness_results(
+                u_responses, results["u_responsiveness_robustness"]
+            )
+        if compute_delay_robustness:
+            self.res["delay_robustness"] = self._delay_results(
+                delay_mode, delays, results["delay_robustness"]
+            )
+        if compute_perturbation_robustness:
+            self.res["perturbation_robustness"] = self._perturbation_results(
+                results["perturbation_robustness"]
+            )
         return self.res
 
     def save(self, save_dir="."):
@@ -875,6 +1205,9 @@ class benchmarker:
             "perturbation_min_t_dist": self.perturbation_min_t_dist,
             "perturbation_sigma_minmax": list(self.perturbation_sigma_minmax),
             "perturbation_amp_minmax": list(self.perturbation_amp_minmax),
+            "seed": self.seed,
+            "max_velocity": self.max_velocity,
+            "goal_dwell_time": self.goal_dwell_time,
         }
 
         with open(os.path.join(save_dir, "benchmark_parameters.yml"), "w") as f:
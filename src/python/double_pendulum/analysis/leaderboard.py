@@ -1,8 +1,15 @@
 import os
+import pickle
+import hashlib
+import importlib
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
+import pandas as pd
 
-from double_pendulum.utils.csv_trajectory import load_trajectory_full
-from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.utils.csv_trajectory import has_binary_trajectory
+from double_pendulum.utils.trajectory import Trajectory
+from double_pendulum.utils.cache import hash_key, atomic_write
 
 
 def leaderboard_scores(
@@ -30,6 +37,9 @@ def leaderboard_scores(
     link_base="",
     simulation=True,
     score_version="v1",
+    n_workers=1,
+    cache_dir=None,
+    chunksize=None,
 ):
     """leaderboard_scores.
     Compute leaderboard scores from data_dictionaries which will be loaded from
@@ -78,160 +88,54 @@ def leaderboard_scores(
         which equation should be used for the score calculation
         if set to something else than "v1", "v2" will be used
         default: "v1"
+    n_workers : int
+        number of worker processes for scoring the trajectories
+        default: 1
+    cache_dir : string
+        directory for caching the scores of the trajectories (see
+        score_trajectories). If None, the scores are not cached.
+        default: None
+    chunksize : int
+        If set, the trajectories are streamed in chunks of chunksize rows
+        (see score_trajectory).
+        default: None
     """
 
     leaderboard_data = []
 
-    nonzero_weigths = 0
-    for w in weights.keys():
-        if weights[w] != 0.0:
-            nonzero_weigths += 1
-
+    csv_paths = {}
     for key in data_paths:
         d = data_paths[key]
         if type(d["csv_path"]) == str:
-            csv_paths = [d["csv_path"]]
+            csv_paths[key] = [d["csv_path"]]
         else:
-            csv_paths = d["csv_path"]
-
-        swingup_times = []
-        max_taus = []
-        energies = []
-        integ_taus = []
-        tau_costs = []
-        tau_smoothnesses = []
-        velocity_costs = []
-        successes = []
-        scores = []
-
-        for path in sorted(csv_paths):
-            data_dict = load_trajectory_full(path)
-            T = data_dict["T"]
-            X = data_dict["X_meas"]
-            U = data_dict["U_con"]
-
-            swingup_times.append(
-                get_swingup_time(
-                    T=T, X=X, has_to_stay=True, mpar=mpar, method="height", height=0.9
-                )
-            )
-            max_taus.append(get_max_tau(U))
-            energies.append(get_energy(X, U))
-            integ_taus.append(get_integrated_torque(T, U))
-            tau_costs.append(get_torque_cost(T, U))
-            tau_smoothnesses.append(get_tau_smoothness(U))
-            velocity_costs.append(get_velocity_cost(T, X))
-
-            successes.append(int(swingup_times[-1] < T[-1]))
-
-            if score_version == "v1":
-                score = successes[-1] * (
-                    1.0
-                    - (
-                        weights["swingup_time"]
-                        * swingup_times[-1]
-                        / normalize["swingup_time"]
-                        + weights["max_tau"] * max_taus[-1] / normalize["max_tau"]
-                        + weights["energy"] * energies[-1] / normalize["energy"]
-                        + weights["integ_tau"] * integ_taus[-1] / normalize["integ_tau"]
-                        + weights["tau_cost"] * tau_costs[-1] / normalize["tau_cost"]
-                        + weights["tau_smoothness"]
-                        * tau_smoothnesses[-1]
-                        / normalize["tau_smoothness"]
-                        + weights["velocity_cost"]
-                        * velocity_costs[-1]
-                        / normalize["velocity_cost"]
-                    )
-                )
-            else:
-                score = successes[-1] * (
-                    1.0
-                    - 1.0
-                    / nonzero_weigths
-                    * (
-                        np.tanh(
-                            np.pi
-                            * weights["swingup_time"]
-                            * swingup_times[-1]
-                            / normalize["swingup_time"]
-                        )
-                        + np.tanh(
-                            np.pi
-                            * weights["max_tau"]
-                            * max_taus[-1]
-                            / normalize["max_tau"]
-                        )
-                        + np.tanh(
-                            np.pi
-                            * weights["energy"]
-                            * energies[-1]
-                            / normalize["energy"]
-                        )
-                        + np.tanh(
-                            np.pi
-                            * weights["integ_tau"]
-                            * integ_taus[-1]
-                            / normalize["integ_tau"]
-                        )
-                        + np.tanh(
-                            np.pi
-                            * weights["tau_cost"]
-                            * tau_costs[-1]
-                            / normalize["tau_cost"]
-                        )
-                        + np.tanh(
-                            np.pi
-                            * weights["tau_smoothness"]
-                            * tau_smoothnesses[-1]
-                            / normalize["tau_smoothness"]
-                        )
-                        + np.tanh(
-                            np.pi
-                            * weights["velocity_cost"]
-                            * velocity_costs[-1]
-                            / normalize["velocity_cost"]
-                        )
-                    )
-                )
+            csv_paths[key] = sorted(d["csv_path"])
+
+    all_paths = [path for key in csv_paths for path in csv_paths[key]]
+    results = score_trajectories(
+        all_paths,
+        mpar=mpar,
+        weights=weights,
+        normalize=normalize,
+        score_version=score_version,
+        n_workers=n_workers,
+        cache_dir=cache_dir,
+        chunksize=chunksize,
+    )
 
-            scores.append(score)
-
-            header = "Swingup Success,"
-            results = []
-            results.append([successes[-1]])
-            if weights["swingup_time"] != 0.0:
-                results.append([swingup_times[-1]])
-                header += "Swingup Time [s],"
-            if weights["energy"] != 0.0:
-                results.append([energies[-1]])
-                header += "Energy [J],"
-            if weights["max_tau"] != 0.0:
-                results.append([max_taus[-1]])
-                header += "Max. Torque [Nm],"
-            if weights["integ_tau"] != 0.0:
-                results.append([integ_taus[-1]])
-                header += "Integrated Torque [Nms],"
-            if weights["tau_cost"] != 0.0:
-                results.append([tau_costs[-1]])
-                header += "Torque Cost[N²m²],"
-            if weights["tau_smoothness"] != 0.0:
-                results.append([tau_smoothnesses[-1]])
-                header += "Torque Smoothness [Nm],"
-            if weights["velocity_cost"] != 0.0:
-                results.append([velocity_costs[-1]])
-                header += "Velocity Cost [m²/s²],"
-            results.append([score])
-            header += "RealAI Score"
-            results = np.asarray(results).T
-
-            np.savetxt(
-                os.path.join(os.path.dirname(path), "scores.csv"),
-                results,
-                header=header,
-                delimiter=",",
-                fmt="%s",
-                comments="",
-            )
+    for key in data_paths:
+        d = data_paths[key]
+        res = [results[path] for path in csv_paths[key]]
+
+        swingup_times = [r["swingup_time"] for r in res]
+        max_taus = [r["max_tau"] for r in res]
+        energies = [r["energy"] for r in res]
+        integ_taus = [r["integ_tau"] for r in res]
+        tau_costs = [r["tau_cost"] for r in res]
+        tau_smoothnesses = [r["tau_smoothness"] for r in res]
+        velocity_costs = [r["velocity_cost"] for r in res]
+        successes = [r["success"] for r in res]
+        scores = [r["score"] for r in res]
 
         best = np.argmax(scores)
         swingup_time = swingup_times[best]
@@ -261,7 +165,7 @@ def leaderboard_scores(
         append_data = [
             name_with_link,
             d["short_description"],
-            str(int(success)) + "/" + str(len(csv_paths)),
+            str(int(success)) + "/" + str(len(csv_paths[key])),
         ]
         if weights["swingup_time"] != 0.0:
             append_data.append(str(round(swingup_time, 2)))
@@ -359,6 +263,713 @@ def leaderboard_scores(
     )
 
 
+# increase when the cached scores change to invalidate old cache entries
+SCORE_CACHE_VERSION = 1
+
+
+def _score(metrics, weights, normalize, score_version):
+    criteria = [
+        "swingup_time",
+        "max_tau",
+        "energy",
+        "integ_tau",
+        "tau_cost",
+        "tau_smoothness",
+        "velocity_cost",
+    ]
+    if score_version == "v1":
+        cost = 0.0
+        for c in criteria:
+            cost += weights[c] * metrics[c] / normalize[c]
+        return metrics["success"] * (1.0 - cost)
+
+    nonzero_weigths = 0
+    for w in weights.keys():
+        if weights[w] != 0.0:
+            nonzero_weigths += 1
+    cost = 0.0
+    for c in criteria:
+        cost += np.tanh(np.pi * weights[c] * metrics[c] / normalize[c])
+    return metrics["success"] * (1.0 - 1.0 / nonzero_weigths * cost)
+
+
+def score_trajectory(
+    csv_path,
+    mpar,
+    weights,
+    normalize,
+    score_version="v1",
+    save_scores=True,
+    chunksize=None,
+):
+    """score_trajectory.
+    Compute the leaderboard criteria and the score of a single trajectory and
+    save them to scores.csv next to the trajectory file.
+
+    Parameters
+    ----------
+    csv_path : string
+        path to the trajectory csv file, the measured states (X_meas) and the
+        controller torques (U_con) are used
+    mpar : model_parameters object
+        model parameters
+    weights : dict
+        weights of the criteria (see leaderboard_scores)
+    normalize : dict
+        normalization constants of the criteria (see leaderboard_scores)
+    score_version : string
+        "v1" or "v2" (see leaderboard_scores)
+        default: "v1"
+    save_scores : bool
+        whether to write scores.csv
+        default: True
+    chunksize : int
+        If set, the trajectory is streamed in chunks of chunksize rows (see
+        StreamingLeaderboardMetrics) instead of loading the full file.
+        default: None
+
+    Returns
+    -------
+    dict
+        with the keys of compute_leaderboard_metrics and "score",
+        "success" is an int
+    """
+    if chunksize is None:
+        T, X, U = Trajectory(csv_path).get("T", "X_meas", "U_con")
+        metrics = compute_leaderboard_metrics(
+            T=T,
+            X=X,
+            U=U,
+            mpar=mpar,
+            has_to_stay=True,
+            height=0.9,
+        )
+    else:
+        stream = StreamingLeaderboardMetrics(mpar, has_to_stay=True, height=0.9)
+        for T, X, U in stream_trajectory(csv_path, chunksize):
+            stream.update(T, X, U)
+        metrics = stream.get_metrics()
+    metrics["success"] = int(metrics["success"])
+    metrics["score"] = _score(metrics, weights, normalize, score_version)
+    if save_scores:
+        save_trajectory_scores(
+            os.path.join(os.path.dirname(csv_path), "scores.csv"), metrics, weights
+        )
+    return metrics
+
+
+def save_trajectory_scores(path, metrics, weights):
+    """save_trajectory_scores.
+    Save the criteria with nonzero weights and the score of a trajectory as
+    csv file.
+
+    Parameters
+    ----------
+    path : string
+        path of the csv file
+    metrics : dict
+        criteria and score as returned by score_trajectory
+    weights : dict
+        weights of the criteria (see leaderboard_scores)
+    """
+    header = "Swingup Success,"
+    results = []
+    results.append([metrics["success"]])
+    if weights["swingup_time"] != 0.0:
+        results.append([metrics["swingup_time"]])
+        header += "Swingup Time [s],"
+    if weights["energy"] != 0.0:
+        results.append([metrics["energy"]])
+        header += "Energy [J],"
+    if weights["max_tau"] != 0.0:
+        results.append([metrics["max_tau"]])
+        header += "Max. Torque [Nm],"
+    if weights["integ_tau"] != 0.0:
+        results.append([metrics["integ_tau"]])
+        header += "Integrated Torque [Nms],"
+    if weights["tau_cost"] != 0.0:
+        results.append([metrics["tau_cost"]])
+        header += "Torque Cost[N²m²],"
+    if weights["tau_smoothness"] != 0.0:
+        results.append([metrics["tau_smoothness"]])
+        header += "Torque Smoothness [Nm],"
+    if weights["velocity_cost"] != 0.0:
+        results.append([metrics["velocity_cost"]])
+        header += "Velocity Cost [m²/s²],"
+    results.append([metrics["score"]])
+    header += "RealAI Score"
+    results = np.asarray(results).T
+
+    np.savetxt(
+        path,
+        results,
+        header=header,
+        delimiter=",",
+        fmt="%s",
+        comments="",
+    )
+
+
+def score_key(csv_path, mpar, weights, normalize, score_version="v1"):
+    """score_key.
+    Cache key of the score of a trajectory. Depends on the content of the
+    csv file, the link lengths, the weights, the normalization and the
+    score version.
+
+    Parameters
+    ----------
+    csv_path : string
+        path to the trajectory csv file
+    mpar : model_parameters object
+        model parameters
+    weights : dict
+        weights of the criteria (see leaderboard_scores)
+    normalize : dict
+        normalization constants of the criteria (see leaderboard_scores)
+    score_version : string
+        "v1" or "v2" (see leaderboard_scores)
+        default: "v1"
+
+    Returns
+    -------
+    string
+    """
+    h = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return hash_key(
+        "score",
+        h.hexdigest(),
+        [float(l) for l in mpar.l],
+        sorted((k, float(v)) for k, v in weights.items()),
+        sorted((k, float(v)) for k, v in normalize.items()),
+        score_version,
+        SCORE_CACHE_VERSION,
+    )
+
+
+def score_trajectories(
+    csv_paths,
+    mpar,
+    weights,
+    normalize,
+    score_version="v1",
+    n_workers=1,
+    cache_dir=None,
+    chunksize=None,
+):
+    """score_trajectories.
+    Score multiple trajectories (see score_trajectory), in parallel if
+    n_workers > 1.
+
+    If a cache directory is given, the results are cached with a key from
+    score_key. Only trajectories whose data or scoring configuration changed
+    are rescored (and their scores.csv rewritten).
+
+    Parameters
+    ----------
+    csv_paths : list of strings
+        paths to the trajectory csv files
+    mpar : model_parameters object
+        model parameters
+    weights : dict
+        weights of the criteria (see leaderboard_scores)
+    normalize : dict
+        normalization constants of the criteria (see leaderboard_scores)
+    score_version : string
+        "v1" or "v2" (see leaderboard_scores)
+        default: "v1"
+    n_workers : int
+        number of worker processes
+        default: 1
+    cache_dir : string
+        directory for the score cache, if None the scores are not cached
+        default: None
+    chunksize : int
+        If set, the trajectories are streamed in chunks of chunksize rows
+        (see score_trajectory).
+        default: None
+
+    Returns
+    -------
+    dict
+        {csv_path: result of score_trajectory}
+    """
+    results = {}
+    todo = list(dict.fromkeys(csv_paths))
+    keys = {}
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        todo = []
+        for path in dict.fromkeys(csv_paths):
+            keys[path] = score_key(path, mpar, weights, normalize, score_version)
+            cache_path = os.path.join(cache_dir, f"score_{keys[path]}.pkl")
+            scores_path = os.path.join(os.path.dirname(path), "scores.csv")
+            if os.path.exists(cache_path) and os.path.exists(scores_path):
+                try:
+                    with open(cache_path, "rb") as f:
+                        results[path] = pickle.load(f)
+                    continue
+                except Exception:
+                    pass
+            todo.append(path)
+
+    score = partial(
+        score_trajectory,
+        mpar=mpar,
+        weights=weights,
+        normalize=normalize,
+        score_version=score_version,
+        chunksize=chunksize,
+    )
+
+    def finish(path, res):
+        results[path] = res
+        if cache_dir is not None:
+            atomic_write(
+                os.path.join(cache_dir, f"score_{keys[path]}.pkl"),
+                pickle.dumps(res),
+                mode="wb",
+            )
+
+    if n_workers <= 1 or len(todo) <= 1:
+        for path in todo:
+            finish(path, score(path))
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(todo))) as executor:
+            for path, res in zip(todo, executor.map(score, todo)):
+                finish(path, res)
+    return results
+
+
+def _simulate_controller_module(controller_arg, simulate_controller, data_dir):
+    controller_name = controller_arg[4:]
+    save_dir = os.path.join(data_dir, controller_name)
+    if not os.path.exists(save_dir):
+        os.makedirs(save_dir)
+    controller = importlib.import_module(controller_arg).controller
+    simulate_controller(controller, save_dir, controller_name)
+    return controller_arg
+
+
+def simulate_controllers(controller_args, simulate_controller, data_dir, n_workers=1):
+    """simulate_controllers.
+    Simulate leaderboard controllers, in parallel worker processes if
+    n_workers > 1. Every controller module is imported in the process which
+    simulates it.
+
+    Parameters
+    ----------
+    controller_args : list of strings
+        module names of the controllers (e.g. "con_ilqr_tvlqr"), the modules
+        have to define the attribute controller
+    simulate_controller : function
+        function with the signature
+        simulate_controller(controller, save_dir, controller_name)
+        which simulates a controller and stores the data in save_dir
+    data_dir : string
+        data directory, the data of a controller is stored in
+        data_dir/<controller_name> where controller_name is the module name
+        without the "con_" prefix
+    n_workers : int
+        number of worker processes
+        default: 1
+    """
+    simulate = partial(
+        _simulate_controller_module,
+        simulate_controller=simulate_controller,
+        data_dir=data_dir,
+    )
+    if n_workers <= 1 or len(controller_args) <= 1:
+        for controller_arg in controller_args:
+            simulate(controller_arg)
+            print(f"Simulated {controller_arg}")
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(n_workers, len(controller_args))
+        ) as executor:
+            futures = [executor.submit(simulate, c) for c in controller_args]
+            for future in as_completed(futures):
+                print(f"Simulated {future.result()}")
+
+
+def get_end_effector_height(X, mpar):
+    """get_end_effector_height.
+    Height of the end effector (closed form forward kinematics, origin at the
+    fixed point).
+
+    Parameters
+    ----------
+    X : array-like
+        shape=(..., N, 4)
+        states, units=[rad, rad, rad/s, rad/s]
+        order=[angle1, angle2, velocity1, velocity2]
+    mpar : model_parameters object
+        model parameters, only the link lengths are used
+
+    Returns
+    -------
+    numpy_array
+        shape=(..., N)
+        end effector heights, units=[m]
+    """
+    X = np.asarray(X)
+    q1 = X[..., 0]
+    return -mpar.l[0] * np.cos(q1) - mpar.l[1] * np.cos(q1 + X[..., 1])
+
+
+def _swingup_index(up, has_to_stay=True):
+    # Index of the swingup along the last axis of the boolean array up.
+    # With has_to_stay, this is the start of the run of upright states which
+    # ends at the second to last state. As in the original backward loop, the
+    # first and the last state are not checked and len-1 is returned if the
+    # pendulum is not up at the second to last state.
+    # Without has_to_stay, this is the first upright state (len-1 if the
+    # pendulum never is up).
+    up = np.asarray(up, dtype=bool)
+    N = up.shape[-1]
+    if has_to_stay:
+        if N < 3:
+            return np.full(up.shape[:-1], N - 1, dtype=int)[()]
+        down = ~up[..., N - 2 : 0 : -1]
+        n_up = np.where(np.any(down, axis=-1), np.argmax(down, axis=-1), N - 2)
+        return N - 1 - n_up
+    return np.where(np.any(up, axis=-1), np.argmax(up, axis=-1), N - 1)[()]
+
+
+def _leaderboard_metrics(T, X, U, mpar, has_to_stay, height, R, Q):
+    # single pass over stacked trajectories with shapes
+    # T: (..., N), X: (..., N, 4), U: (..., N, 2)
+    T = np.asarray(T, dtype=float)
+    X = np.asarray(X, dtype=float)
+    U = np.asarray(U, dtype=float)
+
+    up = get_end_effector_height(X, mpar) > height * (mpar.l[0] + mpar.l[1])
+    time_index = _swingup_index(up, has_to_stay)
+    swingup_time = np.take_along_axis(
+        np.broadcast_to(T, up.shape), np.expand_dims(time_index, -1), axis=-1
+    )[..., 0]
+
+    delta_t = np.diff(T, axis=-1)[..., None]
+    tau = U[..., :-1, :]
+    abs_tau = np.abs(tau)
+    vel = X[..., :-1, 2:]
+
+    energy = np.sum(np.abs(np.diff(X[..., :2], axis=-2) * tau), axis=-2)
+    integ_tau = np.sum(abs_tau * delta_t, axis=-2)
+    tau_cost = np.sum(
+        np.einsum("...ij,jk,...ik->...i", tau, R, tau) * delta_t[..., 0], axis=-1
+    )
+    tau_smoothness = np.std(np.diff(U, axis=-2), axis=-2)
+    velocity_cost = np.sum(
+        np.einsum("...ij,jk,...ik->...i", vel, Q, vel) * delta_t[..., 0], axis=-1
+    )
+
+    return {
+        "swingup_time": swingup_time,
+        "success": swingup_time < T[..., -1],
+        "max_tau": np.max(np.abs(U), axis=(-2, -1)),
+        "energy": energy[..., 0] + energy[..., 1],
+        "integ_tau": integ_tau[..., 0] + integ_tau[..., 1],
+        "tau_cost": tau_cost,
+        "tau_smoothness": tau_smoothness[..., 0] + tau_smoothness[..., 1],
+        "velocity_cost": velocity_cost,
+    }
+
+
+def compute_leaderboard_metrics(
+    T,
+    X,
+    U,
+    mpar,
+    has_to_stay=True,
+    height=0.9,
+    R=np.diag([1.0, 1.0]),
+    Q=np.diag([1.0, 1.0]),
+):
+    """compute_leaderboard_metrics.
+    Compute all leaderboard criteria of one or a batch of trajectories in a
+    single pass. The results are the same as the ones of get_swingup_time
+    (with method="height"), get_max_tau, get_energy, get_integrated_torque,
+    get_torque_cost, get_tau_smoothness and get_velocity_cost.
+
+    Parameters
+    ----------
+    T : array-like
+        time points, unit=[s]
+        shape=(N,) or (B, N) for a batch of B trajectories
+        A list of B trajectories with different lengths is also accepted.
+    X : array-like
+        shape=(N, 4) or (B, N, 4)
+        states, units=[rad, rad, rad/s, rad/s]
+        order=[angle1, angle2, velocity1, velocity2]
+    U : array-like
+        shape=(N, 2) or (B, N, 2)
+        actuations/motor torques
+        order=[u1, u2],
+        units=[Nm]
+    mpar : model_parameters object
+        model parameters, only the link lengths are used
+    has_to_stay : bool
+        whether the pendulum has to stay upright until the end of the trajectory
+        default=True
+    height : float
+        fraction of the pendulum length, which the end effector has to exceed
+        to count as swung up
+        default=0.9
+    R : numpy array
+        torque cost weight matrix (2x2)
+    Q : numpy array
+        velocity cost weight matrix (2x2)
+
+    Returns
+    -------
+    dict
+        with keys "swingup_time", "success", "max_tau", "energy",
+        "integ_tau", "tau_cost", "tau_smoothness", "velocity_cost".
+        The values are floats (bool for "success") for a single trajectory
+        and arrays with shape=(B,) for a batch.
+    """
+    if isinstance(T, (list, tuple)) and len({len(t) for t in T}) > 1:
+        metrics = [
+            _leaderboard_metrics(t, x, u, mpar, has_to_stay, height, R, Q)
+            for t, x, u in zip(T, X, U)
+        ]
+        return {
+            key: np.array([m[key] for m in metrics]) for key in metrics[0].keys()
+        }
+    metrics = _leaderboard_metrics(T, X, U, mpar, has_to_stay, height, R, Q)
+    if np.ndim(metrics["swingup_time"]) == 0:
+        metrics = {key: val[()] for key, val in metrics.items()}
+    return metrics
+
+
+class StreamingLeaderboardMetrics:
+    """
+    StreamingLeaderboardMetrics class
+    Accumulates the leaderboard criteria of a trajectory which is passed in
+    consecutive chunks (see stream_trajectory), so that the memory
+    consumption does not depend on the length of the trajectory.
+    The results are the same as the ones of compute_leaderboard_metrics up
+    to floating point rounding.
+
+    Parameters
+    ----------
+    mpar : model_parameters object
+        model parameters, only the link lengths are used
+    has_to_stay : bool
+        whether the pendulum has to stay upright until the end of the trajectory
+        default=True
+    height : float
+        fraction of the pendulum length, which the end effector has to exceed
+        to count as swung up
+        default=0.9
+    R : numpy array
+        torque cost weight matrix (2x2)
+    Q : numpy array
+        velocity cost weight matrix (2x2)
+    """
+
+    def __init__(
+        self,
+        mpar,
+        has_to_stay=True,
+        height=0.9,
+        R=np.diag([1.0, 1.0]),
+        Q=np.diag([1.0, 1.0]),
+    ):
+        self.mpar = mpar
+        self.has_to_stay = has_to_stay
+        self.goal_height = height * (mpar.l[0] + mpar.l[1])
+        self.R = np.asarray(R)
+        self.Q = np.asarray(Q)
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the accumulated criteria to start with a new trajectory.
+        """
+        self.n = 0
+        self.max_tau = 0.0
+        self.energy = 0.0
+        self.integ_tau = 0.0
+        self.tau_cost = 0.0
+        self.velocity_cost = 0.0
+
+        # last row of the previous chunk (t, x, u)
+        self._last = None
+
+        # running mean and sum of squared deviations of the torque changes
+        self._n_du = 0
+        self._du_mean = np.zeros(2)
+        self._du_m2 = np.zeros(2)
+
+        # (up, start time of the upright run, time) of the last two rows
+        self._tail = []
+        self._first_up_t = None
+
+    def update(self, T, X, U):
+        """
+        Add the next chunk of the trajectory.
+
+        Parameters
+        ----------
+        T : array-like
+            time points, unit=[s]
+            shape=(N,)
+        X : array-like
+            shape=(N, 4)
+            states, units=[rad, rad, rad/s, rad/s]
+            order=[angle1, angle2, velocity1, velocity2]
+        U : array-like
+            shape=(N, 2)
+            actuations/motor torques
+            order=[u1, u2],
+            units=[Nm]
+        """
+        T = np.asarray(T, dtype=float)
+        X = np.asarray(X, dtype=float)
+        U = np.asarray(U, dtype=float)
+        N = len(T)
+        if N == 0:
+            return
+
+        self._update_swingup(T, X)
+        self.max_tau = max(self.max_tau, np.max(np.abs(U)))
+
+        # prepend the last row of the previous chunk for the differences
+        if self._last is not None:
+            T = np.concatenate(([self._last[0]], T))
+            X = np.concatenate(([self._last[1]], X))
+            U = np.concatenate(([self._last[2]], U))
+        self._last = (T[-1], X[-1], U[-1])
+        self.n += N
+        if len(T) < 2:
+            return
+
+        delta_t = np.diff(T)
+        tau = U[:-1]
+        vel = X[:-1, 2:]
+        self.energy += np.sum(np.abs(np.diff(X[:, :2], axis=0) * tau))
+        self.integ_tau += np.sum(np.abs(tau) * delta_t[:, None])
+        self.tau_cost += np.einsum("ij,i,jk,ik", tau, delta_t, self.R, tau)
+        self.velocity_cost += np.einsum("ij,i,jk,ik", vel, delta_t, self.Q, vel)
+
+        # merge the statistics of the torque changes (Chan et al.)
+        du = np.diff(U, axis=0)
+        n_a, n_b = self._n_du, len(du)
+        mean_b = np.mean(du, axis=0)
+        delta = mean_b - self._du_mean
+        self._du_m2 += np.sum((du - mean_b) ** 2, axis=0) + delta**2 * (
+            n_a * n_b / (n_a + n_b)
+        )
+        self._du_mean += delta * n_b / (n_a + n_b)
+        self._n_du = n_a + n_b
+
+    def _update_swingup(self, T, X):
+        up = get_end_effector_height(X, self.mpar) > self.goal_height
+        if self._first_up_t is None and np.any(up):
+            self._first_up_t = T[np.argmax(up)]
+
+        # as in get_swingup_time, the first state does not count as upright
+        # for the has_to_stay criterion
+        if self.n == 0:
+            up[0] = False
+        prev_up = np.empty_like(up)
+        prev_up[0] = self._tail[-1][0] if len(self._tail) > 0 else False
+        prev_up[1:] = up[:-1]
+        run_start = np.where(up & ~prev_up, np.arange(len(up)), -1)
+        run_start = np.maximum.accumulate(run_start)
+        start_t = T[np.maximum(run_start, 0)]
+        if len(self._tail) > 0:
+            start_t = np.where(run_start < 0, self._tail[-1][1], start_t)
+        for i in range(max(len(T) - 2, 0), len(T)):
+            self._tail.append((up[i], start_t[i], T[i]))
+        self._tail = self._tail[-2:]
+
+    def get_metrics(self):
+        """
+        Get the criteria of the trajectory passed so far.
+
+        Returns
+        -------
+        dict
+            with keys "swingup_time", "success", "max_tau", "energy",
+            "integ_tau", "tau_cost", "tau_smoothness", "velocity_cost"
+            (see compute_leaderboard_metrics)
+        """
+        t_final = self._tail[-1][2]
+        swingup_time = t_final
+        if self.has_to_stay:
+            if self.n >= 3 and self._tail[0][0]:
+                swingup_time = self._tail[0][1]
+        elif self._first_up_t is not None:
+            swingup_time = self._first_up_t
+
+        if self._n_du > 0:
+            tau_smoothness = np.sum(np.sqrt(self._du_m2 / self._n_du))
+        else:
+            tau_smoothness = np.nan
+        return {
+            "swingup_time": np.float64(swingup_time),
+            "success": swingup_time < t_final,
+            "max_tau": np.float64(self.max_tau),
+            "energy": np.float64(self.energy),
+            "integ_tau": np.float64(self.integ_tau),
+            "tau_cost": np.float64(self.tau_cost),
+            "tau_smoothness": np.float64(tau_smoothness),
+            "velocity_cost": np.float64(self.velocity_cost),
+        }
+
+
+def stream_trajectory(csv_path, chunksize=100000):
+    """stream_trajectory.
+    Read the time, the measured states and the controller torques of a
+    trajectory csv file in chunks. Only these columns are parsed.
+    If the csv file has an up to date binary sibling (see
+    utils.csv_trajectory.convert_to_binary), the chunks are read from it.
+
+    Parameters
+    ----------
+    csv_path : string
+        path to the trajectory csv file
+    chunksize : int
+        number of rows per chunk
+        default: 100000
+
+    Yields
+    ------
+    tuple (T, X, U) of numpy arrays
+        time points with shape=(n,), measured states (X_meas) with
+        shape=(n, 4) and controller torques (U_con) with shape=(n, 2) of
+        a chunk of n rows
+    """
+    if os.path.splitext(csv_path)[1] == ".npz" or has_binary_trajectory(csv_path):
+        # memory mapped, only the chunks are read
+        T, X, U = Trajectory(csv_path).get("T", "X_meas", "U_con")
+        for i in range(0, len(T), chunksize):
+            yield T[i : i + chunksize], X[i : i + chunksize], U[i : i + chunksize]
+        return
+
+    columns = [
+        "time",
+        "pos_meas1",
+        "pos_meas2",
+        "vel_meas1",
+        "vel_meas2",
+        "tau_con1",
+        "tau_con2",
+    ]
+    reader = pd.read_csv(
+        csv_path, usecols=columns, chunksize=chunksize, dtype=np.float64
+    )
+    with reader:
+        for chunk in reader:
+            data = chunk[columns].to_numpy()
+            yield data[:, 0], data[:, 1:5], data[:, 5:7]
+
+
 def get_swingup_time(
     T,
     X,
@@ -434,24 +1045,8 @@ def get_swingup_time(
                 time_index = n[0]
         time = T[time_index]
     elif method == "height":
-        plant = SymbolicDoublePendulum(model_pars=mpar)
-        fk = plant.forward_kinematics(X.T[:2])
-        ee_pos_y = fk[1][1]
-
-        goal_height = height * (mpar.l[0] + mpar.l[1])
-
-        up = np.where(ee_pos_y > goal_height, True, False)
-
-        time_index = len(T) - 1
-        if has_to_stay:
-            for i in range(len(up) - 2, 0, -1):
-                if up[i]:
-                    time_index = i
-                else:
-                    break
-
-        else:
-            time_index = np.argwhere(up)[0][0]
+        up = get_end_effector_height(X, mpar) > height * (mpar.l[0] + mpar.l[1])
+        time_index = _swingup_index(up, has_to_stay)
         time = T[time_index]
 
     else:
@@ -17,6 +17,7 @@ from double_pendulum.simulation.gym_env import (
     double_pendulum_dynamics_func,
 )
 from double_pendulum.utils.wrap_angles import wrap_angles_diff
+from double_pendulum.controller.lqr.roa.ellipsoid import quadForm
 
 
 # define robot variation
@@ -73,8 +74,9 @@ S = np.loadtxt(os.path.join(load_path, "Smatrix"))
 
 
 def check_if_state_in_roa(S, rho, x):
+    # x can be a state or an array of states with shape=(..., 4)
     xdiff = x - np.array([np.pi, 0.0, 0.0, 0.0])
-    rad = np.einsum("i,ij,j", xdiff, S, xdiff)
+    rad = quadForm(S, xdiff)
     return rad < rho, rad
 
 
@@ -6,6 +6,7 @@ from double_pendulum.model.model_parameters import model_parameters
 from double_pendulum.simulation.simulation import Simulator
 from double_pendulum.controller.lqr.lqr_controller import LQRController
 from double_pendulum.controller.combined_controller import CombinedController
+from double_pendulum.controller.lqr.roa.ellipsoid import quadForm
 from double_pendulum.utils.plotting import plot_timeseries
 from double_pendulum.utils.wrap_angles import wrap_angles_top
 from double_pendulum.controller.DQN.DQN_controller import DQNController
@@ -65,7 +66,7 @@ def simulate(experiment_path, actions):
 
     def check_if_state_in_roa(S, rho, x):
         xdiff = x - np.array([np.pi, 0.0, 0.0, 0.0])
-        rad = np.einsum("i,ij,j", xdiff, S, xdiff)
+        rad = quadForm(S, xdiff)
         return rad < 1.0 * rho, rad
 
     def condition2(t, x):
@@ -297,6 +297,31 @@ class AbstractController(ABC):
         tau_fric = np.dot(friction_regressor_mat, self.friction_terms)
         return tau_fric
 
+    def get_friction_torque_batch(self, X):
+        """
+        Get the torques needed to compensate for friction for a batch of
+        states.
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        """
+        V = np.asarray(X, dtype=float)[:, 2:]
+        cf = self.friction_terms[[0, 2]]
+        b = self.friction_terms[[1, 3]]
+        return cf * np.arctan(100 * V) + b * V
+
     def set_gravity_compensation(self, plant=None):
         """
         Provide plant for gravity compensation.
@@ -334,3 +359,29 @@ class AbstractController(ABC):
         else:
             tau_grav = [0.0, 0.0]
         return np.asarray(tau_grav)
+
+    def get_gravity_torque_batch(self, X):
+        """
+        Get the torques needed to compensate for gravity for a batch of
+        states.
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        """
+        X = np.asarray(X, dtype=float)
+        if self.grav_plant is None:
+            return np.zeros((len(X), 2))
+        G = self.grav_plant.gravity_vector(X)
+        return -np.dot(G, np.transpose(self.grav_plant.B))
@@ -4,10 +4,29 @@ import numpy as np
 
 from double_pendulum.controller.abstract_controller import AbstractController
 from double_pendulum.controller.lqr.lqr import lqr
-from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.model.symbolic_plant import get_plant_template
 from double_pendulum.model.plant import DoublePendulumPlant
 
 
+def _lqr_control_output_batch(controller, X, Y):
+    # control inputs of an LQR controller for the states X with the wrapped
+    # angles Y (shape=(N, 4)), see get_control_output_batch
+    Y -= controller.xd
+
+    U = -Y.dot(np.asarray(controller.K).T)
+
+    cost_to_go = np.einsum("ij,jk,ik->i", Y, np.asarray(controller.S), Y)
+    U[cost_to_go > controller.cost_to_go_cut] = controller.failure_value
+
+    tl = np.asarray(controller.torque_limit, dtype=float)
+    U = np.clip(U, -tl, tl)
+
+    X = np.array(X, dtype=float, ndmin=2)
+    U += controller.get_friction_torque_batch(X)
+    U += controller.get_gravity_torque_batch(X)
+    return U
+
+
 class LQRController(AbstractController):
     """
     LQRController.
@@ -90,7 +109,7 @@ class LQRController(AbstractController):
             # self.gr = model_pars.gr
             self.torque_limit = model_pars.tl
 
-        self.splant = SymbolicDoublePendulum(
+        self.splant = get_plant_template(self.torque_limit).plant(
             mass=self.mass,
             length=self.length,
             com=self.com,
@@ -339,6 +358,37 @@ class LQRController(AbstractController):
         # print(x, u)
         return u
 
+    def get_control_output_batch(self, X, t=None):
+        """
+        Compute the control inputs for a batch of states at once.
+        Used by the BatchSimulator. Friction and gravity compensation are
+        added as in get_control_output, the filter and the histories of the
+        controller are not used.
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        t : float, optional
+            time, unit=[s]
+            (Default value=None)
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        """
+        Y = np.array(X, dtype=float, ndmin=2)
+
+        Y[:, 0] = (Y[:, 0] + np.pi - self.xd[0]) % (2 * np.pi) - (np.pi - self.xd[0])
+        Y[:, 1] = (Y[:, 1] + np.pi - self.xd[1]) % (2 * np.pi) - (np.pi - self.xd[1])
+        return _lqr_control_output_batch(self, X, Y)
+
     def save_(self, save_dir):
         """
         Save controller parameters
@@ -710,6 +760,36 @@ class LQRController_nonsymbolic(AbstractController):
 
         return u
 
+    def get_control_output_batch(self, X, t=None):
+        """
+        Compute the control inputs for a batch of states at once.
+        Used by the BatchSimulator. Friction and gravity compensation are
+        added as in get_control_output, the filter and the histories of the
+        controller are not used.
+
+        Parameters
+        ----------
+        X : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        t : float, optional
+            time, unit=[s]
+            (Default value=None)
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        """
+        Y = np.array(X, dtype=float, ndmin=2)
+        Y[:, 0] = Y[:, 0] % (2 * np.pi)
+        Y[:, 1] = (Y[:, 1] + np.pi) % (2 * np.pi) - np.pi
+        return _lqr_control_output_batch(self, X, Y)
+
     def save_(self, save_dir):
         """
         Save the energy trajectory to file.
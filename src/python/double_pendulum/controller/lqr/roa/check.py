@@ -1,8 +1,9 @@
 import numpy as np
 
-from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.model.symbolic_plant import get_plant_template
 from double_pendulum.controller.lqr.lqr_controller import LQRController
 from double_pendulum.simulation.simulation import Simulator
+from double_pendulum.simulation.batch_simulation import BatchSimulator
 
 
 # TODO: interface for combined optimization is defined 2 times
@@ -11,8 +12,25 @@ class lqr_check_ctg:
         self.tf = tf
         self.dt = dt
         self.sim = Simulator(plant=p)
+        self.batch_sim = BatchSimulator(plant=p)
         self.controller = c
 
+    def sim_callback_batch(self, X0):
+        """
+        Batched callback (batchSimFct) for the probabilitic RoA estimation
+        class. Returns one boolean per initial state.
+        """
+        with np.errstate(all="ignore"):
+            t, x, tau = self.batch_sim.simulate(
+                    t0=0.0,
+                    x0=X0,
+                    tf=self.tf,
+                    dt=self.dt,
+                    controller=self.controller,
+                    integrator="runge_kutta")
+
+        return ~np.all(np.isnan(x[:, -1]), axis=1)
+
     def sim_callback(self, x0):
         """
         Callback that is passed to the probabilitic RoA estimation class
@@ -70,14 +88,14 @@ def lqr_check_ctg_verification(dpar, cpar, x0, grid, idx1, idx2):
 
     goal = np.array([np.pi, 0., 0., 0.])
 
-    plant = SymbolicDoublePendulum(mass=mass,
-                                   length=length,
-                                   com=com,
-                                   damping=damping,
-                                   gravity=gravity,
-                                   coulomb_fric=cfric,
-                                   inertia=inertia,
-                                   torque_limit=torque_limit)
+    plant = get_plant_template(torque_limit).plant(mass=mass,
+                                                   length=length,
+                                                   com=com,
+                                                   damping=damping,
+                                                   gravity=gravity,
+                                                   coulomb_fric=cfric,
+                                                   inertia=inertia,
+                                                   torque_limit=torque_limit)
     dt = 0.01
     t_final = 5.0
 
@@ -127,14 +145,14 @@ def lqr_check_epsilon_verification(dpar, cpar, x0, grid, idx1,
 
     goal = np.array([np.pi, 0., 0., 0.])
 
-    plant = SymbolicDoublePendulum(mass=mass,
-                                   length=length,
-                                   com=com,
-                                   damping=damping,
-                                   gravity=gravity,
-                                   coulomb_fric=cfric,
-                                   inertia=inertia,
-                                   torque_limit=torque_limit)
+    plant = get_plant_template(torque_limit).plant(mass=mass,
+                                                   length=length,
+                                                   com=com,
+                                                   damping=damping,
+                                                   gravity=gravity,
+                                                   coulomb_fric=cfric,
+                                                   inertia=inertia,
+                                                   torque_limit=torque_limit)
 
     sim = Simulator(plant=plant)
     dt = 0.01
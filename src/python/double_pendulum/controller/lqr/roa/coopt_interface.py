@@ -1,19 +1,45 @@
 import numpy as np
 
-from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.model.symbolic_plant import get_plant_template
+from double_pendulum.model.plant import DoublePendulumPlant
 from double_pendulum.controller.lqr.lqr_controller import LQRController
-from double_pendulum.controller.lqr.roa.ellipsoid import quadForm, sampleFromEllipsoid, volEllipsoid
+from double_pendulum.controller.lqr.roa.ellipsoid import quadForm, sampleFromEllipsoid, sampleFromEllipsoidBatch, volEllipsoid
 from double_pendulum.controller.lqr.roa.roa_estimation import probTIROA, bisect_and_verify, rho_equalityConstrained
 from double_pendulum.controller.lqr.roa.check import lqr_check_ctg
 
 
-def najafi(plant, controller, S, n):
+def najafi(plant, controller, S, n, rng=None):
+    """
+    Sampling based estimation of the RoA of the LQR controller: rho is
+    shrunk to V of every sample in the sublevel set which violates the
+    Lyapunov condition Vdot < 0.
+
+    Parameters
+    ----------
+    plant : plant object
+        plant with rhs(t, x, tau)
+    controller : controller object
+        controller with get_control_output
+    S : numpy_array, shape=(4, 4)
+        cost to go matrix, V = x_bar^T S x_bar
+    n : int
+        number of samples
+    rng : numpy.random.Generator
+        generator for the samples, the global numpy random state is used
+        if None
+        (Default value = None)
+
+    Returns
+    -------
+    float
+        estimated rho
+    """
     x_star = np.array([np.pi, 0.0, 0.0, 0.0])
     rho = 10
     for i in range(n):
         # sample initial state from sublevel set
         # check if it fullfills Lyapunov conditions
-        x_bar = sampleFromEllipsoid(S, rho)
+        x_bar = sampleFromEllipsoid(S, rho, rng=rng)
         x = x_star+x_bar
 
         tau = controller.get_control_output(x)
@@ -31,13 +57,92 @@ def najafi(plant, controller, S, n):
     return rho
 
 
-def najafi_direct(plant, controller, S, n):
+def najafi_batch(plant, controller, S, n, block_size=1000, rng=None):
+    """
+    Batched version of the najafi estimation.
+    The n samples are drawn in blocks of block_size samples from the current
+    sublevel set. The control inputs and the dynamics are evaluated for the
+    whole block and rho is shrunk to the smallest V of the samples in the
+    block which violate the Lyapunov condition (Vdot > 0).
+    With block_size=1 this is the sequential najafi method.
+
+    Parameters
+    ----------
+    plant : plant object
+        plant with vectorized rhs (e.g. DoublePendulumPlant), other
+        plants are evaluated sample by sample
+    controller : controller object
+        controller with get_control_output_batch (e.g. LQRController),
+        otherwise get_control_output is called for every sample
+    S : numpy_array, shape=(4, 4)
+        cost to go matrix
+    n : int
+        total number of samples
+    block_size : int
+        number of samples per block
+        (Default value = 1000)
+    rng : numpy.random.Generator
+        all blocks are sampled from this generator, None falls back to the
+        global numpy random state
+        (Default value = None)
+
+    Returns
+    -------
+    float
+        estimated rho
+    """
+    x_star = np.array([np.pi, 0.0, 0.0, 0.0])
+    rho = 10
+    for i in range(0, n, block_size):
+        m = min(block_size, n - i)
+        x_bar = sampleFromEllipsoidBatch(S, rho, m, rng=rng)
+        x = x_star + x_bar
+
+        if hasattr(controller, "get_control_output_batch"):
+            tau = controller.get_control_output_batch(x)
+        else:
+            tau = np.array([controller.get_control_output(xx) for xx in x])
+
+        if isinstance(plant, DoublePendulumPlant):
+            xdot = plant.rhs(0, x, tau)
+        else:
+            xdot = np.array([plant.rhs(0, xx, uu) for xx, uu in zip(x, tau)])
+
+        V = np.einsum("ij,jk,ik->i", x_bar, S, x_bar)
+        Vdot = 2*np.einsum("ij,jk,ik->i", x_bar, S, xdot)
+
+        violating = (V < rho) & (Vdot > 0.0)
+        if np.any(violating):
+            # if one of the lyapunov conditions is not satisfied
+            rho = np.min(V[violating])
+
+    return rho
+
+
+def najafi_direct(plant, controller, S, n, rng=None):
+    """
+    Variant of najafi which only checks Vdot > 0, as the samples are
+    drawn from the sublevel set V < rho.
+
+    Parameters
+    ----------
+    plant, controller, S, n :
+        see najafi
+    rng : numpy.random.Generator
+        as in najafi
+        (Default value = None)
+
+    Returns
+    -------
+    float
+        estimated rho
+    """
     x_star = np.array([np.pi, 0.0, 0.0, 0.0])
     rho = 10
     for i in range(n):
         # sample initial state from sublevel set
         # check if it fullfills Lyapunov conditions
-        x_bar = sampleFromEllipsoid(S, rho)
+        x_bar = sampleFromEllipsoid(S, rho, rng=rng)
         x = x_star+x_bar
 
         tau = controller.get_control_output(x)
@@ -61,7 +166,8 @@ def najafi_direct(plant, controller, S, n):
 class caprr_coopt_interface:
     def __init__(self, design_params, Q, R, backend="sos_con",
                  log_obj_fct=False, verbose=False,
-                 estimate_clbk=None, najafi_evals=10000, robot = "acrobot"):
+                 estimate_clbk=None, najafi_evals=10000, robot = "acrobot",
+                 najafi_block_size=1000, prob_batch_size=1):
         """
         Object for design/parameter co-optimization.
         It helps keeping track of design parameters during cooptimization.
@@ -82,6 +188,16 @@ class caprr_coopt_interface:
                         The computational time is very long for obtaining a good estimation.
 
         `robot` must be `acrobot` or `pendubot` depending on the underactuated system that we are considering.
+
+        `najafi_block_size` is the number of samples which are evaluated at once
+        by the `najafi` backend (see najafi_batch).
+
+        `prob_batch_size` is the number of initial states which are simulated
+        at once by the `prob` backend (see probTIROA.doEstimate). The default
+        of 1 simulates the states one by one as before. rho is only shrunk
+        once per batch, so with larger batches fewer shrinking steps are done
+        for the same number of simulations and the estimated rho is biased
+        upwards (too large). Batching is therefore opt-in.
         """
         # robot type
         self.robot = robot
@@ -121,6 +237,8 @@ class caprr_coopt_interface:
 
         # number of evals for the najafi method
         self.najafi_evals = najafi_evals
+        self.najafi_block_size = najafi_block_size
+        self.prob_batch_size = prob_batch_size
 
     def combined_opt_obj(self, y_comb):
         """
@@ -290,8 +408,9 @@ class caprr_coopt_interface:
                     self.verification_hyper_params["lambda_deg"],
                     verbose=self.verbose)
 
-        if self.backend == "prob" or self.backend == "najafi":
-            plant = SymbolicDoublePendulum(
+        if self.backend == "prob":
+            template = get_plant_template(self.design_params["tau_max"])
+            plant = template.plant(
                        mass=self.design_params["m"],
                        length=self.design_params["l"],
                        com=self.design_params["lc"],
@@ -301,29 +420,41 @@ class caprr_coopt_interface:
                        inertia=self.design_params["I"],
                        torque_limit=self.design_params["tau_max"])
 
-            if self.backend == "prob":
-                eminem = lqr_check_ctg(plant, self.controller)
-                conf = {"x0Star": np.array([np.pi, 0.0, 0.0, 0.0]),
-                        "S": self.S,
-                        "xBar0Max": np.array([+0.5, +0.0, 0.0, 0.0]),
-                        "nSimulations": 250
-                        }
-
-                # create estimation object
-                estimator = probTIROA(conf, eminem.sim_callback)
-                # set random seed for reproducability
-                np.random.seed(250)
-                # do the actual estimation
-                rho_hist, simSuccesHist = estimator.doEstimate()
-                rho_f = rho_hist[-1]
-
-            if self.backend == "najafi":
-                # np.random.seed(250)
-                rho_f = najafi(plant,
-                               self.controller,
-                               self.S,
-                               self.najafi_evals)
-                # print(rho_f)
+            eminem = lqr_check_ctg(plant, self.controller)
+            conf = {"x0Star": np.array([np.pi, 0.0, 0.0, 0.0]),
+                    "S": self.S,
+                    "xBar0Max": np.array([+0.5, +0.0, 0.0, 0.0]),
+                    "nSimulations": 250
+                    }
+
+            # create estimation object
+            # (fixed seed for reproducability)
+            estimator = probTIROA(conf, eminem.sim_callback,
+                                  rng=np.random.default_rng(250),
+                                  batchSimFct=eminem.sim_callback_batch)
+            # do the actual estimation
+            rho_hist, simSuccesHist = estimator.doEstimate(
+                    batchSize=self.prob_batch_size)
+            rho_f = rho_hist[-1]
+
+        if self.backend == "najafi":
+            # np.random.seed(250)
+            # the numerical plant evaluates the dynamics of a whole block
+            plant = DoublePendulumPlant(
+                       mass=self.design_params["m"],
+                       length=self.design_params["l"],
+                       com=self.design_params["lc"],
+                       damping=self.design_params["b"],
+                       gravity=self.design_params["g"],
+                       coulomb_fric=self.design_params["fc"],
+                       inertia=self.design_params["I"],
+                       torque_limit=self.design_params["tau_max"])
+            rho_f = najafi_batch(plant,
+                                 self.controller,
+                                 self.S,
+                                 self.najafi_evals,
+                                 block_size=self.najafi_block_size)
+            # print(rho_f)
 
         vol = volEllipsoid(rho_f, self.S)
 
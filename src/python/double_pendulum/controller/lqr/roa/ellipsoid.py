@@ -4,42 +4,174 @@ import matplotlib.pyplot as plt
 from matplotlib import patches
 
 
-def directSphere(d, r_i=0, r_o=1):
+def directSphereBatch(d, n, r_i=0, r_o=1, rng=None):
     """
-    Implementation: Krauth, Werner. Statistical Mechanics: Algorithms and
-    Computations. Oxford Master Series in Physics 13. Oxford: Oxford University
-    Press, 2006. page 42
+    Draw n samples at once from the shell between r_i and r_o of the
+    d dimensional unit ball (see directSphere).
+
+    Parameters
+    ----------
+    d : int
+        dimension
+    n : int
+        number of samples
+    r_i : float
+        inner radius of the shell
+        (Default value = 0)
+    r_o : float
+        outer radius of the shell
+        (Default value = 1)
+    rng : numpy.random.Generator
+        source of the random numbers, None draws from the global numpy
+        random state
+        (Default value = None)
+
+    Returns
+    -------
+    numpy_array
+        shape=(n, d), samples
     """
-    # vector of univariate gaussians:
-    rand = np.random.normal(size=d)
-    # get its euclidean distance:
-    dist = np.linalg.norm(rand, ord=2)
-    # divide by norm
-    normed = rand/dist
+    if rng is None:
+        rng = np.random
+    # vectors of univariate gaussians divided by their euclidean norm
+    rand = rng.normal(size=(n, d))
+    normed = rand/np.linalg.norm(rand, ord=2, axis=1, keepdims=True)
 
     # sample the radius uniformly from 0 to 1
-    rad = np.random.uniform(r_i, r_o**d)**(1/d)
+    rad = rng.uniform(r_i, r_o**d, size=n)**(1/d)
     # the r**d part was not there in the original implementation.
     # I added it in order to be able to change the radius of the sphere
     # multiply with vect and return
-    return normed*rad
+    return normed*rad[:, np.newaxis]
+
+
+def directSphere(d, r_i=0, r_o=1, rng=None):
+    """
+    Implementation: Krauth, Werner. Statistical Mechanics: Algorithms and
+    Computations. Oxford Master Series in Physics 13. Oxford: Oxford University
+    Press, 2006. page 42
+
+    Parameters
+    ----------
+    d : int
+        dimension
+    r_i : float
+        inner radius of the shell
+        (Default value = 0)
+    r_o : float
+        outer radius of the shell
+        (Default value = 1)
+    rng : numpy.random.Generator
+        generator for the sample, as in directSphereBatch
+        (Default value = None)
+
+    Returns
+    -------
+    numpy_array
+        shape=(d,), sample
+    """
+    return directSphereBatch(d, 1, r_i=r_i, r_o=r_o, rng=rng)[0]
 
 
 def quadForm(M, x):
     """
     Helper function to compute quadratic forms such as x^TMx
+    x and M can be stacked, i.e. have the shapes (..., d) and (..., d, d)
     """
-    return np.dot(x, np.dot(M, x))
+    return np.einsum("...i,...ij,...j->...", x, M, x)
+
+
+# ellipsoid transformations per matrix (see ellipsoidTransform)
+_ellipsoid_transforms = {}
 
 
-def sampleFromEllipsoid(S, rho, rInner=0, rOuter=1):
-    lamb, eigV = np.linalg.eigh(S/rho)
+def ellipsoidTransform(S):
+    """
+    Matrix T which maps the unit sphere to the ellipsoid x^T S x = 1,
+    i.e. T^T S T = I. T = L^-T with the Cholesky factor S = L L^T.
+    The transformation is cached per S.
+    """
+    S = np.asarray(S, dtype=float)
+    key = (S.shape, S.tobytes())
+    T = _ellipsoid_transforms.get(key)
+    if T is None:
+        try:
+            T = np.linalg.inv(np.linalg.cholesky(S)).T
+        except np.linalg.LinAlgError:
+            # not positive definite, nan for negative eigenvalues as before
+            lamb, eigV = np.linalg.eigh(S)
+            T = eigV/np.sqrt(lamb)
+        if len(_ellipsoid_transforms) >= 128:
+            _ellipsoid_transforms.clear()
+        _ellipsoid_transforms[key] = T
+    return T
+
+
+def sampleFromEllipsoid(S, rho, rInner=0, rOuter=1, rng=None):
+    """
+    Draw a sample from the shell between rInner and rOuter of the
+    ellipsoid x^T S x < rho (see sampleFromEllipsoidBatch).
+
+    Parameters
+    ----------
+    S : numpy_array, shape=(d, d)
+        ellipsoid matrix
+    rho : float
+        level of the ellipsoid
+    rInner : float
+        relative inner radius of the shell
+        (Default value = 0)
+    rOuter : float
+        relative outer radius of the shell
+        (Default value = 1)
+    rng : numpy.random.Generator
+        random number generator, the global numpy random state if None
+        (Default value = None)
+
+    Returns
+    -------
+    numpy_array
+        shape=(d,), sample
+    """
+    return sampleFromEllipsoidBatch(S, rho, 1, rInner=rInner, rOuter=rOuter,
+                                    rng=rng)[0]
+
+
+def sampleFromEllipsoidBatch(S, rho, n, rInner=0, rOuter=1, rng=None):
+    """
+    Draw n samples at once from the shell between rInner and rOuter of the
+    ellipsoid x^T S x < rho. Same distribution as sampleFromEllipsoid.
+
+    Parameters
+    ----------
+    S : numpy_array, shape=(d, d)
+        ellipsoid matrix
+    rho : float
+        level of the ellipsoid
+    n : int
+        number of samples
+    rInner : float
+        relative inner radius of the shell
+        (Default value = 0)
+    rOuter : float
+        relative outer radius of the shell
+        (Default value = 1)
+    rng : numpy.random.Generator
+        generator for the samples, with None the samples are drawn from the
+        global numpy random state
+        (Default value = None)
+
+    Returns
+    -------
+    numpy_array
+        shape=(n, d), samples
+    """
     d = len(S)
-    xy = directSphere(d, r_i=rInner, r_o=rOuter)  # sample from outer shells
+    xy = directSphereBatch(d, n, r_i=rInner, r_o=rOuter, rng=rng)  # sample from outer shells
     # transform sphere to ellipsoid
     # (refer to e.g. boyd lectures on linear algebra)
-    T = np.linalg.inv(np.dot(np.diag(np.sqrt(lamb)), eigV.T))
-    return np.dot(T, xy.T).T
+    T = ellipsoidTransform(S)*np.sqrt(rho)
+    return np.dot(xy, T.T)
 
 
 def volEllipsoid(rho, M):
@@ -49,21 +181,25 @@ def volEllipsoid(rho, M):
     https://math.stackexchange.com/questions/332391/volume-of-hyperellipsoid/332434
     Intuition: https://textbooks.math.gatech.edu/ila/determinants-volumes.html
     Volume of n-Ball https://en.wikipedia.org/wiki/Volume_of_an_n-ball
+
+    rho and M can be stacked, i.e. have the shapes (...) and (..., d, d)
     """
 
-    # For a given hyperellipsoid, find the transformation that when applied to
-    # the n Ball yields the hyperellipsoid
-    lamb, eigV = np.linalg.eigh(M/rho)
-    A = np.dot(np.diag(np.sqrt(lamb)), eigV.T)  # transform ellipsoid to sphere
-    detA = np.linalg.det(A)
+    # For a given hyperellipsoid, the transformation A which maps it to the
+    # n Ball has det(A) = sqrt(det(M/rho))
+    M = np.asarray(M)
+    d = M.shape[-1]  # dimension
+    sign, logdetM = np.linalg.slogdet(M)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        logdetA = 0.5*(logdetM - d*np.log(rho))
+    logdetA = np.where(sign < 0, np.nan, logdetA)
 
     # Volume of n Ball (d dimensions)
-    d = M.shape[0]  # dimension
     volC = (np.pi**(d/2)) / (gamma((d/2)+1))
 
     # Volume of Ellipse
-    volE = volC/detA
-    return volE
+    volE = volC*np.exp(-logdetA)
+    return volE[()]
 
 
 """
@@ -1,10 +1,45 @@
 import numpy as np
 
-from double_pendulum.utils.wrap_angles import wrap_angles_top, wrap_angles_diff
+from double_pendulum.utils.wrap_angles import wrap_angles_top
 from double_pendulum.controller.lqr.roa.ellipsoid import (quadForm,
                                                           sampleFromEllipsoid,
+                                                          sampleFromEllipsoidBatch,
                                                           volEllipsoid)
 from double_pendulum.utils.plotting import plot_timeseries
+from double_pendulum.simulation.termination import LeftEpsilonTube
+from double_pendulum.simulation.batch_simulation import BatchSimulator
+
+
+def is_deterministic(simulator):
+    """
+    Whether the simulations of the simulator are deterministic, i.e.
+    process, measurement and motor noise are off.
+    """
+    sigmas = [simulator.process_noise_sigmas,
+              simulator.meas_noise_sigmas,
+              simulator.u_noise_sigmas]
+    return all(np.all(np.asarray(s) == 0.0) for s in sigmas)
+
+
+def _batch_simulator(simulator):
+    # BatchSimulator with the noise, measurement, motor, disturbance and
+    # random generator settings of the simulator
+    if isinstance(simulator, BatchSimulator):
+        return simulator
+    batch_simulator = BatchSimulator(simulator.plant)
+    batch_simulator.set_process_noise(simulator.process_noise_sigmas)
+    batch_simulator.set_measurement_parameters(
+        C=simulator.meas_C,
+        D=simulator.meas_D,
+        meas_noise_sigmas=simulator.meas_noise_sigmas,
+        delay=simulator.delay,
+        delay_mode=simulator.delay_mode)
+    batch_simulator.set_motor_parameters(
+        u_noise_sigmas=simulator.u_noise_sigmas,
+        u_responsiveness=simulator.u_responsiveness)
+    batch_simulator.set_disturbances(simulator.perturbation_array)
+    batch_simulator.set_random_generator(simulator.rng)
+    return batch_simulator
 
 
 def check_x0(simulator, controller, x0, dt, t_final,
@@ -14,20 +49,45 @@ def check_x0(simulator, controller, x0, dt, t_final,
 
     controller.init()
     simulator.reset_data_recorder()
+    # the simulation stops as soon as the state leaves the epsilon tube
     T, X, U = simulator.simulate(
                 t0=0.0, x0=x0,
                 tf=t_final, dt=dt, controller=controller,
-                integrator=integrator)
-
-    valid = True
-    for x in X:
-        err = np.array(x) - goal
-        err = wrap_angles_diff(err)
-        err = np.abs(err)
-        if np.max(err - eps) > 0.:
-            valid = False
-            #print("stabilization failed", x, err, err-eps)
-            break
+                integrator=integrator,
+                termination=[LeftEpsilonTube(goal, eps)])
+
+    valid = simulator.stop_reason is None
+    return valid
+
+
+def check_x0_batch(simulator, controller, X0, dt, t_final,
+                   integrator="runge_kutta",
+                   goal=np.array([np.pi, 0., 0., 0.]),
+                   eps=np.array([1., 1., 10.0, 10.0])):
+    """
+    Batched version of check_x0. All initial states are simulated at once
+    with a BatchSimulator until all states left the epsilon tube around
+    the goal or t_final is reached.
+
+    Returns a boolean array with shape=(N,), True for the initial states
+    which stayed within the tube.
+    """
+    controller.init()
+    simulator.set_state(0.0, X0)
+    simulator.reset_data_recorder(int(np.ceil(t_final / dt)) + 2)
+    simulator.record_data(0.0, np.copy(simulator.x), None)
+
+    def in_tube(x):
+        err = np.asarray(x) - goal
+        err[:, :2] = (err[:, :2] + np.pi) % (2 * np.pi) - np.pi
+        return np.all(np.abs(err) <= eps, axis=1)
+
+    valid = in_tube(simulator.x)
+    # diverging rollouts are simulated until all rollouts failed
+    with np.errstate(all="ignore"):
+        while simulator.t < t_final and np.any(valid):
+            simulator.controller_step(dt, controller, integrator)
+            valid &= in_tube(simulator.x)
     return valid
 
 
@@ -36,14 +96,63 @@ def compute_roa_prob(simulator, controller, dt, t_final,
                      goal=np.array([np.pi, 0., 0., 0.]),
                      eps=np.array([1., 1., 10.0, 10.0]),
                      n_iter=1000, n_check_sims=5,
-                     xbar_max=np.array([1., 1., 1., 1.])):
+                     xbar_max=np.array([1., 1., 1., 1.]),
+                     rng=None):
+    """
+    Probabilistic RoA estimation. Initial states are sampled from the
+    current estimate x^T S x < rho and simulated one after another
+    (n_check_sims times each if the simulator has noise). rho is shrunk to
+    the cost to go of every initial state which leaves the epsilon tube
+    around the goal.
+
+    Parameters
+    ----------
+    simulator : Simulator
+        simulator of the plant
+    controller : controller object
+        controller with the cost to go matrix S (e.g. LQRController)
+    dt : float
+        timestep, unit=[s]
+    t_final : float
+        simulation time per initial state, unit=[s]
+    integrator : string
+        "euler" or "runge_kutta"
+        (Default value = "runge_kutta")
+    goal : numpy_array, shape=(4,)
+        goal state
+        (Default value = [pi, 0, 0, 0])
+    eps : numpy_array, shape=(4,)
+        half width of the tube around the goal
+        (Default value = [1, 1, 10, 10])
+    n_iter : int
+        number of sampled initial states
+        (Default value = 1000)
+    n_check_sims : int
+        number of simulations per initial state, only used with noise
+        (Default value = 5)
+    xbar_max : numpy_array, shape=(4,)
+        unused
+    rng : numpy.random.Generator
+        generator for sampling the initial states, None samples from the
+        global numpy random state
+        (Default value = None)
+
+    Returns
+    -------
+    float
+        volume of the estimated RoA
+    """
 
     S = np.asarray(controller.S)
     #rho = float(quadForm(S, xbar_max))
     rho = 1.
 
+    # repeated simulations only make a difference with noise
+    if is_deterministic(simulator):
+        n_check_sims = 1
+
     for i in range(n_iter):
-        x0_err = sampleFromEllipsoid(S, rho)
+        x0_err = sampleFromEllipsoid(S, rho, rng=rng)
         x0 = wrap_angles_top(x0_err - goal)
 
         valid = True
@@ -67,14 +176,107 @@ def compute_roa_prob(simulator, controller, dt, t_final,
     return vol
 
 
+def compute_roa_prob_batch(simulator, controller, dt, t_final,
+                           integrator="runge_kutta",
+                           goal=np.array([np.pi, 0., 0., 0.]),
+                           eps=np.array([1., 1., 10.0, 10.0]),
+                           n_iter=1000, n_check_sims=5,
+                           batch_size=100,
+                           rng=None):
+    """
+    Probabilistic RoA estimation with batched rollouts.
+    In every round batch_size initial states are sampled from the current
+    estimate and simulated at once (n_check_sims times each if the
+    simulator has noise). rho is shrunk to the smallest cost to go of the
+    initial states which failed in the round.
+
+    Parameters
+    ----------
+    simulator : BatchSimulator
+        a Simulator is replaced by a BatchSimulator of the same plant with
+        the same noise, measurement, motor and disturbance settings
+    controller : controller object
+        controller with get_control_output_batch (e.g. LQRController)
+    dt, t_final, integrator, goal, eps, n_check_sims :
+        see compute_roa_prob
+    n_iter : int
+        total number of sampled initial states
+        (Default value = 1000)
+    batch_size : int
+        number of initial states per round
+        (Default value = 100)
+    rng : numpy.random.Generator
+        the initial states of all rounds are drawn from this generator,
+        from the global numpy random state if None
+        (Default value = None)
+
+    Returns
+    -------
+    float
+        volume of the estimated RoA
+    list of floats
+        history of rho (initial rho and rho after every round)
+    """
+    simulator = _batch_simulator(simulator)
+    if is_deterministic(simulator):
+        n_check_sims = 1
+
+    S = np.asarray(controller.S)
+    rho = 1.
+    rho_hist = [rho]
+
+    for i in range(0, n_iter, batch_size):
+        n = min(batch_size, n_iter - i)
+        x0_err = sampleFromEllipsoidBatch(S, rho, n, rng=rng)
+        x0 = wrap_angles_top(x0_err - goal)
+
+        valid = check_x0_batch(simulator,
+                               controller,
+                               np.tile(x0, (n_check_sims, 1)),
+                               dt,
+                               t_final,
+                               integrator,
+                               goal,
+                               eps)
+        valid = np.all(valid.reshape(n_check_sims, n), axis=0)
+
+        if not np.all(valid):
+            # shrink ellipse
+            V = np.einsum("ij,jk,ik->i", x0_err[~valid], S, x0_err[~valid])
+            rho = min(rho, float(np.min(V)))
+        rho_hist.append(rho)
+    vol = volEllipsoid(rho, S)
+    return vol, rho_hist
+
+
 class roa_prob_loss():
+    """
+    Loss for the optimization of the LQR cost parameters: the negative
+    volume of the probabilistic RoA estimate.
+
+    Parameters
+    ----------
+    simulator, controller, dt, t_final, integrator, goal, eps, n_iter,
+    n_check_sims :
+        see compute_roa_prob
+    bounds : numpy_array, shape=(n, 2)
+        bounds of the cost parameters, the loss is called with parameters
+        scaled to [0, 1]
+    rng : numpy.random.Generator
+        passed on to every RoA estimation, i.e. consecutive calls
+        continue the random stream of this generator
+        (Default value = None)
+    batch_size : int
+        if not None, the RoA is estimated with batched rollouts
+        (see compute_roa_prob_batch)
+        (Default value = None)
+    """
     def __init__(self,
                  simulator, controller, dt, t_final, integrator,
                  bounds,
                  goal=np.array([np.pi, 0., 0., 0.]),
                  eps=np.array([1., 1., 10.0, 10.0]),
-                 n_iter=1000, n_check_sims=5):
-
+                 n_iter=1000, n_check_sims=5, rng=None, batch_size=None):
         self.simulator = simulator
         self.controller = controller
         self.dt = dt
@@ -85,6 +287,8 @@ class roa_prob_loss():
         self.eps = eps
         self.n_iter = n_iter
         self.n_check_sims = n_check_sims
+        self.rng = rng
+        self.batch_size = batch_size
 
     def __call__(self, costs):
 
@@ -93,6 +297,20 @@ class roa_prob_loss():
         self.controller.set_cost_parameters_(real_costs)
         self.controller.init()
 
+        if self.batch_size is not None:
+            vol, _ = compute_roa_prob_batch(self.simulator,
+                                            self.controller,
+                                            self.dt,
+                                            self.t_final,
+                                            self.integrator,
+                                            self.goal,
+                                            self.eps,
+                                            self.n_iter,
+                                            self.n_check_sims,
+                                            self.batch_size,
+                                            rng=self.rng)
+            return -vol
+
         vol = compute_roa_prob(self.simulator,
                                self.controller,
                                self.dt,
@@ -101,7 +319,8 @@ class roa_prob_loss():
                                self.goal,
                                self.eps,
                                self.n_iter,
-                               self.n_check_sims)
+                               self.n_check_sims,
+                               rng=self.rng)
 
         return -vol
 
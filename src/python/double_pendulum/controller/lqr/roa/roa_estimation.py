@@ -4,7 +4,8 @@ from pydrake.solvers.csdp import CsdpSolver
 from pydrake.symbolic import Variables
 import pydrake.symbolic as sym
 
-from double_pendulum.controller.lqr.roa.ellipsoid import quadForm, sampleFromEllipsoid
+from double_pendulum.controller.lqr.roa.ellipsoid import quadForm, sampleFromEllipsoid, sampleFromEllipsoidBatch
+from double_pendulum.utils.cache import hash_key
 
 
 class probTIROA:
@@ -24,13 +25,30 @@ class probTIROA:
         stabilizing controllers> "nSimulations": <number of simulations> }
 
     TODO: generalize for non LQR systems -> V instead of S
+
+    Parameters
+    ----------
+    roaConf : dict
+        configuration, see above
+    simFct : function
+        simulation callback, takes an initial state with shape=(4,) and
+        returns True for a successful simulation
+    rng : numpy.random.Generator
+        generator for the initial states, the global numpy random state is
+        sampled if None
+        (Default value = None)
+    batchSimFct : function
+        batch simulation callback, see doEstimate
+        (Default value = None)
     """
-    def __init__(self, roaConf, simFct):
+    def __init__(self, roaConf, simFct, rng=None, batchSimFct=None):
         self.x0Star = roaConf["x0Star"]
         self.xBar0Max = roaConf["xBar0Max"]
         self.S = roaConf["S"]
         self.nSims = roaConf["nSimulations"]
         self.simClbk = simFct
+        self.batchSimClbk = batchSimFct
+        self.rng = rng
 
         self.rhoHist = []
         self.simSuccessHist = []
@@ -38,10 +56,34 @@ class probTIROA:
         rho0 = quadForm(self.S, self.xBar0Max)
         self.rhoHist.append(rho0)
 
-    def doEstimate(self):
+    def doEstimate(self, batchSize=1):
+        """
+        With batchSize > 1 the initial states are sampled and simulated in
+        rounds of batchSize states with the batch callback (batchSimFct,
+        takes an array of initial states with shape=(N, 4) and returns an
+        array of N booleans). All states of a round are sampled from the
+        estimate of the previous round, which ends with the smallest cost
+        to go of the failed states of the round.
+
+        Parameters
+        ----------
+        batchSize : int
+            number of initial states per round
+            (Default value = 1)
+
+        Returns
+        -------
+        list of floats
+            history of rho, one entry per simulation after the initial rho
+        list of bools
+            success of the simulations
+        """
+        if batchSize > 1 and self.batchSimClbk is not None:
+            return self._doEstimateBatch(batchSize)
+
         for sim in range(self.nSims):
             # sample initial state from previously estimated RoA
-            x0Bar = sampleFromEllipsoid(self.S, self.rhoHist[-1])
+            x0Bar = sampleFromEllipsoid(self.S, self.rhoHist[-1], rng=self.rng)
             JStar0 = quadForm(self.S, x0Bar)  # calculate cost to go
             x0 = self.x0Star+x0Bar  # error to absolute coords
 
@@ -56,6 +98,26 @@ class probTIROA:
 
         return self.rhoHist, self.simSuccessHist
 
+    def _doEstimateBatch(self, batchSize):
+        for sim in range(0, self.nSims, batchSize):
+            n = min(batchSize, self.nSims - sim)
+            rho = self.rhoHist[-1]
+            x0Bar = sampleFromEllipsoidBatch(self.S, rho, n, rng=self.rng)
+            JStar0 = np.einsum("ij,jk,ik->i", x0Bar, self.S, x0Bar)
+            x0 = self.x0Star+x0Bar
+
+            simSuccess = np.asarray(self.batchSimClbk(x0), dtype=bool)
+
+            # one history entry per simulation, the failures of the round
+            # shrink rho one after another
+            for success, J in zip(simSuccess, JStar0):
+                if not success:
+                    rho = min(rho, J)
+                self.rhoHist.append(rho)
+                self.simSuccessHist.append(bool(success))
+
+        return self.rhoHist, self.simSuccessHist
+
 
 def SosDoublePendulumDynamics(params,x, u, u_minus_vec, u_plus_vec, lib, robot = "acrobot"):
 
@@ -305,24 +367,179 @@ def verify_double_pendulum_rho(rho, params, S, K, robot, taylor_deg=3,
     return result.is_success()
 
 
+# Taylor expanded open loop dynamics per design (see sos_taylor_dynamics)
+_sos_dynamics_cache = {}
+
+
+def sos_taylor_dynamics(params, robot, taylor_deg=3):
+    """
+    Taylor expansion of the open loop accelerations around the upright
+    position in error coordinates x_bar. The accelerations are affine in
+    the motor torques, qdd = a(x_bar) + b(x_bar) u, and the expansions of
+    a and b are cached per design, so that closed loop dynamics for
+    different controllers are composed without new Taylor expansions.
+
+    Returns
+    -------
+    numpy_array of symbolic Variables
+        x_bar, shape=(4,)
+    numpy_array of symbolic Expressions
+        a, expanded to taylor_deg, shape=(2,)
+    numpy_array of symbolic Expressions
+        b, expanded to taylor_deg, shape=(2, 2)
+    numpy_array of symbolic Expressions
+        b, expanded to taylor_deg-1, shape=(2, 2)
+        (for inputs which are linear in x_bar)
+    """
+    key = hash_key(robot, taylor_deg,
+                   [params[k] for k in ["I", "m", "l", "lc", "b", "fc", "g"]])
+    if key not in _sos_dynamics_cache:
+        x_bar = np.array([sym.Variable(f"x_bar({i})") for i in range(4)])
+        x_star = np.array([np.pi, 0, 0, 0])
+        x = x_star+x_bar
+        f_0, f_e1, f_e2 = SosDoublePendulumDynamics(params, x,
+                                                    np.zeros(2),
+                                                    np.array([1., 0.]),
+                                                    np.array([0., 1.]),
+                                                    sym, robot)
+        env = {xb: 0 for xb in x_bar}
+
+        def taylor(f, order):
+            if order < 0:
+                return sym.Expression(0)
+            return sym.TaylorExpand(f=f, a=env, order=order)
+
+        a = np.array([taylor(f_0[i], taylor_deg) for i in range(2)])
+        b = np.array([[taylor(f_e[i] - f_0[i], taylor_deg)
+                       for f_e in [f_e1, f_e2]] for i in range(2)])
+        b_low = np.array([[taylor(f_e[i] - f_0[i], taylor_deg-1)
+                           for f_e in [f_e1, f_e2]] for i in range(2)])
+        _sos_dynamics_cache[key] = (x_bar, a, b, b_low)
+    return _sos_dynamics_cache[key]
+
+
+class SosRoaVerifier:
+    """
+    SOS verification of sublevel sets V(x_bar) < rho of the LQR cost to go
+    (same formulation as verify_double_pendulum_rho).
+    The Taylor expansions of the dynamics are cached per design (see
+    sos_taylor_dynamics) and the Lyapunov derivatives and saturation
+    conditions are composed once per (design, K, S). The
+    MathematicalProgram with its multipliers and SOS constraints is still
+    built and solved from scratch for every rho, as rho multiplies the
+    multipliers and can not be a decision variable of the (convex)
+    feasibility problem.
+
+    Parameters
+    ----------
+    params : dict
+        design parameters (I, m, l, lc, b, fc, g, tau_max)
+    S : numpy_array, shape=(4, 4)
+        cost to go matrix
+    K : numpy_array, shape=(2, 4)
+        feedback gain
+    robot : string
+        "acrobot" or "pendubot"
+    taylor_deg : int
+        degree of the taylor approximation
+    lambda_deg : int
+        degree of SOS lagrange multipliers
+    mode : int
+        0: unconstrained dynamics, 2: also check saturated dynamics
+    solver : drake solver
+        default: CsdpSolver
+    """
+    def __init__(self, params, S, K, robot, taylor_deg=3, lambda_deg=4,
+                 mode=2, solver=None):
+        self.lambda_deg = lambda_deg
+        self.mode = mode
+        self.solver = CsdpSolver() if solver is None else solver
+
+        u_plus_vec = np.array(params["tau_max"])
+        u_minus_vec = - np.array(params["tau_max"])
+
+        x_bar, a, b, b_low = sos_taylor_dynamics(params, robot, taylor_deg)
+        self.x_bar = x_bar
+        u = -K.dot(x_bar)  # control input
+
+        # closed loop (Taylor approximated) dynamics
+        f = np.concatenate([x_bar[2:], a + b_low.dot(u)])
+        V = x_bar.dot(S.dot(x_bar))
+        self.V = V
+        self.Vdot = (sym.Expression(V).Jacobian(x_bar).dot(f))
+        if mode == 2:
+            f_minus = np.concatenate([x_bar[2:], a + b.dot(u_minus_vec)])
+            f_plus = np.concatenate([x_bar[2:], a + b.dot(u_plus_vec)])
+            self.Vdot_minus = sym.Expression(V).Jacobian(x_bar).dot(f_minus)
+            self.Vdot_plus = sym.Expression(V).Jacobian(x_bar).dot(f_plus)
+
+            j = 1 if robot == "acrobot" else 0
+            # where both nom1 and nom2 are < 0, the nominal dynamics have to be fullfilled
+            self.nom1 = (+ K.dot(x_bar) + u_minus_vec)[j]
+            self.nom2 = (- K.dot(x_bar) - u_plus_vec)[j]
+            # where neg/pos < 0, the negative/positive saturated dynamics have to be fullfilled
+            self.neg = (- K.dot(x_bar) - u_minus_vec)[j]
+            self.pos = (+ K.dot(x_bar) + u_plus_vec)[j]
+
+    def verify(self, rho):
+        """
+        Check whether the sublevel set V(x_bar) < rho is verified as region
+        of attraction.
+
+        Returns
+        -------
+        bool
+        """
+        x_bar = self.x_bar
+        V = self.V
+        prog = MathematicalProgram()
+        prog.AddIndeterminates(x_bar)
+
+        def multiplier():
+            return prog.NewSosPolynomial(Variables(x_bar),
+                                         self.lambda_deg)[0].ToExpression()
+
+        epsilon = 10e-20
+        lambda_b = multiplier()
+        if self.mode == 0:
+            prog.AddSosConstraint(-self.Vdot + lambda_b*(V-rho) - epsilon*x_bar.dot(x_bar))
+        if self.mode == 2:
+            lambda_2 = multiplier()
+            lambda_3 = multiplier()
+            lambda_c = multiplier()
+            lambda_4 = multiplier()
+            lambda_a = multiplier()
+            lambda_1 = multiplier()
+            prog.AddSosConstraint(-self.Vdot + lambda_b*(V-rho) + lambda_2*self.nom1 + lambda_3*self.nom2 - epsilon*x_bar.dot(x_bar))
+            # neg saturation
+            prog.AddSosConstraint(-self.Vdot_minus + lambda_a*(V - rho) + lambda_1*self.neg - epsilon*x_bar.dot(x_bar))
+            # pos saturation
+            prog.AddSosConstraint(-self.Vdot_plus + lambda_c*(V - rho) + lambda_4*self.pos - epsilon*x_bar.dot(x_bar))
+
+        result = self.solver.Solve(prog)
+        return result.is_success()
+
+
 def bisect_and_verify(params, S, K, robot, hyper_params, rho_min=1e-10,
                       rho_max=5, maxiter=15, verbose=False):
     """
     Simple bisection root finding for finding the RoA using the feasibility
     problem.
     The default values have been choosen after multiple trials.
+    The Taylor expanded dynamics are shared by all bisection steps
+    (see SosRoaVerifier).
     """
+    verifier = SosRoaVerifier(params,
+                              S,
+                              K,
+                              robot,
+                              taylor_deg=hyper_params["taylor_deg"],
+                              lambda_deg=hyper_params["lambda_deg"],
+                              mode=hyper_params["mode"])
     for i in range(maxiter):
         # np.random.uniform(rho_min,rho_max)
         rho_probe = rho_min+(rho_max-rho_min)/2
-        res = verify_double_pendulum_rho(rho_probe,
-                                         params,
-                                         S,
-                                         K,
-                                         robot,
-                                         taylor_deg=hyper_params["taylor_deg"],
-                                         lambda_deg=hyper_params["lambda_deg"],
-                                         mode=hyper_params["mode"])
+        res = verifier.verify(rho_probe)
         if verbose:
             print("---")
             print("rho_min:   "+str(rho_min))
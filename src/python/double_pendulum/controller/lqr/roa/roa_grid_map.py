@@ -0,0 +1,147 @@
+import copy
+import numpy as np
+
+from double_pendulum.controller.lqr.roa.coopt_interface import caprr_coopt_interface
+from double_pendulum.utils.cache import hash_key
+from double_pendulum.utils.grid_map import grid_map
+
+# parameters which can be varied in roa_grid_map
+GRID_PARAMETERS = ["m2", "l1", "l2", "q11", "q22", "q33", "q44", "r11", "r22"]
+
+
+class roa_grid_volume:
+    """
+    RoA volume of the LQR controller as function of a grid point
+    (see roa_grid_map). Picklable, so that it can be evaluated in worker
+    processes.
+
+    Parameters
+    ----------
+    names : list of strings
+        names of the grid parameters (from GRID_PARAMETERS)
+    design_params : dict
+        design parameters (m, l, lc, b, fc, g, I, tau_max)
+    Q : numpy_array, shape=(4, 4)
+        state cost matrix
+    R : numpy_array, shape=(2, 2)
+        control cost matrix
+    backend : string
+        RoA estimation backend (see caprr_coopt_interface)
+    najafi_evals : int
+        number of evaluations for the najafi backend
+    robot : string
+        "acrobot" or "pendubot"
+    """
+
+    def __init__(self, names, design_params, Q, R, backend="sos_con",
+                 najafi_evals=100000, robot="acrobot"):
+        for name in names:
+            if name not in GRID_PARAMETERS:
+                raise ValueError(f"Unknown grid parameter {name}")
+        self.names = list(names)
+        self.design_params = design_params
+        self.Q = np.asarray(Q, dtype=float)
+        self.R = np.asarray(R, dtype=float)
+        self.backend = backend
+        self.najafi_evals = najafi_evals
+        self.robot = robot
+
+    def __call__(self, point):
+        pars = dict(zip(self.names, point))
+        design_params = copy.deepcopy(self.design_params)
+        if any(n in pars for n in ["m2", "l1", "l2"]):
+            # same update as caprr_coopt_interface.design_opt_obj
+            m1 = design_params["m"][0]
+            m2 = pars.get("m2", design_params["m"][1])
+            l1 = pars.get("l1", design_params["l"][0])
+            l2 = pars.get("l2", design_params["l"][1])
+            design_params["m"] = [m1, m2]
+            design_params["l"] = [l1, l2]
+            design_params["lc"] = [l1, l2]
+            design_params["I"] = [m1*l1**2, m2*l2**2]
+
+        Q = np.copy(self.Q)
+        R = np.copy(self.R)
+        for i in range(4):
+            Q[i, i] = pars.get(f"q{i+1}{i+1}", Q[i, i])
+        for i in range(2):
+            R[i, i] = pars.get(f"r{i+1}{i+1}", R[i, i])
+
+        roa_calc = caprr_coopt_interface(design_params, Q, R,
+                                         backend=self.backend,
+                                         najafi_evals=self.najafi_evals,
+                                         robot=self.robot)
+        vol, _, _ = roa_calc._estimate()
+        return vol
+
+
+def roa_grid_map(grid, design_params, Q, R, backend="sos_con",
+                 najafi_evals=100000, robot="acrobot", n_workers=1,
+                 save_file=None, refine_levels=0, refine_tol=0.1,
+                 verbose=False):
+    """
+    RoA volumes of the LQR controller on a grid over design and cost
+    parameters, e.g. for heatmaps over (l1, l2).
+    The grid points are evaluated in a process pool and written to the
+    resumable .npy file save_file, an interrupted computation continues
+    where it stopped when called again with the same arguments.
+    With refine_levels > 0, the grid is refined adaptively where the
+    volume changes strongly (e.g. at the boundary of the region with
+    non zero volume) and interpolated elsewhere (see utils.grid_map).
+
+    Parameters
+    ----------
+    grid : dict
+        grid values (sorted array_like) per parameter name, the names have
+        to be in GRID_PARAMETERS (m2, l1, l2, q11, q22, q33, q44, r11, r22),
+        the axes of the result are in the order of the dict
+    design_params : dict
+        design parameters (m, l, lc, b, fc, g, I, tau_max), the values of
+        the parameters which are not in the grid
+    Q : numpy_array, shape=(4, 4)
+        state cost matrix
+    R : numpy_array, shape=(2, 2)
+        control cost matrix
+    backend : string
+        RoA estimation backend (see caprr_coopt_interface)
+        (Default value = "sos_con")
+    najafi_evals : int
+        number of evaluations for the najafi backend
+        (Default value = 100000)
+    robot : string
+        "acrobot" or "pendubot"
+        (Default value = "acrobot")
+    n_workers : int
+        number of worker processes
+        (Default value = 1)
+    save_file : string
+        path to the .npy file for the results, None for no file
+        (Default value = None)
+    refine_levels : int
+        number of adaptive refinement levels, 0 for the full grid
+        (Default value = 0)
+    refine_tol : float
+        relative volume difference within a cell above which it is refined
+        (Default value = 0.1)
+    verbose : bool
+        whether to print the progress
+        (Default value = False)
+
+    Returns
+    -------
+    numpy_array
+        RoA volumes, shape=(len(grid[name1]), len(grid[name2]), ...)
+    numpy_array
+        same shape, dtype=bool, which volumes have been computed
+        (the others are interpolated)
+    """
+    names = list(grid.keys())
+    axes = [np.asarray(grid[n], dtype=float) for n in names]
+    volume = roa_grid_volume(names, design_params, Q, R, backend=backend,
+                             najafi_evals=najafi_evals, robot=robot)
+    key = hash_key(names, [a.tolist() for a in axes], design_params,
+                   volume.Q.tolist(), volume.R.tolist(), backend,
+                   najafi_evals, robot)
+    return grid_map(volume, axes, n_workers=n_workers, save_file=save_file,
+                    key=key, refine_levels=refine_levels,
+                    refine_tol=refine_tol, verbose=verbose)
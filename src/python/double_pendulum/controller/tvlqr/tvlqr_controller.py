@@ -5,7 +5,8 @@ import numpy as np
 from double_pendulum.controller.abstract_controller import AbstractController
 from double_pendulum.controller.lqr.lqr import lqr, iterative_riccati
 from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
-from double_pendulum.utils.csv_trajectory import load_trajectory, save_trajectory
+from double_pendulum.utils.csv_trajectory import save_trajectory
+from double_pendulum.utils.trajectory import Trajectory
 from double_pendulum.utils.wrap_angles import wrap_angles_diff
 from double_pendulum.utils.pcw_polynomial import InterpolateVector, InterpolateMatrix
 
@@ -55,9 +56,11 @@ class TVLQRController(AbstractController):
         If provided, the model_pars parameters overwrite
         the other provided parameters
         (Default value=None)
-    csv_path : string or path object
+    csv_path : string, path object or Trajectory object
         path to csv file where the trajectory is stored.
         csv file should use standarf formatting used in this repo.
+        A (windowed) Trajectory object can be passed instead, its time is
+        shifted so that the trajectory starts at t=0.
         If T, X, or U are provided they are preferred.
         (Default value="")
     num_break : int
@@ -116,8 +119,13 @@ class TVLQRController(AbstractController):
         self.num_break = num_break
 
         # load trajectory
-        self.T, self.X, self.U = load_trajectory(csv_path=csv_path,
-                                                 with_tau=True)
+        if isinstance(csv_path, Trajectory):
+            T, self.X, self.U = csv_path.get("T", "X", "U")
+            # the controller (and the simulation) time starts at 0,
+            # also for windows starting later
+            self.T = T - T[0]
+        else:
+            self.T, self.X, self.U = Trajectory(csv_path).get("T", "X", "U")
         self.max_t = self.T[-1]
         self.dt = self.T[1] - self.T[0]
 
@@ -143,6 +151,8 @@ class TVLQRController(AbstractController):
         # initializations
         self.K = []
         # self.k = []
+        self.use_table = False
+        self.table_dt = None
 
     def set_cost_parameters(self,
                             Q=np.diag([4., 4., 0.1, 0.1]),
@@ -189,6 +199,28 @@ class TVLQRController(AbstractController):
         y[1] = (y[1] + np.pi) % (2*np.pi) - np.pi
         self.goal = np.asarray(y)
 
+    def set_gain_table(self, use_table=True, dt=None):
+        """set_gain_table
+        Precompute the reference state, feedforward torque and gain matrix
+        at a fixed time step during init. The control output is then
+        computed from the table entry closest to the requested time
+        (instead of evaluating the interpolating polynomials), which makes
+        the computation time per control step small and constant.
+
+        Parameters
+        ----------
+        use_table : bool
+            whether to use the table
+            (Default value=True)
+        dt : float
+            time step of the table, should be the time step of the
+            control loop, units=[s]
+            if None the time step of the trajectory is used
+            (Default value=None)
+        """
+        self.use_table = use_table
+        self.table_dt = dt
+
     def init_(self):
         """
         Initalize the controller.
@@ -203,6 +235,25 @@ class TVLQRController(AbstractController):
             num_break=self.num_break,
             poly_degree=3)
 
+        if self.use_table:
+            self.init_gain_table()
+
+    def init_gain_table(self):
+        """
+        Fill the gain table (see set_gain_table) with the interpolated
+        trajectory and gains.
+        """
+        dt = self.dt if self.table_dt is None else self.table_dt
+        n = int(np.ceil(self.max_t / dt - 1e-9)) + 1
+        times = np.minimum(dt * np.arange(n), self.max_t)
+        self.X_table = np.ascontiguousarray(self.X_interp.get_value(times))
+        self.U_table = np.ascontiguousarray(self.U_interp.get_value(times))
+        self.K_table = np.ascontiguousarray(self.K_interp.get_value(times))
+        self._table_dt = dt
+        self._x_error = np.empty(4)
+        self._tau = np.empty(2)
+        self._tl = np.asarray(self.torque_limit[:2], dtype=float)
+
     def get_control_output_(self, x, t):
         """
         The function to compute the control input for the double pendulum's
@@ -227,6 +278,9 @@ class TVLQRController(AbstractController):
             units=[Nm]
         """
 
+        if self.use_table:
+            return self.get_table_control_output(x, t)
+
         tt = min(t, self.max_t)
         x_error = wrap_angles_diff(np.asarray(x) - self.X_interp.get_value(tt))
 
@@ -237,6 +291,23 @@ class TVLQRController(AbstractController):
         u[1] = np.clip(u[1], -self.torque_limit[1], self.torque_limit[1])
         return u
 
+    def get_table_control_output(self, x, t):
+        """
+        Control output from the gain table, computed in preallocated
+        buffers. Same interface as get_control_output_.
+        """
+        i = min(max(int(t / self._table_dt + 0.5), 0), len(self.X_table) - 1)
+
+        x_error = self._x_error
+        np.subtract(x, self.X_table[i], out=x_error)
+        wrap_angles_diff(x_error, out=x_error)
+
+        tau = self._tau
+        np.dot(self.K_table[i], x_error, out=tau)
+        np.subtract(self.U_table[i], tau, out=tau)
+        np.clip(tau, -self._tl, self._tl, out=tau)
+        return [tau[0], tau[1]]
+
     def get_init_trajectory(self):
         """
         Get the initial (reference) trajectory used by the controller.
@@ -0,0 +1,292 @@
+import os
+import sys
+import importlib.util
+import sympy as smp
+from sympy.printing.pycode import PythonCodePrinter
+from sympy.printing.numpy import NumPyPrinter
+
+from double_pendulum.utils.cache import (
+    get_cache_dir,
+    get_package_version,
+    hash_key,
+    atomic_write,
+)
+from double_pendulum.model.symbolic_cache import plant_parameters, source_hash
+
+# increase when the generated code changes to invalidate old cache entries
+GENERATOR_VERSION = 1
+
+_kernel_modules = {}
+_batch_functions = {}
+
+_source_template = '''# generated by double_pendulum.model.compiled_dynamics, do not edit
+# key: {key}
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+BACKEND = "python" if njit is None else "numba"
+
+
+def rhs(x, u, out):
+    q1 = x[0]
+    q2 = x[1]
+    qd1 = x[2]
+    qd2 = x[3]
+{body}
+    f0 = G0 + {B00}*u[0] + {B01}*u[1] - Cv0 - F0
+    f1 = G1 + {B10}*u[0] + {B11}*u[1] - Cv1 - F1
+    det = M00*M11 - M01*M10
+    out[0] = qd1
+    out[1] = qd2
+    out[2] = (M11*f0 - M01*f1) / det
+    out[3] = (M00*f1 - M10*f0) / det
+
+
+def rk4_step(x, u, dt, out):
+    k1 = np.empty(4)
+    k2 = np.empty(4)
+    k3 = np.empty(4)
+    k4 = np.empty(4)
+    y = np.empty(4)
+    rhs(x, u, k1)
+    for i in range(4):
+        y[i] = x[i] + 0.5*dt*k1[i]
+    rhs(y, u, k2)
+    for i in range(4):
+        y[i] = x[i] + 0.5*dt*k2[i]
+    rhs(y, u, k3)
+    for i in range(4):
+        y[i] = x[i] + dt*k3[i]
+    rhs(y, u, k4)
+    for i in range(4):
+        out[i] = x[i] + dt*(k1[i] + 2.0*(k2[i] + k3[i]) + k4[i]) / 6.0
+
+
+if njit is not None:
+    rhs = njit(cache=True)(rhs)
+    rk4_step = njit(cache=True)(rk4_step)
+'''
+
+
+_batch_source_template = '''# generated by double_pendulum.model.compiled_dynamics, do not edit
+import numpy
+
+
+def rhs(x, u):
+    q1 = x[..., 0]
+    q2 = x[..., 1]
+    qd1 = x[..., 2]
+    qd2 = x[..., 3]
+{body}
+    f0 = G0 + {B00}*u[..., 0] + {B01}*u[..., 1] - Cv0 - F0
+    f1 = G1 + {B10}*u[..., 0] + {B11}*u[..., 1] - Cv1 - F1
+    det = M00*M11 - M01*M10
+    out = numpy.empty(numpy.broadcast(qd1, f0, f1).shape + (4,))
+    out[..., 0] = qd1
+    out[..., 1] = qd2
+    out[..., 2] = (M11*f0 - M01*f1) / det
+    out[..., 3] = (M00*f1 - M10*f0) / det
+    return out
+
+
+def gravity(x):
+    q1 = x[..., 0]
+    q2 = x[..., 1]
+{gravity_body}
+    out = numpy.empty(numpy.broadcast(q1, q2).shape + (2,))
+    out[..., 0] = G0
+    out[..., 1] = G1
+    return out
+'''
+
+
+def plant_key(plant):
+    """
+    Cache key of a symbolic plant. Contains all model parameters, the
+    actuator selection matrix, the used formulas, the package version, the
+    source code of the symbolic plant (see symbolic_cache.source_hash) and
+    the version of the code generator.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+
+    Returns
+    -------
+    string
+        hash of the plant parameters
+    """
+    return hash_key(
+        plant_parameters(plant), get_package_version(), source_hash(), GENERATOR_VERSION
+    )
+
+
+def generate_dynamics_source(plant, key=""):
+    """
+    Generate python source code of a fused rhs and a Runge-Kutta step for the
+    dynamics of a symbolic plant. The code is generated from the plant's
+    symbolic M, C, G, F after the model parameters have been replaced.
+    The 2x2 mass matrix is inverted analytically.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+    key : string
+        key written into the header of the source
+        (Default value = "")
+
+    Returns
+    -------
+    string
+        python source code of the module
+    """
+    names, exprs = _dynamics_expressions(plant)
+    printer = PythonCodePrinter({"fully_qualified_modules": True, "full_prec": True})
+    B = [[float(b) for b in row] for row in plant.B]
+    return _source_template.format(
+        key=key,
+        body=_cse_lines(names, exprs, printer),
+        B00=B[0][0],
+        B01=B[0][1],
+        B10=B[1][0],
+        B11=B[1][1],
+    )
+
+
+def _dynamics_expressions(plant):
+    # entries of M, C*qd, G, F of a plant in the symbols q1, q2, qd1, qd2
+    state_symbols = smp.symbols("q1 q2 qd1 qd2")
+    substitutions = dict(zip(list(plant.x), state_symbols))
+
+    M = plant.replace_parameters(plant.M).subs(substitutions)
+    C = plant.replace_parameters(plant.C).subs(substitutions)
+    G = plant.replace_parameters(plant.G).subs(substitutions)
+    F = plant.replace_parameters(plant.F).subs(substitutions)
+
+    qd = smp.Matrix(state_symbols[2:])
+    Cv = C * qd
+
+    names = ["M00", "M01", "M10", "M11", "Cv0", "Cv1", "G0", "G1", "F0", "F1"]
+    exprs = [M[0, 0], M[0, 1], M[1, 0], M[1, 1], Cv[0], Cv[1], G[0], G[1], F[0], F[1]]
+    return names, exprs
+
+
+def _cse_lines(names, exprs, printer):
+    # source lines which assign the expressions to the names
+    replacements, reduced = smp.cse(exprs, symbols=smp.numbered_symbols("_t"))
+    lines = []
+    for sym, expr in replacements:
+        lines.append(f"    {sym} = {printer.doprint(expr)}")
+    for name, expr in zip(names, reduced):
+        lines.append(f"    {name} = {printer.doprint(expr)}")
+    return "\n".join(lines)
+
+
+def generate_batch_source(plant):
+    """
+    Generate python source code of numpy functions for the dynamics of a
+    symbolic plant, which are vectorized over leading dimensions. Generated
+    from the same expressions as generate_dynamics_source.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+
+    Returns
+    -------
+    string
+        python source code with the functions rhs(x, u) and gravity(x)
+    """
+    names, exprs = _dynamics_expressions(plant)
+    printer = NumPyPrinter({"fully_qualified_modules": True, "full_prec": True})
+    B = [[float(b) for b in row] for row in plant.B]
+    return _batch_source_template.format(
+        body=_cse_lines(names, exprs, printer),
+        gravity_body=_cse_lines(names[6:8], exprs[6:8], printer),
+        B00=B[0][0],
+        B01=B[0][1],
+        B10=B[1][0],
+        B11=B[1][1],
+    )
+
+
+def load_batch_functions(plant):
+    """
+    Get the numpy functions for the dynamics of a symbolic plant, which are
+    vectorized over leading dimensions (see generate_batch_source).
+    The functions are generated once per parameter set and process.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+
+    Returns
+    -------
+    dict
+        dictionary with the functions
+            "rhs"(x, u) : xdot, shape=(..., 4)
+            "gravity"(x) : gravity vector, shape=(..., 2)
+    """
+    key = plant_key(plant)
+    if key not in _batch_functions:
+        namespace = {}
+        code = compile(generate_batch_source(plant), f"<dynamics_{key}>", "exec")
+        exec(code, namespace)
+        _batch_functions[key] = {
+            "rhs": namespace["rhs"],
+            "gravity": namespace["gravity"],
+        }
+    return _batch_functions[key]
+
+
+def load_dynamics_kernels(plant, cache_dir=None):
+    """
+    Load the compiled dynamics kernels of a symbolic plant.
+    The kernels are generated once per parameter set and stored in the
+    cache directory. If numba is installed, the kernels are JIT compiled and
+    the machine code is cached on disk as well, otherwise the generated
+    python functions are used.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+    cache_dir : string or path object
+        directory for the generated code,
+        if None, get_cache_dir("compiled_dynamics") is used
+        (Default value = None)
+
+    Returns
+    -------
+    module
+        module with the functions
+            rhs(x, u, out) : writes xdot to out
+            rk4_step(x, u, dt, out) : writes the next state to out
+        and the string BACKEND ("numba" or "python")
+    """
+    if cache_dir is None:
+        cache_dir = get_cache_dir("compiled_dynamics")
+    else:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    key = plant_key(plant)
+    path = os.path.join(cache_dir, f"dynamics_{key}.py")
+
+    if path in _kernel_modules:
+        return _kernel_modules[path]
+
+    if not os.path.exists(path):
+        atomic_write(path, generate_dynamics_source(plant, key))
+
+    spec = importlib.util.spec_from_file_location(f"double_pendulum_dynamics_{key}", path)
+    module = importlib.util.module_from_spec(spec)
+    # numba needs the module to be importable to load cached kernels
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    _kernel_modules[path] = module
+    return module
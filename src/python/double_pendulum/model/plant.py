@@ -1,3 +1,4 @@
+import math
 import numpy as np
 
 
@@ -227,32 +228,33 @@ class DoublePendulumPlant():
 
         Parameters
         ----------
-        x : array_like, shape=(4,), dtype=float,
+        x : array_like, shape=(4,) or shape=(..., 4), dtype=float,
             state of the double pendulum,
             order=[angle1, angle2, velocity1, velocity2],
             units=[rad, rad, rad/s, rad/s]
 
         Returns
         -------
-        numpy array, shape=(2,),
+        numpy array, shape=(2,) or shape=(..., 2),
             gravity vector
         """
-        pos = np.copy(x[:self.dof])
+        x = np.asarray(x, dtype=float)
+        pos0 = x[..., 0]
+        pos1 = x[..., 1]
         # vel = np.copy(x[self.dof:])
 
         if self.formulas == "UnderactuatedLecture":
-            G0 = -self.m[0]*self.g*self.com[0]*np.sin(pos[0]) - \
-                 self.m[1]*self.g*(self.l[0]*np.sin(pos[0]) +
-                                   self.com[1]*np.sin(pos[0]+pos[1]))
-            G1 = -self.m[1]*self.g*self.com[1]*np.sin(pos[0]+pos[1])
-            G = np.array([G0, G1])
+            G0 = -self.m[0]*self.g*self.com[0]*np.sin(pos0) - \
+                 self.m[1]*self.g*(self.l[0]*np.sin(pos0) +
+                                   self.com[1]*np.sin(pos0+pos1))
+            G1 = -self.m[1]*self.g*self.com[1]*np.sin(pos0+pos1)
         elif self.formulas == "Spong":
-            pos[0] -= 0.5*np.pi  # Spong uses different 0 position,
+            pos0 = pos0 - 0.5*np.pi  # Spong uses different 0 position,
             # in the end the formulas are equal bc. sin(x) = cos(x-0.5pi)
-            G0 = -(self.m[0]*self.com[0] + self.m[1]*self.l[0])*self.g*np.cos(pos[0]) - \
-                self.m[1]*self.com[1]*self.g*np.cos(pos[0]+pos[1])
-            G1 = -self.m[1]*self.com[1]*self.g*np.cos(pos[0]+pos[1])
-            G = np.array([G0, G1])
+            G0 = -(self.m[0]*self.com[0] + self.m[1]*self.l[0])*self.g*np.cos(pos0) - \
+                self.m[1]*self.com[1]*self.g*np.cos(pos0+pos1)
+            G1 = -self.m[1]*self.com[1]*self.g*np.cos(pos0+pos1)
+        G = np.stack([G0, G1], axis=-1)
         return G
 
     def coulomb_vector(self, x):
@@ -351,52 +353,113 @@ class DoublePendulumPlant():
         """
         forward dynamics of the double pendulum
 
+        The equations of motion are evaluated in closed form (analytic
+        inverse of the 2x2 mass matrix) and are vectorized over leading
+        dimensions, i.e. x can also be an array of states with
+        shape=(..., 4) and tau an array of torques with shape=(..., 2).
+
         Parameters
         ----------
-        x : array_like, shape=(4,), dtype=float,
+        x : array_like, shape=(4,) or shape=(..., 4), dtype=float,
             state of the double pendulum,
             order=[angle1, angle2, velocity1, velocity2],
             units=[rad, rad, rad/s, rad/s]
-        tau : array_like, shape=(2,), dtype=float
+        tau : array_like, shape=(2,) or shape=(..., 2), dtype=float
             actuation input/motor torque,
             order=[u1, u2],
             units=[Nm]
 
         Returns
         -------
-        numpy array, shape=(2,)
+        numpy array, shape=(2,) or shape=(..., 2)
             joint acceleration, [acc1, acc2], units=[m/s²]
         """
-        # pos = np.copy(x[:self.dof])
-        vel = np.copy(x[self.dof:])
+        x = np.asarray(x, dtype=float)
+        tau = np.asarray(tau, dtype=float)
+
+        if x.ndim == 1 and tau.ndim == 1:
+            # single state: python floats and the math module avoid the
+            # overhead of numpy scalars
+            try:
+                accn = self._closed_form_accelerations(
+                    *x.tolist(), *tau.tolist(), math.sin, math.cos, math.atan)
+                return np.array(accn)
+            except (ValueError, ZeroDivisionError):
+                # non-finite states, fall back to numpy (nan) semantics
+                pass
+
+        acc1, acc2 = self._closed_form_accelerations(
+            x[..., 0], x[..., 1], x[..., 2], x[..., 3],
+            tau[..., 0], tau[..., 1],
+            np.sin, np.cos, np.arctan)
+        accn = np.empty(np.broadcast(acc1, acc2).shape + (2,))
+        accn[..., 0] = acc1
+        accn[..., 1] = acc2
+        return accn
 
-        M = self.mass_matrix(x)
-        C = self.coriolis_matrix(x)
-        G = self.gravity_vector(x)
-        F = self.coulomb_vector(x)
+    def _closed_form_accelerations(self, pos1, pos2, vel1, vel2, tau1, tau2,
+                                   sin, cos, arctan):
+        """
+        joint accelerations from the equations of motion with the analytic
+        inverse of the 2x2 mass matrix. Works for python floats (with the
+        math module functions) and numpy arrays (with the numpy functions).
+        """
+        m, l, r, I = self.m, self.l, self.com, self.I
+        B00, B01, B10, B11 = np.ravel(self.B).tolist()
 
-        Minv = np.linalg.inv(M)
+        # mass matrix M = [[a0 + 2*a1*cos(q2), a2 + a1*cos(q2)],
+        #                  [a2 + a1*cos(q2),   a3]]
+        a1 = m[1]*l[0]*r[1]
+        if self.formulas == "UnderactuatedLecture":
+            a0 = I[0] + I[1] + m[1]*l[0]**2.0 + self.gr**2.0*self.Ir + self.Ir
+            a2 = I[1] - self.gr*self.Ir
+            a3 = I[1] + self.gr**2.0*self.Ir
+        elif self.formulas == "Spong":
+            a0 = I[0] + I[1] + m[0]*r[0]**2.0 + m[1]*(l[0]**2.0 + r[1]**2.0)
+            a2 = I[1] + m[1]*r[1]**2.0
+            a3 = I[1] + m[1]*r[1]**2.0
 
-        force = G + self.B.dot(tau) - C.dot(vel)
-        #friction = np.where(np.abs(F) > np.abs(force), force*np.sign(F), F)
-        friction = F
+        c2 = cos(pos2)
+        M00 = a0 + 2*a1*c2
+        M01 = a2 + a1*c2
 
-        accn = Minv.dot(force - friction)
-        return accn
+        # coriolis terms C.dot(vel) with h = m2*l1*r2*sin(q2)
+        h = a1*sin(pos2)
+        Cv0 = -h*(2*vel1 + vel2)*vel2
+        Cv1 = h*vel1*vel1
+
+        # gravity vector
+        s12 = sin(pos1 + pos2)
+        G0 = -(m[0]*r[0] + m[1]*l[0])*self.g*sin(pos1) - m[1]*self.g*r[1]*s12
+        G1 = -m[1]*self.g*r[1]*s12
+
+        # friction vector
+        F0 = self.b[0]*vel1 + self.coulomb_fric[0]*arctan(100*vel1)
+        F1 = self.b[1]*vel2 + self.coulomb_fric[1]*arctan(100*vel2)
+
+        force0 = G0 + B00*tau1 + B01*tau2 - Cv0 - F0
+        force1 = G1 + B10*tau1 + B11*tau2 - Cv1 - F1
+
+        det = M00*a3 - M01*M01
+        acc1 = (a3*force0 - M01*force1) / det
+        acc2 = (M00*force1 - M01*force0) / det
+        return acc1, acc2
 
     def rhs(self, t, state, tau):
         """
         integrand of the equations of motion
 
+        Vectorized over leading dimensions like forward_dynamics.
+
         Parameters
         ----------
         t : float,
             time, units=[s], not used
-        state : array_like, shape=(4,), dtype=float,
+        state : array_like, shape=(4,) or shape=(..., 4), dtype=float,
             state of the double pendulum,
             order=[angle1, angle2, velocity1, velocity2],
             units=[rad, rad, rad/s, rad/s]
-        tau : array_like, shape=(2,), dtype=float
+        tau : array_like, shape=(2,) or shape=(..., 2), dtype=float
             actuation input/motor torque,
             order=[u1, u2],
             units=[Nm]
@@ -404,18 +467,18 @@ class DoublePendulumPlant():
         Returns
         -------
         numpy array
-            shape=(4,), dtype=float
+            shape=(4,) or shape=(..., 4), dtype=float
             integrand, [vel1, vel2, acc1, acc2]
         """
+        state = np.asarray(state, dtype=float)
+
         # Forward dynamics
         accn = self.forward_dynamics(state, tau)
 
         # Next state
-        res = np.zeros(2*self.dof)
-        res[0] = state[2]
-        res[1] = state[3]
-        res[2] = accn[0]
-        res[3] = accn[1]
+        res = np.empty(accn.shape[:-1] + (2*self.dof,))
+        res[..., :self.dof] = state[..., self.dof:]
+        res[..., self.dof:] = accn
         return res
 
     def get_Mx(self, x, tau):
@@ -0,0 +1,235 @@
+import os
+import pickle
+import inspect
+import hashlib
+
+from double_pendulum.utils.cache import (
+    get_cache_dir,
+    get_package_version,
+    hash_key,
+    atomic_write,
+)
+
+# increase when the cached content changes to invalidate old cache entries
+CACHE_VERSION = 1
+
+# source files of the symbolic derivation, their content is part of all keys
+_SOURCE_FILES = ["symbolic_plant.py", "symbolic_cache.py"]
+_source_hash = None
+
+
+def source_hash():
+    """
+    Hash of the source code of the symbolic plant. Part of all cache keys,
+    so that edits of the equations invalidate the cache also for source
+    checkouts and editable installs, where the package version does not
+    change.
+
+    Returns
+    -------
+    string
+    """
+    global _source_hash
+    if _source_hash is None:
+        h = hashlib.sha256()
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in _SOURCE_FILES:
+            with open(os.path.join(directory, name), "rb") as f:
+                h.update(f.read())
+        _source_hash = h.hexdigest()[:24]
+    return _source_hash
+
+
+def plant_parameters(plant):
+    """
+    List of all model parameters of a plant which enter the dynamics.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+
+    Returns
+    -------
+    list
+        [m, l, com, I, g, b, coulomb_fric, Ir, gr, B, formulas]
+    """
+    return [
+        [float(m) for m in plant.m],
+        [float(l) for l in plant.l],
+        [float(r) for r in plant.com],
+        [float(i) for i in plant.I],
+        float(plant.g),
+        [float(b) for b in plant.b],
+        [float(cf) for cf in plant.coulomb_fric],
+        float(plant.Ir),
+        float(plant.gr),
+        [[int(b) for b in row] for row in plant.B],
+        plant.formulas,
+    ]
+
+
+def derivation_key(plant):
+    """
+    Cache key of the parameter independent symbolic derivation
+    (equations of motion and linearization). Depends on the
+    actuator selection (torque limit pattern), the used formulas, the
+    package version and the source code (see source_hash).
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+
+    Returns
+    -------
+    string
+    """
+    B = [[int(b) for b in row] for row in plant.B]
+    return hash_key(
+        "derivation",
+        B,
+        plant.formulas,
+        get_package_version(),
+        source_hash(),
+        CACHE_VERSION,
+    )
+
+
+def lambdify_key(plant):
+    """
+    Cache key of the lambdified functions of a plant. Depends on all
+    model parameters, the torque limit pattern, the package version and
+    the source code (see source_hash).
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+
+    Returns
+    -------
+    string
+    """
+    return hash_key(
+        "lambdify",
+        plant_parameters(plant),
+        get_package_version(),
+        source_hash(),
+        CACHE_VERSION,
+    )
+
+
+def _cache_path(name):
+    return os.path.join(get_cache_dir("symbolic_plant"), name)
+
+
+def load_derivation(plant):
+    """
+    Load the cached symbolic derivation of a plant.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+
+    Returns
+    -------
+    dict or None
+        dictionary with the sympy expressions "eom", "f", "Alin", "Blin"
+        None if there is no (valid) cache entry
+    """
+    path = _cache_path(f"derivation_{derivation_key(plant)}.pkl")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def save_derivation(plant, derivation):
+    """
+    Store the symbolic derivation of a plant in the cache.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum object
+    derivation : dict
+        dictionary with the sympy expressions "eom", "f", "Alin", "Blin"
+    """
+    path = _cache_path(f"derivation_{derivation_key(plant)}.pkl")
+    atomic_write(path, pickle.dumps(derivation), mode="wb")
+
+
+def template_key(template):
+    """
+    Cache key of the lambdified functions of a plant template, in which the
+    model parameters are function arguments. Depends on the torque limit
+    pattern, the used formulas, the package version and the source code
+    (see source_hash).
+
+    Parameters
+    ----------
+    template : SymbolicPlantTemplate object
+
+    Returns
+    -------
+    string
+    """
+    B = [[int(b) for b in row] for row in template.B]
+    return hash_key(
+        "template",
+        B,
+        template.formulas,
+        get_package_version(),
+        source_hash(),
+        CACHE_VERSION,
+    )
+
+
+def load_lambdified(key):
+    """
+    Load cached lambdified functions.
+
+    Parameters
+    ----------
+    key : string
+        cache key, e.g. from lambdify_key or template_key
+
+    Returns
+    -------
+    dict or None
+        dictionary with the functions (same keys as passed to
+        save_lambdified)
+        None if there is no (valid) cache entry
+    """
+    path = _cache_path(f"lambdify_{key}.pkl")
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            sources = pickle.load(f)
+        functions = {}
+        for name, src in sources.items():
+            # same namespace as sympy's lambdify with the numpy module
+            namespace = {}
+            exec("from numpy import *", namespace)
+            exec(src, namespace)
+            functions[name] = namespace["_lambdifygenerated"]
+        return functions
+    except Exception:
+        return None
+
+
+def save_lambdified(key, functions):
+    """
+    Store the source code of lambdified functions in the cache.
+
+    Parameters
+    ----------
+    key : string
+        cache key, e.g. from lambdify_key or template_key
+    functions : dict
+        dictionary with functions created by sympy's lambdify
+    """
+    sources = {name: inspect.getsource(f) for name, f in functions.items()}
+    path = _cache_path(f"lambdify_{key}.pkl")
+    atomic_write(path, pickle.dumps(sources), mode="wb")
@@ -2,6 +2,19 @@ import numpy as np
 import sympy as smp
 from sympy.utilities import lambdify
 
+from double_pendulum.model.compiled_dynamics import (
+    load_dynamics_kernels,
+    load_batch_functions,
+)
+from double_pendulum.model.symbolic_cache import (
+    load_derivation,
+    save_derivation,
+    load_lambdified,
+    save_lambdified,
+    lambdify_key,
+    template_key,
+)
+
 
 def diff_to_matrix(diff):
     """
@@ -130,6 +143,16 @@ class SymbolicDoublePendulum:
         Can be used to set all model parameters above
         If provided, the model_pars parameters overwrite
         the other provided parameters
+    use_cache : bool, optional
+        default=True
+        Whether to use the disk cache for the symbolic derivation and the
+        lambdified functions (see model.symbolic_cache). With a warm cache
+        the construction of the plant takes milliseconds instead of seconds.
+    template : SymbolicPlantTemplate object, optional
+        default=None
+        If provided, the plant uses the shared functions of the template
+        (with the model parameters as arguments) instead of lambdifying its
+        own functions. See SymbolicPlantTemplate.plant.
     """
 
     # Acrobot parameters
@@ -185,7 +208,10 @@ class SymbolicDoublePendulum:
         gear_ratio=6,
         torque_limit=[np.inf, np.inf],
         model_pars=None,
+        use_cache=True,
+        template=None,
     ):
+        self.use_cache = use_cache
         self.m = mass
         self.l = length
         self.com = com
@@ -239,16 +265,39 @@ class SymbolicDoublePendulum:
         self.G = self.symbolic_gravity_vector()
         self.F = self.symbolic_coulomb_vector()
 
-        self.eom = self.equation_of_motion(order="2nd")
-        self.f = self.equation_of_motion(order="1st")
-
         self.Ekin = self.symbolic_kinetic_energy()
         self.Epot = self.symbolic_potential_energy()
         self.E = self.symbolic_total_energy()
 
-        self.Alin, self.Blin = self.symbolic_linear_matrices()
+        # the derivation of the eom and the linearization does not depend on
+        # the parameter values and can be loaded from the cache
+        derivation = None
+        if template is not None:
+            derivation = template.derivation
+        elif self.use_cache:
+            derivation = load_derivation(self)
+        if derivation is None:
+            self.eom = self.equation_of_motion(order="2nd")
+            self.f = self.equation_of_motion(order="1st")
+            self.Alin, self.Blin = self.symbolic_linear_matrices()
+            if self.use_cache:
+                save_derivation(
+                    self,
+                    {"eom": self.eom, "f": self.f, "Alin": self.Alin, "Blin": self.Blin},
+                )
+        else:
+            self.eom = derivation["eom"]
+            self.f = derivation["f"]
+            self.Alin = derivation["Alin"]
+            self.Blin = derivation["Blin"]
 
-        self.lambdify_matrices()
+        if template is not None:
+            self.bind_template(template)
+        else:
+            self.lambdify_matrices()
+
+        # optional compiled backend, see compile_dynamics
+        self.compiled_dynamics = None
 
     def symbolic_mass_matrix(self):
         """
@@ -461,16 +510,18 @@ class SymbolicDoublePendulum:
 
         Parameters
         ----------
-        x : array_like, shape=(4,), dtype=float,
+        x : array_like, shape=(4,) or shape=(..., 4), dtype=float,
             state of the double pendulum,
             order=[angle1, angle2, velocity1, velocity2],
             units=[rad, rad, rad/s, rad/s]
 
         Returns
         -------
-        numpy array, shape=(1,2),
+        numpy array, shape=(2,) or shape=(..., 2),
             gravity vector
         """
+        if np.ndim(x) > 1:
+            return load_batch_functions(self)["gravity"](np.asarray(x, dtype=float))
         G = self.G_la(x[0], x[1], x[2], x[3])
         return np.asarray(G, dtype=float).reshape(self.dof)
 
@@ -674,7 +725,17 @@ class SymbolicDoublePendulum:
         """
         function to lambdify the symbolic matrices of this plant to make them
         functions of state x and actuation u
+        If use_cache is True, the functions are loaded from the disk cache
+        if available.
         """
+        functions = None
+        if self.use_cache:
+            functions = load_lambdified(lambdify_key(self))
+        if functions is not None:
+            for name, func in functions.items():
+                setattr(self, name, func)
+            return
+
         M = self.replace_parameters(self.M)
         C = self.replace_parameters(self.C)
         G = self.replace_parameters(self.G)
@@ -695,6 +756,70 @@ class SymbolicDoublePendulum:
         self.Alin_la = lambdify((self.x0, self.u0), Alin)
         self.Blin_la = lambdify((self.x0, self.u0), Blin)
 
+        if self.use_cache:
+            names = ["M_la", "C_la", "G_la", "F_la", "Ekin_la", "Epot_la", "E_la",
+                     "Alin_la", "Blin_la"]
+            save_lambdified(
+                lambdify_key(self), {name: getattr(self, name) for name in names}
+            )
+
+    def bind_template(self, template):
+        """
+        Use the functions of a plant template with the parameters of this
+        plant instead of lambdifying the matrices of this plant.
+
+        Parameters
+        ----------
+        template : SymbolicPlantTemplate object
+            template with the same torque limit pattern and formulas
+        """
+        if not np.array_equal(template.B, self.B) or template.formulas != self.formulas:
+            raise ValueError(
+                "The plant template has a different actuator configuration "
+                "than the plant."
+            )
+        p = template.parameter_values(self)
+
+        def bind_x(func):
+            return lambda q1, q2, qd1, qd2: func([q1, q2, qd1, qd2], p)
+
+        def bind_x0u0(func):
+            return lambda x0, u0: func(x0, u0, p)
+
+        self.M_la = bind_x(template.M_la)
+        self.C_la = bind_x(template.C_la)
+        self.G_la = bind_x(template.G_la)
+        self.F_la = bind_x(template.F_la)
+        self.Ekin_la = bind_x(template.Ekin_la)
+        self.Epot_la = bind_x(template.Epot_la)
+        self.E_la = bind_x(template.E_la)
+        self.Alin_la = bind_x0u0(template.Alin_la)
+        self.Blin_la = bind_x0u0(template.Blin_la)
+
+    def compile_dynamics(self, cache_dir=None):
+        """
+        Activate the compiled backend for the dynamics of this plant.
+        A fused rhs and a Runge-Kutta step kernel are generated from the
+        symbolic matrices and JIT compiled with numba (if installed).
+        The generated code and the compiled kernels are cached on disk and
+        reused for plants with the same parameters.
+        The kernels are used by rhs and automatically by Simulator.step.
+
+        Parameters
+        ----------
+        cache_dir : string or path object
+            directory for the generated code,
+            if None, the default cache directory is used
+            (Default value = None)
+
+        Returns
+        -------
+        string
+            the used backend, "numba" or "python"
+        """
+        self.compiled_dynamics = load_dynamics_kernels(self, cache_dir)
+        return self.compiled_dynamics.BACKEND
+
     def forward_kinematics(self, pos):
         """
         forward kinematics, origin at fixed point
@@ -924,11 +1049,11 @@ class SymbolicDoublePendulum:
         ----------
         t : float,
             time, units=[s], not used
-        x : array_like, shape=(4,), dtype=float,
+        x : array_like, shape=(4,) or shape=(..., 4), dtype=float,
             state of the double pendulum,
             order=[angle1, angle2, velocity1, velocity2],
             units=[rad, rad, rad/s, rad/s]
-        u : array_like, shape=(2,), dtype=float
+        u : array_like, shape=(2,) or shape=(..., 2), dtype=float
             actuation input/motor torque,
             order=[u1, u2],
             units=[Nm]
@@ -936,9 +1061,22 @@ class SymbolicDoublePendulum:
         Returns
         -------
         numpy array
-            shape=(4,), dtype=float
+            shape=(4,) or shape=(..., 4), dtype=float
             integrand, [vel1, vel2, acc1, acc2]
         """
+        if np.ndim(x) > 1 or np.ndim(u) > 1:
+            # arrays of states, generated numpy code (see compiled_dynamics)
+            return load_batch_functions(self)["rhs"](
+                np.asarray(x, dtype=float), np.asarray(u, dtype=float)
+            )
+
+        if self.compiled_dynamics is not None:
+            res = np.empty(2 * self.dof)
+            self.compiled_dynamics.rhs(
+                np.asarray(x, dtype=float), np.asarray(u, dtype=float), res
+            )
+            return res
+
         # Forward dynamics
         accn = self.forward_dynamics(x, u)
 
@@ -949,3 +1087,175 @@ class SymbolicDoublePendulum:
         res[2] = accn[0]
         res[3] = accn[1]
         return res
+
+
+class SymbolicPlantTemplate:
+    """
+    Symbolic double pendulum plant template.
+    The matrices (mass, coriolis, gravity, friction), the energies and the
+    linearized dynamics are lambdified once with the model parameters as
+    additional function arguments. Plants with different parameters but the
+    same actuator configuration can then be created without any sympy
+    computations with the plant method. The lambdified functions are also
+    stored in the disk cache (see model.symbolic_cache).
+
+    Parameters
+    ----------
+    torque_limit : array_like, optional
+        shape=(2,), dtype=float, default=[np.inf, np.inf]
+        torque limit of the motors, only the pattern of zero entries
+        (actuator selection) is relevant for the template
+        [tl1, tl2], units=[Nm, Nm]
+    use_cache : bool, optional
+        default=True
+        Whether to use the disk cache
+    """
+
+    def __init__(self, torque_limit=[np.inf, np.inf], use_cache=True):
+        self.torque_limit = torque_limit
+        self.use_cache = use_cache
+
+        # plant with default parameters, provides the symbolic expressions
+        proto = SymbolicDoublePendulum(torque_limit=torque_limit, use_cache=use_cache)
+        self.B = proto.B
+        self.formulas = proto.formulas
+        self.derivation = {
+            "eom": proto.eom,
+            "f": proto.f,
+            "Alin": proto.Alin,
+            "Blin": proto.Blin,
+        }
+
+        p = SymbolicDoublePendulum
+        self.parameter_symbols = [
+            p.m1, p.m2, p.l1, p.l2, p.r1, p.r2, p.I1, p.I2,
+            p.g_sym, p.b1, p.b2, p.cf1, p.cf2, p.Ir_sym, p.gr_sym,
+        ]
+        self.lambdify_matrices(proto)
+
+    def lambdify_matrices(self, proto):
+        """
+        lambdify the symbolic matrices of the prototype plant with the
+        state and the model parameters as arguments
+
+        Parameters
+        ----------
+        proto : SymbolicDoublePendulum object
+            plant providing the symbolic expressions
+        """
+        key = template_key(self)
+        functions = None
+        if self.use_cache:
+            functions = load_lambdified(key)
+        if functions is None:
+            pars = self.parameter_symbols
+            x, x0, u0 = proto.x, proto.x0, proto.u0
+            functions = {
+                "M_la": lambdify((x, pars), proto.M),
+                "C_la": lambdify((x, pars), proto.C),
+                "G_la": lambdify((x, pars), proto.G),
+                "F_la": lambdify((x, pars), proto.F),
+                "Ekin_la": lambdify((x, pars), proto.Ekin),
+                "Epot_la": lambdify((x, pars), proto.Epot),
+                "E_la": lambdify((x, pars), proto.E),
+                "Alin_la": lambdify((x0, u0, pars), proto.Alin),
+                "Blin_la": lambdify((x0, u0, pars), proto.Blin),
+            }
+            if self.use_cache:
+                save_lambdified(key, functions)
+        for name, func in functions.items():
+            setattr(self, name, func)
+
+    def parameter_values(self, plant):
+        """
+        numeric values of the parameter symbols for a plant
+
+        Parameters
+        ----------
+        plant : SymbolicDoublePendulum object
+
+        Returns
+        -------
+        list
+            [m1, m2, l1, l2, r1, r2, I1, I2, g, b1, b2, cf1, cf2, Ir, gr]
+        """
+        return [
+            float(plant.m[0]), float(plant.m[1]),
+            float(plant.l[0]), float(plant.l[1]),
+            float(plant.com[0]), float(plant.com[1]),
+            float(plant.I[0]), float(plant.I[1]),
+            float(plant.g),
+            float(plant.b[0]), float(plant.b[1]),
+            float(plant.coulomb_fric[0]), float(plant.coulomb_fric[1]),
+            float(plant.Ir), float(plant.gr),
+        ]
+
+    def plant(
+        self,
+        mass=[1.0, 1.0],
+        length=[0.5, 0.5],
+        com=[0.5, 0.5],
+        damping=[0.1, 0.1],
+        gravity=9.81,
+        coulomb_fric=[0.0, 0.0],
+        inertia=[None, None],
+        motor_inertia=0.0,
+        gear_ratio=6,
+        torque_limit=None,
+        model_pars=None,
+    ):
+        """
+        Create a plant with the given parameters which uses the functions of
+        this template. The parameters are the same as for
+        SymbolicDoublePendulum. If torque_limit is None, the torque limit
+        of model_pars or of the template is used.
+
+        Returns
+        -------
+        SymbolicDoublePendulum object
+        """
+        if torque_limit is None:
+            if model_pars is not None:
+                torque_limit = model_pars.tl
+            else:
+                torque_limit = self.torque_limit
+        return SymbolicDoublePendulum(
+            mass=mass,
+            length=length,
+            com=com,
+            damping=damping,
+            gravity=gravity,
+            coulomb_fric=coulomb_fric,
+            inertia=inertia,
+            motor_inertia=motor_inertia,
+            gear_ratio=gear_ratio,
+            torque_limit=torque_limit,
+            model_pars=model_pars,
+            use_cache=self.use_cache,
+            template=self,
+        )
+
+
+_plant_templates = {}
+
+
+def get_plant_template(torque_limit=[np.inf, np.inf]):
+    """
+    Get the shared plant template for the actuator configuration defined by
+    the torque limit. Templates are created once per process.
+
+    Parameters
+    ----------
+    torque_limit : array_like, optional
+        shape=(2,), dtype=float, default=[np.inf, np.inf]
+        torque limit of the motors
+        [tl1, tl2], units=[Nm, Nm]
+
+    Returns
+    -------
+    SymbolicPlantTemplate object
+    """
+    key = (torque_limit[0] == 0, torque_limit[1] == 0)
+    if key not in _plant_templates:
+        _plant_templates[key] = SymbolicPlantTemplate(torque_limit=torque_limit)
+    return _plant_templates[key]
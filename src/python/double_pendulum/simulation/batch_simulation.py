@@ -0,0 +1,437 @@
+import time
+import numpy as np
+
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.simulation.simulation import Simulator
+
+
+class BatchSimulator(Simulator):
+    """
+    BatchSimulator class
+    simulates N double pendulums with the same plant in lockstep.
+    The internal state is an array of shape (N, 4) and all integration
+    steps, noises, delays and motor models are evaluated for all rollouts
+    at once with numpy broadcasting.
+
+    The noise, measurement, motor and disturbance settings are set with the
+    same methods as for the Simulator (set_process_noise,
+    set_measurement_parameters, set_motor_parameters, set_disturbances).
+    The number of rollouts N is defined by the initial states passed to
+    set_state or simulate.
+
+    Parameters
+    ----------
+    plant : SymbolicDoublePendulum or DoublePendulumPlant object
+        A plant object containing the kinematics and dynamics of the
+        double pendulum
+    """
+
+    def __init__(self, plant):
+        super().__init__(plant)
+        self.x = np.zeros((1, 2 * self.plant.dof))
+
+    def set_state(self, t, x):
+        """
+        Set the time and states of the double pendulums
+
+        Parameters
+        ----------
+        t : float
+            time, units=[s]
+        x : array_like, shape=(N, 4) or shape=(4,), dtype=float,
+            states of the double pendulums,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+            A single state is treated as a batch of size 1.
+        """
+        self.x = np.array(x, dtype=float, ndmin=2)
+        self.t = t
+
+    def get_trajectory_data(self):
+        """
+        Get the recorded trajectory data of all rollouts
+
+        Returns
+        -------
+        numpy_array
+            time points, unit=[s]
+            shape=(M,)
+        numpy_array
+            shape=(N, M, 4)
+            states, units=[rad, rad, rad/s, rad/s]
+            order=[angle1, angle2, velocity1, velocity2]
+        numpy_array
+            shape=(N, M-1, 2)
+            actuations/motor torques
+            order=[u1, u2],
+            units=[Nm]
+        """
+        T = self.t_values.view()
+        X = np.swapaxes(self.x_values.view(), 0, 1)
+        if len(self.tau_values) > 0:
+            U = np.swapaxes(self.tau_values.view(), 0, 1)
+        else:
+            U = np.zeros((len(self.x), 0, self.plant.n_actuators))
+        return T, X, U
+
+    def rhs(self, t, x, tau):
+        """
+        Integrand of the equations of motion for all rollouts.
+        The DoublePendulumPlant and the SymbolicDoublePendulum are evaluated
+        for all rollouts at once, other plants are evaluated rollout by
+        rollout.
+
+        Parameters
+        ----------
+        t : float,
+            time, units=[s]
+        x : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulums,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        tau : array_like, shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 4), dtype=float
+            integrands, [vel1, vel2, acc1, acc2]
+        """
+        if isinstance(self.plant, (DoublePendulumPlant, SymbolicDoublePendulum)):
+            return self.plant.rhs(t, x, tau)
+        return np.array([self.plant.rhs(t, xi, ui) for xi, ui in zip(x, tau)])
+
+    def euler_integrator(self, y, dt, t, tau):
+        """
+        Performs a Euler integration step for all rollouts
+
+        Parameters
+        ----------
+        y : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulums,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        dt : float
+            timestep, unit=[s]
+        t : float
+            time, unit=[s]
+        tau : array_like, shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 4), dtype=float,
+            state derivatives of the double pendulums,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        """
+        return self.rhs(t, y, tau)
+
+    def runge_integrator(self, y, dt, t, tau):
+        """
+        Performs a Runge-Kutta integration step for all rollouts
+
+        Parameters
+        ----------
+        y : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulums,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        dt : float
+            timestep, unit=[s]
+        t : float
+            time, unit=[s]
+        tau : array_like, shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 4), dtype=float,
+            averaged state derivatives of the double pendulums,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        """
+        k1 = self.rhs(t, y, tau)
+        k2 = self.rhs(t + 0.5 * dt, y + 0.5 * dt * k1, tau)
+        k3 = self.rhs(t + 0.5 * dt, y + 0.5 * dt * k2, tau)
+        k4 = self.rhs(t + dt, y + dt * k3, tau)
+        return (k1 + 2.0 * (k2 + k3) + k4) / 6.0
+
+    def step(self, tau, dt, integrator="runge_kutta"):
+        """
+        Performs a simulation step for all rollouts with the specified
+        integrator. Also adds process noise to the integration result.
+        Uses and updates the internal state
+
+        Parameters
+        ----------
+        tau : array_like, shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        dt : float
+            timestep, unit=[s]
+        integrator : string
+            string determining the integration method
+            "euler" : Euler integrator
+            "runge_kutta" : Runge Kutta integrator
+             (Default value = "runge_kutta")
+        """
+        tau = np.broadcast_to(tau, (len(self.x), self.plant.n_actuators))
+
+        if integrator == "runge_kutta":
+            self.x = self.x + dt * self.runge_integrator(self.x, dt, self.t, tau)
+        elif integrator == "euler":
+            self.x = self.x + dt * self.euler_integrator(self.x, dt, self.t, tau)
+        else:
+            raise NotImplementedError(
+                f"Sorry, the integrator {integrator} is not implemented."
+            )
+        # process noise
+        rng = self.get_random_generator()
+        self.x = rng.normal(self.x, self.process_noise_sigmas, np.shape(self.x))
+
+        self.t += dt
+        self.record_data(self.t, self.x, tau)
+
+    def get_control_u(self, controller, x, t, dt):
+        """
+        Get the control signals for all rollouts
+
+        Parameters
+        ----------
+        controller : Controller object or list of Controller objects
+            Controller(s) whose control signals are used.
+            If a list is given, it has to contain one controller per
+            rollout. If a single controller is given, its
+            get_control_output_batch method is used if available, otherwise
+            the controller is evaluated row by row (only suitable for
+            controllers without internal state).
+            If None, motor torques are set to 0.
+        x : array_like, shape=(N, 4), dtype=float,
+            states of the double pendulums,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        t : float,
+            time, units=[s]
+        dt : float
+            timestep, unit=[s]
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 2), dtype=float
+            actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        bool
+            Flag stating real time calculation
+            True: The calculation was performed in real time
+            False: The calculation was not performed in real time
+        """
+        realtime = True
+        n = len(x)
+        if controller is not None:
+            t0 = time.time()
+            if isinstance(controller, (list, tuple)):
+                u = np.array(
+                    [c.get_control_output(x=xi, t=t) for c, xi in zip(controller, x)],
+                    dtype=float,
+                )
+            elif hasattr(controller, "get_control_output_batch"):
+                u = np.array(controller.get_control_output_batch(X=x, t=t), dtype=float)
+            else:
+                u = np.array(
+                    [controller.get_control_output(x=xi, t=t) for xi in x], dtype=float
+                )
+            # realtime refers to a single control step of one system
+            if (time.time() - t0) / n > dt:
+                realtime = False
+        else:
+            u = np.zeros((n, self.plant.n_actuators))
+        self.con_u_values.append(u)
+        return u, realtime
+
+    def get_measurement(self, dt):
+        """
+        Get measurements from the internal states
+
+        The state measurement is described by
+        x_meas(t) = C*x(t-delay) + D*u(t-delay) + N(sigma)
+
+        (parameters set by set_measurement_parameters)
+
+        Parameters
+        ----------
+        dt : float
+            timestep, unit=[s]
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 4), dtype=float,
+            measured states of the double pendulums,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        """
+        x_meas = np.copy(self.x)
+
+        # delay
+        n_delay = int(self.delay / dt) + 1
+        # keep enough history for the delay in ring mode
+        self.x_values.reserve(n_delay + 1)
+        self.tau_values.reserve(n_delay + 1)
+        if n_delay > 1:
+            len_X = len(self.x_values)
+            if self.delay_mode == "posvel":
+                x_meas = np.copy(self.x_values[max(-n_delay, -len_X)])
+            elif self.delay_mode == "vel":
+                x_meas[:, 2:] = self.x_values[max(-n_delay, -len_X)][:, 2:]
+
+        if len(self.tau_values) > n_delay:
+            u = np.asarray(self.tau_values[-n_delay])
+        else:
+            u = np.zeros((len(self.x), self.plant.n_actuators))
+
+        x_meas = np.dot(x_meas, np.transpose(self.meas_C)) + np.dot(
+            u, np.transpose(self.meas_D)
+        )
+
+        # sensor noise
+        rng = self.get_random_generator()
+        x_meas = rng.normal(x_meas, self.meas_noise_sigmas, np.shape(self.x))
+
+        self.meas_x_values.append(x_meas)
+        return x_meas
+
+    def get_real_applied_u(self, u, t, dt):
+        """
+        Get the torques that the motors actually apply.
+
+        The applied motor torque (u_out) is related to the commanded torque
+        (u) and the last torque output (u_last) via
+
+        u_out = u_responsiveness*u + (1-u_responsiveness)*u_last + N(sigma)
+
+        (parameters set in set_motor_parameters)
+
+        The perturbation array (set_disturbances) can either be shared by all
+        rollouts (shape=(2, n_steps)) or be specified per rollout
+        (shape=(N, 2, n_steps)).
+
+        Parameters
+        ----------
+        u : array_like, shape=(N, 2), dtype=float
+            desired actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        t : float,
+            start time, units=[s]
+        dt : float
+            timestep, unit=[s]
+
+        Returns
+        -------
+        numpy_array
+            shape=(N, 2), dtype=float
+            actual actuation inputs/motor torques,
+            order=[u1, u2],
+            units=[Nm]
+        """
+        nu = np.array(u, dtype=float)
+
+        # tau responsiveness
+        if len(self.tau_values) > 0:
+            last_u = np.asarray(self.tau_values[-1])
+        else:
+            last_u = np.zeros_like(nu)
+        nu = last_u + self.u_responsiveness * (nu - last_u)
+
+        # tau noise (unoise)
+        rng = self.get_random_generator()
+        nu = rng.normal(nu, self.u_noise_sigmas, np.shape(nu))
+
+        tl = np.asarray(self.plant.torque_limit, dtype=float)
+        nu = np.clip(nu, -tl, tl)
+
+        # perturbance
+        # (can exceed joint limits)
+        pert_index = int(t / dt)
+        if np.ndim(self.perturbation_array) == 3:
+            pert = np.asarray(self.perturbation_array)
+            if pert_index < pert.shape[2]:
+                nu += pert[:, :, pert_index]
+        else:
+            for j in range(self.plant.n_actuators):
+                if pert_index < len(self.perturbation_array[j]):
+                    nu[:, j] += self.perturbation_array[j][pert_index]
+
+        return nu
+
+    def simulate(self, t0, x0, tf, dt, controller=None, integrator="runge_kutta"):
+        """
+        Simulate N double pendulums for a time period under the control of a
+        controller
+
+        Parameters
+        ----------
+        t0 : float,
+            start time, units=[s]
+        x0 : array_like, shape=(N, 4), dtype=float,
+            initial states of the double pendulums,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+        tf : float
+            final time, units=[s]
+        dt : float
+            timestep, unit=[s]
+        controller : Controller object or list of Controller objects
+            Controller(s) whose control signals are used
+            (see get_control_u).
+            If None, motor torques are set to 0.
+             (Default value = None)
+        integrator : string
+            string determining the integration method
+            "euler" : Euler integrator
+            "runge_kutta" : Runge Kutta integrator
+             (Default value = "runge_kutta")
+
+        Returns
+        -------
+        numpy_array
+            time points, unit=[s]
+            shape=(M,)
+        numpy_array
+            shape=(N, M, 4)
+            states, units=[rad, rad, rad/s, rad/s]
+            order=[angle1, angle2, velocity1, velocity2]
+        numpy_array
+            shape=(N, M-1, 2)
+            actuations/motor torques
+            order=[u1, u2],
+            units=[Nm]
+        """
+        self.set_state(t0, x0)
+        self.reset_data_recorder(int(np.ceil((tf - t0) / dt)) + 2)
+        self.record_data(t0, self.x, None)
+
+        while self.t < tf:
+            _ = self.controller_step(dt, controller, integrator)
+
+        return self.get_trajectory_data()
+
+    def simulate_and_animate(self, *args, **kwargs):
+        raise NotImplementedError(
+            "The BatchSimulator does not support animations. "
+            "Use the Simulator for animating a single rollout."
+        )
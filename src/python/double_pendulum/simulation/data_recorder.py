@@ -0,0 +1,139 @@
+import numpy as np
+
+
+class RecordBuffer:
+    """
+    RecordBuffer class
+    Preallocated numpy array for recording a sequence of equally shaped
+    entries (e.g. time points, states or torques).
+    The shape of the entries is defined by the first appended entry.
+
+    In the default mode, the buffer grows (doubling its capacity) when it is
+    full. In ring mode, the capacity is fixed and the oldest entries are
+    overwritten when the buffer is full.
+
+    The buffer supports len, (negative) indexing and iteration like a list
+    and can be converted with np.asarray.
+
+    Parameters
+    ----------
+    capacity : int
+        number of entries for which memory is preallocated
+        (Default value = 1024)
+    ring : bool
+        Whether the buffer is a ring buffer with fixed capacity
+        (Default value = False)
+    dtype : numpy dtype
+        data type of the entries
+        (Default value = float)
+    """
+
+    def __init__(self, capacity=1024, ring=False, dtype=float):
+        self.capacity = max(int(capacity), 1)
+        self.ring = ring
+        self.dtype = dtype
+
+        # memory is allocated with the first entry when its shape is known
+        self._data = None
+        self._start = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def append(self, value):
+        """
+        Append an entry to the buffer
+
+        Parameters
+        ----------
+        value : float or array_like
+            entry, all entries need to have the same shape
+        """
+        if self._data is None:
+            shape = np.shape(value)
+            self._data = np.empty((self.capacity,) + shape, dtype=self.dtype)
+        if self._len < self.capacity:
+            self._data[self._len] = value
+            self._len += 1
+        elif self.ring:
+            self._data[self._start] = value
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self.reserve(2 * self.capacity)
+            self._data[self._len] = value
+            self._len += 1
+
+    def reserve(self, capacity):
+        """
+        Make sure that the buffer can hold at least capacity entries.
+        Also applies to ring buffers.
+
+        Parameters
+        ----------
+        capacity : int
+            minimum capacity
+        """
+        if capacity <= self.capacity:
+            return
+        if self._data is not None:
+            data = np.empty((capacity,) + self._data.shape[1:], dtype=self.dtype)
+            data[: self._len] = self.view()
+            self._data = data
+            self._start = 0
+        self.capacity = capacity
+
+    def view(self):
+        """
+        Get the recorded entries in chronological order.
+        Returns a view on the internal memory without copying, unless the
+        ring buffer has wrapped around.
+        The view is not updated if the buffer grows or is reset.
+
+        Returns
+        -------
+        numpy_array
+            shape=(len(buffer), ...)
+        """
+        if self._data is None:
+            return np.empty(0, dtype=self.dtype)
+        if self._start == 0:
+            return self._data[: self._len]
+        return np.concatenate(
+            (self._data[self._start :], self._data[: self._start]), axis=0
+        )
+
+    def tolist(self):
+        return self.view().tolist()
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += self._len
+            if index < 0 or index >= self._len:
+                raise IndexError("RecordBuffer index out of range")
+            return self._data[(self._start + index) % self.capacity]
+        return self.view()[index]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self.view()
+        if dtype is not None:
+            arr = arr.astype(dtype, copy=False)
+        if copy:
+            arr = arr.copy()
+        return arr
+
+    def __eq__(self, other):
+        # list like comparison, e.g. buffer == []
+        try:
+            return bool(np.array_equal(self.view(), np.asarray(other)))
+        except ValueError:
+            return False
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RecordBuffer({self.view()!r})"
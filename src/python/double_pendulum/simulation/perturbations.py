@@ -31,24 +31,65 @@ def get_random_gauss_perturbation_array(
     min_t_dist=1.0,
     sigma_minmax=[0.01, 0.05],
     amplitude_min_max=[0.1, 1.0],
+    rng=None,
 ):
+    """
+    Random gaussian perturbations with n_per_joint pulses per joint. The
+    pulse centers are at least min_t_dist apart, widths and amplitudes are
+    drawn uniformly from the given ranges with random signs.
+
+    Parameters
+    ----------
+    tmax : float
+        duration of the perturbation array, unit=[s]
+    dt : float
+        timestep, unit=[s]
+    n_per_joint : int
+        number of pulses per joint
+        (Default value = 3)
+    min_t_dist : float
+        minimum time between two pulses, unit=[s]
+        (Default value = 1.0)
+    sigma_minmax : list of floats
+        range of the pulse widths
+        (Default value = [0.01, 0.05])
+    amplitude_min_max : list of floats
+        range of the absolute pulse amplitudes
+        (Default value = [0.1, 1.0])
+    rng : numpy.random.Generator
+        draws the pulse parameters, if None np.random is used
+        (Default value = None)
+
+    Returns
+    -------
+    numpy_array
+        shape=(2, N), perturbation array
+    numpy_array
+        shape=(2, n_per_joint), pulse centers
+    numpy_array
+        shape=(2, n_per_joint), pulse widths
+    numpy_array
+        shape=(2, n_per_joint), pulse amplitudes
+    """
+    if rng is None:
+        rng = np.random
     n = 2 * n_per_joint
     wiggle_room = (tmax - (n + 1) * min_t_dist) / n
     mu = []
     for i in range(n):
         if i == 0:
-            mu.append(min_t_dist + np.random.rand() * wiggle_room)
+            mu.append(min_t_dist + rng.random() * wiggle_room)
         else:
-            mu.append(mu[-1] + min_t_dist + np.random.rand() * wiggle_room)
-    np.random.shuffle(mu)
+            mu.append(mu[-1] + min_t_dist + rng.random() * wiggle_room)
+    rng.shuffle(mu)
     mu = np.reshape(mu, (2, n_per_joint))
 
-    sigma = sigma_minmax[0] + np.random.rand(2, n_per_joint) * (
+    sigma = sigma_minmax[0] + rng.random((2, n_per_joint)) * (
         sigma_minmax[1] - sigma_minmax[0]
     )
 
     amp_range = amplitude_min_max[1] - amplitude_min_max[0]
-    amplitudes = np.random.uniform(-amp_range, amp_range, size=(2, n_per_joint))
+    amplitudes = rng.uniform(-amp_range, amp_range, size=(2, n_per_joint))
     amplitudes += amplitude_min_max[0] * np.sign(amplitudes)
 
     return (
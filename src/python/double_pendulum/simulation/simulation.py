@@ -5,6 +5,7 @@ from matplotlib.animation import FuncAnimation
 import matplotlib.animation as mplanimation
 
 from double_pendulum.simulation.visualization import get_arrow, set_arrow_properties
+from double_pendulum.simulation.data_recorder import RecordBuffer
 
 
 class Simulator:
@@ -26,6 +27,12 @@ class Simulator:
         self.x = np.zeros(2 * self.plant.dof)  # position, velocity
         self.t = 0.0  # time
 
+        self.record_mode = "full"
+        self.ring_size = 1000
+
+        # None: global numpy random state
+        self.rng = None
+
         self.reset()
 
     def set_state(self, t, x):
@@ -60,16 +67,68 @@ class Simulator:
         """
         return self.t, self.x
 
-    def reset_data_recorder(self):
+    def set_data_recording(self, mode="full", ring_size=1000):
+        """
+        Set the mode of the internal data recorder.
+        The data is recorded in preallocated numpy arrays (RecordBuffer).
+
+        Parameters
+        ----------
+        mode : string
+            "full" : record the whole trajectory, the memory is
+                preallocated for the simulation time and grows if needed
+            "ring" : only keep the last ring_size time steps,
+                e.g. for endless runs
+            "none" : only keep the last time steps that are needed for the
+                delay and motor models, e.g. for optimization loops in
+                which only the final state is of interest
+            (Default value = "full")
+        ring_size : int
+            number of recorded time steps in "ring" mode
+            (Default value = 1000)
+        """
+        if mode not in ["full", "ring", "none"]:
+            raise NotImplementedError(
+                f"Sorry, the data recording mode {mode} is not implemented."
+            )
+        self.record_mode = mode
+        self.ring_size = ring_size
+        self.reset_data_recorder()
+
+    def reset_data_recorder(self, n_steps=None):
         """
-        Reset the internal data record of the simulator
+        Reset the internal data record of the simulator.
+        New buffers are allocated, i.e. data returned by previous calls of
+        get_trajectory_data stays valid.
+
+        Parameters
+        ----------
+        n_steps : int
+            number of time steps for which memory is preallocated in "full"
+            recording mode. If None, a default size is used and the
+            buffers grow when needed.
+            (Default value = None)
         """
-        self.t_values = []
-        self.x_values = []
-        self.tau_values = []
+        if self.record_mode == "full":
+            capacity = 1024 if n_steps is None else n_steps
+            ring = False
+        elif self.record_mode == "ring":
+            capacity = self.ring_size
+            ring = True
+        else:
+            # the delay and motor models extend this if necessary
+            capacity = 2
+            ring = True
 
-        self.meas_x_values = []
-        self.con_u_values = []
+        self.t_values = RecordBuffer(capacity, ring)
+        self.x_values = RecordBuffer(capacity, ring)
+        self.tau_values = RecordBuffer(capacity, ring)
+
+        self.meas_x_values = RecordBuffer(capacity, ring)
+        self.con_u_values = RecordBuffer(capacity, ring)
+
+        self.stop_reason = None
+        self.stop_success = None
 
     def record_data(self, t, x, tau=None):
         """
@@ -91,13 +150,15 @@ class Simulator:
             units=[Nm]
         """
         self.t_values.append(t)
-        self.x_values.append(list(x))
+        self.x_values.append(x)
         if tau is not None:
-            self.tau_values.append(list(tau))
+            self.tau_values.append(tau)
 
     def get_trajectory_data(self):
         """
-        Get the rocrded trajectory data
+        Get the rocrded trajectory data.
+        The arrays are views on the internal record (no copy), unless the
+        recorder is in "ring" or "none" mode and has wrapped around.
 
         Returns
         -------
@@ -114,9 +175,9 @@ class Simulator:
             order=[u1, u2],
             units=[Nm]
         """
-        T = np.asarray(self.t_values)
-        X = np.asarray(self.x_values)
-        U = np.asarray(self.tau_values)
+        T = self.t_values.view()
+        X = self.x_values.view()
+        U = self.tau_values.view()
         return T, X, U
 
     def set_process_noise(self, process_noise_sigmas=[0.0, 0.0, 0.0, 0.0]):
@@ -198,6 +259,32 @@ class Simulator:
         self.u_noise_sigmas = u_noise_sigmas
         self.u_responsiveness = u_responsiveness
 
+    def set_random_generator(self, rng=None):
+        """
+        Set the random number generator for the process, measurement and
+        motor noise.
+
+        Parameters
+        ----------
+        rng : numpy.random.Generator
+            random number generator, e.g. np.random.default_rng(seed).
+            If None, the global numpy random state is used.
+            (Default value = None)
+        """
+        self.rng = rng
+
+    def get_random_generator(self):
+        """
+        Get the random number generator of the simulator.
+
+        Returns
+        -------
+        numpy.random.Generator or numpy.random module
+            the numpy.random module (global random state) if no generator
+            is set
+        """
+        return np.random if self.rng is None else self.rng
+
     def set_disturbances(self, perturbation_array=[[], []]):
         """
         Set disturbances (hits) happening during the simulation.
@@ -330,7 +417,19 @@ class Simulator:
         #     np.asarray(self.plant.torque_limit),
         # )
 
-        if integrator == "runge_kutta":
+        compiled_dynamics = getattr(self.plant, "compiled_dynamics", None)
+
+        if integrator == "runge_kutta" and compiled_dynamics is not None:
+            # fused Runge Kutta step of the compiled backend
+            x_next = np.empty(2 * self.plant.dof)
+            compiled_dynamics.rk4_step(
+                np.asarray(self.x, dtype=float),
+                np.asarray(tau, dtype=float),
+                dt,
+                x_next,
+            )
+            self.x = x_next
+        elif integrator == "runge_kutta":
             self.x = np.add(
                 self.x,
                 dt * self.runge_integrator(self.x, dt, self.t, tau),
@@ -349,10 +448,11 @@ class Simulator:
                 f"Sorry, the integrator {integrator} is not implemented."
             )
         # process noise
-        self.x = np.random.normal(self.x, self.process_noise_sigmas, np.shape(self.x))
+        rng = self.get_random_generator()
+        self.x = rng.normal(self.x, self.process_noise_sigmas, np.shape(self.x))
 
         self.t += dt
-        self.record_data(self.t, self.x.copy(), tau)
+        self.record_data(self.t, self.x, tau)
         # _ = self.get_measurement(dt)
 
     def get_control_u(self, controller, x, t, dt):
@@ -393,7 +493,7 @@ class Simulator:
                 realtime = False
         else:
             u = np.zeros(self.plant.n_actuators)
-        self.con_u_values.append(np.copy(u))
+        self.con_u_values.append(u)
         return u, realtime
 
     def get_measurement(self, dt):
@@ -423,6 +523,9 @@ class Simulator:
 
         # delay
         n_delay = int(self.delay / dt) + 1
+        # keep enough history for the delay in ring mode
+        self.x_values.reserve(n_delay + 1)
+        self.tau_values.reserve(n_delay + 1)
         if n_delay > 1:
             len_X = len(self.x_values)
             if self.delay_mode == "posvel":
@@ -439,9 +542,10 @@ class Simulator:
         x_meas = np.dot(self.meas_C, x_meas) + np.dot(self.meas_D, u)
 
         # sensor noise
-        x_meas = np.random.normal(x_meas, self.meas_noise_sigmas, np.shape(self.x))
+        rng = self.get_random_generator()
+        x_meas = rng.normal(x_meas, self.meas_noise_sigmas, np.shape(self.x))
 
-        self.meas_x_values.append(np.copy(x_meas))
+        self.meas_x_values.append(x_meas)
         return x_meas
 
     def get_real_applied_u(self, u, t, dt):
@@ -485,7 +589,8 @@ class Simulator:
         nu = last_u + self.u_responsiveness * (nu - last_u)
 
         # tau noise (unoise)
-        nu = np.random.normal(nu, self.u_noise_sigmas, np.shape(nu))
+        rng = self.get_random_generator()
+        nu = rng.normal(nu, self.u_noise_sigmas, np.shape(nu))
 
         nu[0] = np.clip(nu[0], -self.plant.torque_limit[0], self.plant.torque_limit[0])
         nu[1] = np.clip(nu[1], -self.plant.torque_limit[1], self.plant.torque_limit[1])
@@ -537,10 +642,23 @@ class Simulator:
 
         return realtime
 
-    def simulate(self, t0, x0, tf, dt, controller=None, integrator="runge_kutta"):
+    def simulate(
+        self,
+        t0,
+        x0,
+        tf,
+        dt,
+        controller=None,
+        integrator="runge_kutta",
+        termination=None,
+    ):
         """
         Simulate the double pendulum for a time period under the control of a
-        controller
+        controller.
+        The simulation can be terminated early by termination predicates
+        (see simulation.termination). The reason is stored in
+        self.stop_reason (None if the simulation ran until tf) and the
+        outcome in self.stop_success (None, True or False).
 
         Parameters
         ----------
@@ -563,35 +681,70 @@ class Simulator:
             "euler" : Euler integrator
             "runge_kutta" : Runge Kutta integrator
              (Default value = "runge_kutta")
+        termination : list of TerminationPredicate objects
+            predicates which are checked for the initial state and after
+            every step. The simulation stops as soon as one of them
+            returns True.
+            (Default value = None)
 
         Returns
         -------
-        list
+        numpy_array
             time points, unit=[s]
             shape=(N,)
-        list
+        numpy_array
             shape=(N, 4)
             states, units=[rad, rad, rad/s, rad/s]
             order=[angle1, angle2, velocity1, velocity2]
-        list
+        numpy_array
             shape=(N, 2)
             actuations/motor torques
             order=[u1, u2],
             units=[Nm]
         """
         self.set_state(t0, x0)
-        self.reset_data_recorder()
+        self.reset_data_recorder(int(np.ceil((tf - t0) / dt)) + 2)
         self.record_data(t0, np.copy(x0), None)
         # self.meas_x_values.append(np.copy(x0))
 
         # self.init_filter(x0, dt, integrator)
 
+        stop = False
+        if termination is not None:
+            for predicate in termination:
+                predicate.reset()
+            stop = self.check_termination(termination)
+
         N = 0
-        while self.t < tf:
+        while self.t < tf and not stop:
             _ = self.controller_step(dt, controller, integrator)
             N += 1
+            if termination is not None:
+                stop = self.check_termination(termination)
+
+        return self.get_trajectory_data()
+
+    def check_termination(self, termination):
+        """
+        Check termination predicates for the current time and state and
+        store the reason and outcome of the first predicate that is
+        fulfilled in self.stop_reason and self.stop_success.
 
-        return self.t_values, self.x_values, self.tau_values
+        Parameters
+        ----------
+        termination : list of TerminationPredicate objects
+
+        Returns
+        -------
+        bool
+            True if the simulation shall stop
+        """
+        for predicate in termination:
+            if predicate(self.t, self.x):
+                self.stop_reason = predicate.reason
+                self.stop_success = predicate.success
+                return True
+        return False
 
     def _animation_init(self):
         """init of the animation plot"""
@@ -836,14 +989,14 @@ class Simulator:
 
         Returns
         -------
-        list
+        numpy_array
             time points, unit=[s]
             shape=(N,)
-        list
+        numpy_array
             shape=(N, 4)
             states, units=[rad, rad, rad/s, rad/s]
             order=[angle1, angle2, velocity1, velocity2]
-        list
+        numpy_array
             shape=(N, 2)
             actuations/motor torques
             order=[u1, u2],
@@ -944,7 +1097,7 @@ class Simulator:
         )
 
         self.set_state(t0, x0)
-        self.reset_data_recorder()
+        self.reset_data_recorder(int(np.ceil((tf - t0) / dt)) + 2)
         self.record_data(t0, np.copy(x0), None)
         self.meas_x_values.append(x0)
         if save_video:
@@ -957,4 +1110,4 @@ class Simulator:
             plt.show()
         plt.close()
 
-        return self.t_values, self.x_values, self.tau_values
+        return self.get_trajectory_data()
@@ -0,0 +1,146 @@
+import numpy as np
+
+
+def _goal_error(x, goal):
+    # state error with angle differences wrapped to [-pi, pi)
+    err = np.asarray(x) - goal
+    err[:2] = (err[:2] + np.pi) % (2 * np.pi) - np.pi
+    return np.abs(err)
+
+
+class TerminationPredicate:
+    """
+    TerminationPredicate class
+    Base class of predicates which terminate a simulation early
+    (see Simulator.simulate) as soon as the outcome of the rollout is
+    decided.
+
+    A predicate is called with the time and state after every simulation
+    step (and with the initial state) and returns True if the simulation
+    shall stop. The simulator then records the predicate's reason and
+    success flag.
+
+    Parameters
+    ----------
+    reason : string
+        stop reason reported by the simulator
+    success : bool
+        whether stopping by this predicate means a successful rollout
+    """
+
+    def __init__(self, reason, success):
+        self.reason = reason
+        self.success = success
+
+    def reset(self):
+        """
+        Reset the internal state of the predicate, called at the start of
+        every simulation.
+        """
+        pass
+
+    def __call__(self, t, x):
+        """
+        Check the termination condition.
+
+        Parameters
+        ----------
+        t : float
+            time, units=[s]
+        x : array_like, shape=(4,), dtype=float,
+            state of the double pendulum,
+            order=[angle1, angle2, velocity1, velocity2],
+            units=[rad, rad, rad/s, rad/s]
+
+        Returns
+        -------
+        bool
+            True if the simulation shall stop
+        """
+        raise NotImplementedError
+
+
+class LeftEpsilonTube(TerminationPredicate):
+    """
+    Stops the simulation (failure) as soon as the state leaves the epsilon
+    tube around the goal, i.e. |x - goal| > epsilon for any state
+    coordinate (angles are wrapped).
+
+    Parameters
+    ----------
+    goal : array_like, shape=(4,), dtype=float,
+        goal state
+    epsilon : array_like, shape=(4,), dtype=float,
+        half widths of the tube
+    reason : string
+        (Default value = "left_tube")
+    """
+
+    def __init__(self, goal, epsilon, reason="left_tube"):
+        super().__init__(reason, success=False)
+        self.goal = np.asarray(goal, dtype=float)
+        self.epsilon = np.asarray(epsilon, dtype=float)
+
+    def __call__(self, t, x):
+        return bool(np.any(_goal_error(x, self.goal) > self.epsilon))
+
+
+class VelocityLimit(TerminationPredicate):
+    """
+    Stops the simulation (failure) if a joint velocity exceeds a limit or the
+    state is not finite anymore.
+
+    Parameters
+    ----------
+    max_velocity : float
+        velocity limit, units=[rad/s]
+    reason : string
+        (Default value = "velocity_limit")
+    """
+
+    def __init__(self, max_velocity, reason="velocity_limit"):
+        super().__init__(reason, success=False)
+        self.max_velocity = max_velocity
+
+    def __call__(self, t, x):
+        return not (
+            np.all(np.isfinite(x)) and np.all(np.abs(x[2:]) <= self.max_velocity)
+        )
+
+
+class GoalDwell(TerminationPredicate):
+    """
+    Stops the simulation (success) when the state stayed within the epsilon
+    region around the goal for dwell_time seconds without interruption.
+    With dwell_time=0, the simulation stops when the goal region is reached.
+
+    Parameters
+    ----------
+    goal : array_like, shape=(4,), dtype=float,
+        goal state
+    epsilon : array_like, shape=(4,), dtype=float,
+        half widths of the goal region
+    dwell_time : float
+        time the state has to stay in the goal region, units=[s]
+        (Default value = 0.0)
+    reason : string
+        (Default value = "goal_reached")
+    """
+
+    def __init__(self, goal, epsilon, dwell_time=0.0, reason="goal_reached"):
+        super().__init__(reason, success=True)
+        self.goal = np.asarray(goal, dtype=float)
+        self.epsilon = np.asarray(epsilon, dtype=float)
+        self.dwell_time = dwell_time
+        self.t_enter = None
+
+    def reset(self):
+        self.t_enter = None
+
+    def __call__(self, t, x):
+        if np.any(_goal_error(x, self.goal) >= self.epsilon):
+            self.t_enter = None
+            return False
+        if self.t_enter is None:
+            self.t_enter = t
+        return t - self.t_enter >= self.dwell_time
@@ -3,7 +3,7 @@ import sympy as smp
 
 from double_pendulum.system_identification.data_prep import smooth_data
 from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
-from double_pendulum.utils.csv_trajectory import load_trajectory_full
+from double_pendulum.utils.trajectory import Trajectory
 
 
 class yb_matrix_sym():
@@ -56,21 +56,24 @@ def build_identification_matrices(fixed_mpar, variable_mpar,
 
     t0 = 0.
     for i, mdf in enumerate(measured_data_filepath):
-        traj = load_trajectory_full(mdf)
-
-        T = traj["T"]
+        if isinstance(mdf, Trajectory):
+            traj = mdf
+        else:
+            traj = Trajectory(mdf)
 
-        if traj["X_meas"] is not None:
-            X = traj["X_meas"]
+        if "X_meas" in traj:
+            x_channel = "X_meas"
         else:
-            X = traj["X"]
+            x_channel = "X"
 
-        if traj["U_meas"] is not None:
-            U = traj["U_meas"]
-        elif traj["U_con"] is not None:
-            U = traj["U_con"]
+        if "U_meas" in traj:
+            u_channel = "U_meas"
+        elif "U_con" in traj:
+            u_channel = "U_con"
         else:
-            U = traj["U"]
+            u_channel = "U"
+
+        T, X, U = traj.get("T", x_channel, u_channel)
 
         (ti, pos1, pos2, vel1, vel2,
          acc1, acc2, tau1, tau2) = smooth_data(
@@ -168,21 +171,24 @@ def build_identification_function(fixed_mpar, variable_mpar,
 
     t0 = 0.
     for i, mdf in enumerate(measured_data_filepath):
-        traj = load_trajectory_full(mdf)
-
-        T = traj["T"]
+        if isinstance(mdf, Trajectory):
+            traj = mdf
+        else:
+            traj = Trajectory(mdf)
 
-        if traj["X_meas"] is not None:
-            X = traj["X_meas"]
+        if "X_meas" in traj:
+            x_channel = "X_meas"
         else:
-            X = traj["X"]
+            x_channel = "X"
 
-        if traj["U_meas"] is not None:
-            U = traj["U_meas"]
-        elif traj["U_con"] is not None:
-            U = traj["U_con"]
+        if "U_meas" in traj:
+            u_channel = "U_meas"
+        elif "U_con" in traj:
+            u_channel = "U_con"
         else:
-            U = traj["U"]
+            u_channel = "U"
+
+        T, X, U = traj.get("T", x_channel, u_channel)
 
         (ti, pos1, pos2, vel1, vel2,
          acc1, acc2, tau1, tau2) = smooth_data(
@@ -0,0 +1,95 @@
+import os
+import hashlib
+import tempfile
+
+
+def get_cache_dir(subdir=""):
+    """
+    Get (and create) the directory where double_pendulum stores cached
+    files, e.g. generated dynamics code.
+    The base directory can be set with the environment variable
+    DOUBLE_PENDULUM_CACHE_DIR and defaults to ~/.cache/double_pendulum.
+
+    Parameters
+    ----------
+    subdir : string
+        subdirectory inside the cache directory
+        (Default value = "")
+
+    Returns
+    -------
+    string
+        path to the cache directory
+    """
+    base = os.environ.get(
+        "DOUBLE_PENDULUM_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "double_pendulum"),
+    )
+    path = os.path.join(base, subdir)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_package_version():
+    """
+    Get the installed version of the double_pendulum package.
+
+    Returns
+    -------
+    string
+        package version, "unknown" if the package is not installed
+    """
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+
+        return version("DoublePendulum")
+    except (ImportError, PackageNotFoundError):
+        return "unknown"
+
+
+def hash_key(*items):
+    """
+    Content hash of the string representation of the items.
+    Floats are represented with full precision by repr.
+
+    Parameters
+    ----------
+    items : objects with deterministic repr
+
+    Returns
+    -------
+    string
+        hex digest (sha256, shortened to 24 characters)
+    """
+    h = hashlib.sha256()
+    for it in items:
+        h.update(repr(it).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()[:24]
+
+
+def atomic_write(path, data, mode="w"):
+    """
+    Write data to a file atomically, i.e. other processes either see
+    the old file or the complete new file.
+
+    Parameters
+    ----------
+    path : string or path object
+        path of the file
+    data : string or bytes
+        content of the file
+    mode : string
+        "w" for strings, "wb" for bytes
+        (Default value = "w")
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
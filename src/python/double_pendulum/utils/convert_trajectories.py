@@ -0,0 +1,89 @@
+import os
+import argparse
+
+from double_pendulum.utils.csv_trajectory import (
+    convert_to_binary,
+    has_binary_trajectory,
+)
+
+
+def find_trajectory_csvs(paths):
+    """
+    Find trajectory csv files.
+
+    Parameters
+    ----------
+    paths : list of strings
+        csv files or directories, which are searched recursively
+
+    Returns
+    -------
+    list of strings
+        paths to the csv files
+    """
+    csv_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for f in sorted(files):
+                    if f.endswith(".csv"):
+                        csv_paths.append(os.path.join(root, f))
+        else:
+            csv_paths.append(path)
+    return csv_paths
+
+
+def convert_trajectories(paths, force=False, verbose=True):
+    """
+    Convert trajectory csv files to the binary trajectory format. The binary
+    files are stored next to the csv files (see convert_to_binary) and are
+    preferred by load_trajectory_full.
+    Csv files which can not be read as trajectory (e.g. without time column)
+    are skipped.
+
+    Parameters
+    ----------
+    paths : list of strings
+        csv files or directories, which are searched recursively
+    force : bool
+        whether to also convert files with an up to date binary sibling
+        (Default value = False)
+    verbose : bool
+        whether to print the converted files
+        (Default value = True)
+
+    Returns
+    -------
+    list of strings
+        paths to the written .npz files
+    """
+    npz_paths = []
+    for csv_path in find_trajectory_csvs(paths):
+        if not force and has_binary_trajectory(csv_path):
+            continue
+        try:
+            npz_path = convert_to_binary(csv_path)
+        except Exception as e:
+            if verbose:
+                print(f"Skipping {csv_path}: {e}")
+            continue
+        npz_paths.append(npz_path)
+        if verbose:
+            print(f"{csv_path} -> {npz_path}")
+    return npz_paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert trajectory csv files to the binary (.npz) format."
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="csv files or directories (searched recursively)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Also convert files which already have an up to date .npz file.",
+    )
+    args = parser.parse_args()
+    convert_trajectories(args.paths, force=args.force)
@@ -1,6 +1,29 @@
+import os
 import numpy as np
 import pandas as pd
 
+# trajectory channels in the order of the csv columns.
+# The desired states/torques and perturbations are padded with zeros if they
+# are shorter than the preceding channels, all channels are cut to the
+# shortest length.
+TRAJECTORY_CHANNELS = [
+    "T",
+    "X",
+    "U",
+    "ACC",
+    "X_meas",
+    "X_filt",
+    "X_des",
+    "U_con",
+    "U_fric",
+    "U_meas",
+    "U_des",
+    "U_perturbation",
+    "K",
+    "k",
+]
+_PADDED_CHANNELS = ["X_des", "U_des", "U_perturbation"]
+
 
 # def save_trajectory(csv_path, T, X, U=None):
 #     TT = np.asarray(T)
@@ -44,6 +67,26 @@ def save_trajectory(
     K=None,
     k=None,
 ):
+    if os.path.splitext(csv_path)[1] == ".npz":
+        save_trajectory_binary(
+            csv_path,
+            T=T,
+            X=X,
+            U=U,
+            ACC=ACC,
+            X_meas=X_meas,
+            X_filt=X_filt,
+            X_des=X_des,
+            U_con=U_con,
+            U_fric=U_fric,
+            U_meas=U_meas,
+            U_des=U_des,
+            U_perturbation=U_perturbation,
+            K=K,
+            k=k,
+        )
+        return
+
     data = []
     header = ""
 
@@ -74,7 +117,7 @@ def save_trajectory(
         header += ",acc1,acc2"
         min_len = min(min_len, len(ACC))
 
-    if X_meas is not None and len(X_des) > 0:
+    if X_meas is not None and len(X_meas) > 0:
         data.append(np.array(X_meas).T[0])
         data.append(np.array(X_meas).T[1])
         data.append(np.array(X_meas).T[2])
@@ -164,7 +207,178 @@ def save_trajectory(
     # print(f"CSV file saved to {csv_path}")
 
 
-def load_trajectory_full(csv_path):
+def binary_trajectory_path(csv_path):
+    """
+    Path of the binary (.npz) sibling of a trajectory csv file.
+
+    Parameters
+    ----------
+    csv_path : string or path object
+        path to the csv file
+
+    Returns
+    -------
+    string
+        path with the extension replaced by .npz
+    """
+    return os.path.splitext(os.fspath(csv_path))[0] + ".npz"
+
+
+def save_trajectory_binary(npz_path, **channels):
+    """
+    Save a trajectory in the binary trajectory format, an uncompressed
+    numpy .npz archive with one array per channel.
+    The channels are padded and cut to the same length as by save_trajectory.
+
+    Parameters
+    ----------
+    npz_path : string or path object
+        path to the .npz file
+    **channels : array_like
+        trajectory channels with the names and shapes of save_trajectory,
+        i.e. T, X, U, ACC, X_meas, X_filt, X_des, U_con, U_fric, U_meas,
+        U_des, U_perturbation, K, k. Channels which are None or empty are
+        not saved.
+    """
+    for name in channels.keys():
+        if name not in TRAJECTORY_CHANNELS:
+            raise ValueError(f"Unknown trajectory channel {name}")
+
+    data = {}
+    min_len = np.inf
+    for name in TRAJECTORY_CHANNELS:
+        value = channels.get(name, None)
+        if value is None or len(value) == 0:
+            continue
+        value = np.asarray(value, dtype=float)
+        if name in _PADDED_CHANNELS and len(value) < min_len < np.inf:
+            padding = np.zeros((int(min_len) - len(value),) + value.shape[1:])
+            value = np.append(value, padding, axis=0)
+        data[name] = value
+        min_len = min(min_len, len(value))
+
+    if len(data) == 0:
+        raise ValueError("No trajectory channels to save")
+    for name in data.keys():
+        data[name] = data[name][:min_len]
+
+    # np.savez appends .npz to paths without extension
+    with open(npz_path, "wb") as f:
+        np.savez(f, **data)
+
+
+def load_trajectory_binary(npz_path):
+    """
+    Load a trajectory from the binary trajectory format.
+
+    Parameters
+    ----------
+    npz_path : string or path object
+        path to the .npz file
+
+    Returns
+    -------
+    dict
+        same keys as returned by load_trajectory_full,
+        channels which are not in the file are None
+    """
+    traj = {
+        "T": None,
+        "X": None,
+        "U": None,
+        "ACC": None,
+        "X_meas": None,
+        "X_filt": None,
+        "X_des": None,
+        "U_con": None,
+        "U_fric": None,
+        "U_meas": None,
+        "U_des": None,
+        "U_perturbation": None,
+        "K": None,
+        "k": None,
+    }
+    with np.load(npz_path) as data:
+        for name in traj.keys():
+            if name in data.files:
+                traj[name] = data[name]
+    return traj
+
+
+def has_binary_trajectory(csv_path):
+    """
+    Whether a trajectory csv file has an up to date binary sibling, i.e. the
+    .npz file exists and is not older than the csv file.
+
+    Parameters
+    ----------
+    csv_path : string or path object
+        path to the csv file
+
+    Returns
+    -------
+    bool
+    """
+    npz_path = binary_trajectory_path(csv_path)
+    if not os.path.exists(npz_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(npz_path) >= os.path.getmtime(csv_path)
+
+
+def convert_to_binary(csv_path, npz_path=None):
+    """
+    Convert a trajectory csv file to the binary trajectory format.
+
+    Parameters
+    ----------
+    csv_path : string or path object
+        path to the csv file
+    npz_path : string or path object
+        path to the .npz file,
+        if None the binary sibling of the csv file is used
+        (Default value = None)
+
+    Returns
+    -------
+    string
+        path to the .npz file
+    """
+    if npz_path is None:
+        npz_path = binary_trajectory_path(csv_path)
+    traj = load_trajectory_full(csv_path, prefer_binary=False)
+    save_trajectory_binary(npz_path, **traj)
+    return npz_path
+
+
+def load_trajectory_full(csv_path, prefer_binary=True):
+    """
+    Load all channels of a trajectory file.
+    Files with the extension .npz are read in the binary trajectory format.
+    For csv files, an up to date binary sibling (same path with the
+    extension .npz, see convert_to_binary) is loaded instead if it exists.
+
+    Parameters
+    ----------
+    csv_path : string or path object
+        path to the trajectory file
+    prefer_binary : bool
+        whether to load the binary sibling of a csv file if it exists
+        (Default value = True)
+
+    Returns
+    -------
+    dict
+        with keys "T", "X", "U", "ACC", "X_meas", "X_filt", "X_des",
+        "U_con", "U_fric", "U_meas", "U_des", "U_perturbation", "K", "k",
+        channels which are not in the file are None
+    """
+    if os.path.splitext(os.fspath(csv_path))[1] == ".npz":
+        return load_trajectory_binary(csv_path)
+    if prefer_binary and has_binary_trajectory(csv_path):
+        return load_trajectory_binary(binary_trajectory_path(csv_path))
+
     traj = {}
     # traj["time"] = None
     # traj["pos1"] = None
@@ -195,6 +409,7 @@ def load_trajectory_full(csv_path):
     traj["U_fric"] = None
     traj["U_meas"] = None
     traj["U_des"] = None
+    traj["U_perturbation"] = None
     traj["K"] = None
     traj["k"] = None
 
@@ -253,6 +468,9 @@ def load_trajectory_full(csv_path):
     if all((key in data.keys() for key in ["tau_des1", "tau_des2"])):
         traj["U_des"] = np.asarray([data["tau_des1"], data["tau_des2"]]).T
 
+    if all((key in data.keys() for key in ["tau_pert1", "tau_pert2"])):
+        traj["U_perturbation"] = np.asarray([data["tau_pert1"], data["tau_pert2"]]).T
+
     if all(
         (
             key in data.keys()
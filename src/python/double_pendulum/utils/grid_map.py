@@ -0,0 +1,230 @@
+import os
+import json
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+
+from double_pendulum.utils.cache import atomic_write
+
+
+def open_grid_file(path, shape, key=None):
+    """
+    Open a resumable grid file. The values are stored in a .npy file which
+    is memory mapped, so that results written to it are on disk
+    immediately. Grid points which have not been evaluated yet are NaN.
+    The shape and the key are stored in the file path+".json". If the
+    existing file was written for a different shape or key, it is replaced
+    by a new file.
+
+    Parameters
+    ----------
+    path : string
+        path to the .npy file
+    shape : tuple of ints
+        shape of the grid
+    key : string
+        identifier of the evaluated function and grid, e.g. a hash_key
+        (Default value = None)
+
+    Returns
+    -------
+    numpy.memmap
+        grid values, dtype=float
+    """
+    meta_path = path + ".json"
+    meta = {"shape": [int(n) for n in shape], "key": key}
+    if os.path.exists(path) and os.path.exists(meta_path):
+        try:
+            with open(meta_path, "r") as f:
+                old_meta = json.load(f)
+            if old_meta == meta:
+                return np.lib.format.open_memmap(path, mode="r+")
+        except (OSError, ValueError):
+            pass
+    values = np.lib.format.open_memmap(
+        path, mode="w+", dtype=float, shape=tuple(meta["shape"])
+    )
+    values[...] = np.nan
+    values.flush()
+    atomic_write(meta_path, json.dumps(meta))
+    return values
+
+
+def _lattice(n, step):
+    # indices with spacing step along an axis of length n (incl. the last one)
+    idx = list(range(0, n, step))
+    if idx[-1] != n - 1:
+        idx.append(n - 1)
+    return np.array(idx)
+
+
+def _refine_cells(values, tol):
+    # cells of the lattice whose corner values differ by more than tol times
+    # the range of all values
+    d = values.ndim
+    cell_shape = tuple(n - 1 for n in values.shape)
+    cell_max = np.full(cell_shape, -np.inf)
+    cell_min = np.full(cell_shape, np.inf)
+    for offset in itertools.product([0, 1], repeat=d):
+        corner = values[tuple(slice(o, o + n) for o, n in zip(offset, cell_shape))]
+        np.maximum(cell_max, corner, out=cell_max)
+        np.minimum(cell_min, corner, out=cell_min)
+    value_range = np.nanmax(values) - np.nanmin(values)
+    return cell_max - cell_min > tol * value_range
+
+
+def _cells_to_points(cells, coarse, fine):
+    # fine lattice points which lie in (or on the border of) one of the cells
+    points = cells.astype(float)
+    for k in range(cells.ndim):
+        inside = (coarse[k][None, :-1] <= fine[k][:, None]) & (
+            fine[k][:, None] <= coarse[k][None, 1:]
+        )
+        points = np.moveaxis(
+            np.tensordot(inside.astype(float), points, axes=([1], [k])), 0, k
+        )
+    return points > 0.0
+
+
+class _GridEvaluator:
+    # evaluates grid points and writes the results to the store
+    def __init__(self, fct, axes, store, executor, verbose):
+        self.fct = fct
+        self.axes = axes
+        self.store = store
+        self.executor = executor
+        self.verbose = verbose
+
+    def point(self, index):
+        return tuple(float(a[i]) for a, i in zip(self.axes, index))
+
+    def finish(self, index, value):
+        self.store[index] = value
+        if isinstance(self.store, np.memmap):
+            self.store.flush()
+
+    def __call__(self, indices):
+        todo = [i for i in indices if np.isnan(self.store[i])]
+        if self.verbose and len(todo) < len(indices):
+            print(f"  {len(indices) - len(todo)} grid points loaded from file")
+        if self.executor is None or len(todo) <= 1:
+            for counter, i in enumerate(todo):
+                self.finish(i, self.fct(self.point(i)))
+                if self.verbose:
+                    print(f"  {counter + 1}/{len(todo)} grid points evaluated")
+        else:
+            futures = {
+                self.executor.submit(self.fct, self.point(i)): i for i in todo
+            }
+            for counter, future in enumerate(as_completed(futures)):
+                self.finish(futures[future], future.result())
+                if self.verbose:
+                    print(f"  {counter + 1}/{len(todo)} grid points evaluated")
+
+
+def grid_map(
+    fct,
+    axes,
+    n_workers=1,
+    save_file=None,
+    key=None,
+    refine_levels=0,
+    refine_tol=0.1,
+    verbose=False,
+):
+    """
+    Evaluate a function on a (multi dimensional) parameter grid.
+    The grid points are evaluated in a process pool and the results are
+    written to a resumable grid file (see open_grid_file) as soon as they
+    are available. Grid points which are already in the file are not
+    evaluated again.
+
+    With refine_levels > 0, the function is first evaluated on a coarse
+    grid with a spacing of 2**refine_levels grid points. The spacing is then
+    halved refine_levels times and only cells of the current grid, where
+    the function values at the corners differ by more than refine_tol times
+    the range of all values, are refined. Grid points in the other cells
+    are linearly interpolated.
+
+    Parameters
+    ----------
+    fct : function
+        function of a tuple with one value per axis, has to be picklable
+        if n_workers > 1, NaN return values are evaluated again when the
+        computation is resumed
+    axes : list of array_like
+        sorted values of the grid along each axis
+    n_workers : int
+        number of worker processes
+        (Default value = 1)
+    save_file : string
+        path to the .npy file for the results, None for no file
+        (Default value = None)
+    key : string
+        identifier of fct, stored with the save_file to decide whether
+        the computation can be resumed from it
+        (Default value = None)
+    refine_levels : int
+        number of refinement levels, 0 evaluates all grid points
+        (Default value = 0)
+    refine_tol : float
+        relative threshold for the refinement of a cell
+        (Default value = 0.1)
+    verbose : bool
+        whether to print the progress
+        (Default value = False)
+
+    Returns
+    -------
+    numpy_array
+        shape=(len(axes[0]), ..., len(axes[-1])),
+        function values, interpolated in cells which were not refined
+    numpy_array
+        same shape, dtype=bool, which grid points have been evaluated
+    """
+    axes = [np.asarray(a, dtype=float) for a in axes]
+    shape = tuple(len(a) for a in axes)
+    if save_file is None:
+        store = np.full(shape, np.nan)
+    else:
+        store = open_grid_file(save_file, shape, key)
+
+    executor = None
+    if n_workers > 1:
+        executor = ProcessPoolExecutor(max_workers=n_workers)
+    evaluate = _GridEvaluator(fct, axes, store, executor, verbose)
+    try:
+        step = 2**refine_levels
+        coarse = [_lattice(n, step) for n in shape]
+        evaluate(list(itertools.product(*coarse)))
+        values = np.full(shape, np.nan)
+        values[np.ix_(*coarse)] = store[np.ix_(*coarse)]
+        while step > 1:
+            step = step // 2
+            fine = [_lattice(n, step) for n in shape]
+            coarse_values = values[np.ix_(*coarse)]
+            cells = _refine_cells(coarse_values, refine_tol)
+            refine = _cells_to_points(cells, coarse, fine)
+            if verbose:
+                print(f"Spacing {step}: refining {np.sum(cells)} cells")
+            evaluate(
+                [tuple(f[i] for f, i in zip(fine, p)) for p in zip(*np.nonzero(refine))]
+            )
+
+            interp = RegularGridInterpolator(
+                [a[c] for a, c in zip(axes, coarse)], coarse_values
+            )
+            fine_points = np.stack(
+                np.meshgrid(*[a[f] for a, f in zip(axes, fine)], indexing="ij"), axis=-1
+            )
+            fine_values = np.asarray(store[np.ix_(*fine)])
+            fine_values = np.where(
+                np.isnan(fine_values), interp(fine_points), fine_values
+            )
+            values[np.ix_(*fine)] = fine_values
+            coarse = fine
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return values, ~np.isnan(np.asarray(store))
@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.optimize import curve_fit as cf
 
 
 def poly1(t, A, B):
@@ -14,6 +13,131 @@ def poly3(t, A, B, C, D):
     return A * pow(t, 3) + B * pow(t, 2) + C * pow(t, 1) + D
 
 
+def _horner(coeffs, t):
+    # evaluate polynomial(s) with coefficients (..., poly_degree+1) at t
+    result = coeffs[..., 0]
+    for k in range(1, coeffs.shape[-1]):
+        result = result * t + coeffs[..., k]
+    return result
+
+
+def fit_polynomials(data_x, data_y, poly_degree):
+    """
+    Least squares fit of one polynomial to each of multiple sections of data.
+    The fits are linear least squares problems and are solved batched
+    (one pseudo-inverse of the Vandermonde matrices per section length)
+    instead of one nonlinear fit per section.
+
+    Parameters
+    ----------
+    data_x : list of array_likes
+        x data of the sections, usually time
+    data_y : list of array_likes
+        y data of the sections, same lengths as data_x
+    poly_degree : int
+        degree of the polynomials
+
+    Returns
+    -------
+    numpy_array
+        shape=(n_sections, poly_degree+1)
+        coefficients of the polynomials, highest degree first
+    """
+    lengths = np.array([len(x) for x in data_x])
+    coeffs = np.empty((len(data_x), poly_degree + 1))
+    powers = np.arange(poly_degree, -1, -1)
+    for length in np.unique(lengths):
+        index = np.flatnonzero(lengths == length)
+        x = np.array([data_x[i] for i in index], dtype=float)
+        y = np.array([data_y[i] for i in index], dtype=float)
+        vander = x[:, :, None] ** powers
+        # column scaling for a better conditioned solve
+        scale = np.linalg.norm(vander, axis=1, keepdims=True)
+        scale[scale == 0.0] = 1.0
+        sol = np.linalg.pinv(vander / scale) @ y[:, :, None]
+        coeffs[index] = sol[:, :, 0] / scale[:, 0, :]
+    return coeffs
+
+
+class PiecewisePolynomialTable:
+    """
+    Flat lookup table of piecewise polynomials which share their sections,
+    e.g. the polynomials of all dimensions of a vector.
+    A query time is mapped to the first section whose end time is not
+    smaller than the query time (binary search, or a cached cursor for
+    monotonically increasing query times) and all dimensions are evaluated
+    in one vectorized Horner pass.
+
+    Parameters
+    ----------
+    breaks : array_like, shape=(n_sections,)
+        end times of the sections
+    coeffs : array_like, shape=(n_sections, poly_degree+1, dim)
+        polynomial coefficients of the sections, highest degree first
+    """
+
+    def __init__(self, breaks, coeffs):
+        self.breaks = np.asarray(breaks, dtype=float)
+        self.coeffs = np.asarray(coeffs, dtype=float)
+        self.sorted = bool(np.all(np.diff(self.breaks) >= 0.0))
+        self._cursor = 0
+
+    def section_index(self, value):
+        """
+        Section index for query times.
+
+        Parameters
+        ----------
+        value : float or array_like
+            query time(s)
+
+        Returns
+        -------
+        int or numpy_array of ints
+        """
+        breaks = self.breaks
+        n = len(breaks)
+        if self.sorted:
+            if np.ndim(value) == 0:
+                # cached cursor, valid for repeated or slightly increased times
+                for i in (self._cursor, self._cursor + 1):
+                    if i < n and value <= breaks[i]:
+                        if i == 0 or breaks[i - 1] < value:
+                            self._cursor = i
+                            return i
+            index = np.searchsorted(breaks, value, side="left")
+        else:
+            above = np.asarray(value)[..., None] <= breaks
+            index = np.where(np.any(above, axis=-1), np.argmax(above, axis=-1), n)
+        if np.any(index >= n):
+            raise ValueError(
+                f"Time {value} is beyond the end of the last section ({breaks[-1]})"
+            )
+        if np.ndim(index) == 0:
+            index = int(index)
+            self._cursor = index
+        return index
+
+    def get_value(self, value):
+        """
+        Evaluate the polynomials.
+
+        Parameters
+        ----------
+        value : float or array_like, shape=(n,)
+            query time(s)
+
+        Returns
+        -------
+        numpy_array
+            shape=(dim,) for a single query time,
+            shape=(n, dim) for an array of query times
+        """
+        coeffs = np.moveaxis(self.coeffs[self.section_index(value)], -2, -1)
+        t = np.asarray(value, dtype=float)[..., None]
+        return _horner(coeffs, t)
+
+
 class FitPiecewisePolynomial:
     """
     Gets data and number of break points and
@@ -68,38 +192,59 @@ class FitPiecewisePolynomial:
         """
         splitted_data_x = self.split_data(self.data_x)
         splitted_data_y = self.split_data(self.data_y)
+        coeffs = fit_polynomials(splitted_data_x, splitted_data_y, self.poly_degree)
         x_sec_data = []
         y_sec_data = []
         coeff_sec_data = []
-        index = 0
-        for sec in splitted_data_x:
-            x_sec_data.append(np.linspace(sec[0], sec[-1], len(sec)))
-            func = self.determin_poly()  # self.poly3
-            p_coeff, p_cov = cf(
-                func, splitted_data_x[index], splitted_data_y[index], maxfev=2000
-            )
-            fit = func(x_sec_data[index], *p_coeff)
-            y_sec_data.append(fit)
+        for sec, p_coeff in zip(splitted_data_x, coeffs):
+            x_sec = np.linspace(sec[0], sec[-1], len(sec))
+            x_sec_data.append(x_sec)
+            y_sec_data.append(_horner(p_coeff, x_sec))
             coeff_sec_data.append(p_coeff)
-            index += 1
         self.x_sec_data = x_sec_data
         self.y_sec_data = y_sec_data
         self.coeff_sec_data = coeff_sec_data
+        self.table = PiecewisePolynomialTable(
+            self.section_ends(), np.asarray(coeff_sec_data)[:, :, None]
+        )
         return x_sec_data, y_sec_data, coeff_sec_data
 
+    def section_ends(self):
+        """
+        Largest time of every section. A time belongs to the first section
+        whose end is not smaller than the time.
+        """
+        return np.array([np.max(x) for x in self.x_sec_data])
+
     def get_value(self, value):
-        poly_index = min(
-            [
-                index
-                for index, element in enumerate(
-                    [any(poly >= value) for poly in self.x_sec_data]
-                )
-                if element == True
-            ]
-        )
-        p_coeff = self.coeff_sec_data[poly_index]
-        func = self.determin_poly()  # self.poly3
-        return func(value, *p_coeff)
+        """
+        Evaluate the piecewise polynomial.
+
+        Parameters
+        ----------
+        value : float or array_like
+            time(s)
+
+        Returns
+        -------
+        float or numpy_array
+        """
+        return self.table.get_value(value)[..., 0][()]
+
+
+def _stack_tables(T, polys, num_break, poly_degree):
+    # one table for multiple piecewise polynomials on the same time points,
+    # missing (None) polynomials are zero
+    breaks = None
+    coeffs = np.zeros((num_break, poly_degree + 1, len(polys)))
+    for d, pol in enumerate(polys):
+        if pol is not None:
+            breaks = pol.table.breaks
+            coeffs[:, :, d] = pol.table.coeffs[:, :, 0]
+    if breaks is None:
+        sections = np.array_split(T, num_break)
+        breaks = np.array([max(sec[0], sec[-1]) for sec in sections])
+    return PiecewisePolynomialTable(breaks, coeffs)
 
 
 class InterpolateVector:
@@ -112,16 +257,23 @@ class InterpolateVector:
             else:
                 pol = FitPiecewisePolynomial(T, X[:, d], num_break, poly_degree)
                 self.X.append(pol)
+        self.table = _stack_tables(T, self.X, num_break, poly_degree)
 
     def get_value(self, value):
-        x = np.empty(self.dim)
-        for d in range(self.dim):
-            if self.X[d] is not None:
-                val = self.X[d].get_value(value)
-                x[d] = val
-            else:
-                x[d] = 0.0
-        return x
+        """
+        Evaluate all dimensions.
+
+        Parameters
+        ----------
+        value : float or array_like, shape=(n,)
+            time(s)
+
+        Returns
+        -------
+        numpy_array
+            shape=(dim,) or shape=(n, dim)
+        """
+        return self.table.get_value(value)
 
 
 class InterpolateMatrix:
@@ -140,17 +292,26 @@ class InterpolateMatrix:
                     )
                     Xd1.append(pol)
             self.X.append(Xd1)
+        self.table = _stack_tables(
+            T, [pol for Xd1 in self.X for pol in Xd1], num_break, poly_degree
+        )
 
     def get_value(self, value):
-        x = np.empty((self.dim1, self.dim2))
-        for d1 in range(self.dim1):
-            for d2 in range(self.dim2):
-                if self.X[d1][d2] is not None:
-                    val = self.X[d1][d2].get_value(value)
-                    x[d1, d2] = val
-                else:
-                    x[d1, d2] = 0.0
-        return x
+        """
+        Evaluate all entries.
+
+        Parameters
+        ----------
+        value : float or array_like, shape=(n,)
+            time(s)
+
+        Returns
+        -------
+        numpy_array
+            shape=(dim1, dim2) or shape=(n, dim1, dim2)
+        """
+        x = self.table.get_value(value)
+        return x.reshape(x.shape[:-1] + (self.dim1, self.dim2))
 
 
 def ResampleTrajectory(T, X, U, dt, num_break=40, poly_degree=3):
@@ -161,11 +322,6 @@ def ResampleTrajectory(T, X, U, dt, num_break=40, poly_degree=3):
     U_interp = InterpolateVector(T=T, X=U, num_break=num_break, poly_degree=poly_degree)
 
     T_resamp = np.linspace(0, T[-1], n)
-    X_resamp = []
-    U_resamp = []
-    for t in T_resamp:
-        X_resamp.append(X_interp.get_value(t))
-        U_resamp.append(U_interp.get_value(t))
-    X_resamp = np.asarray(X_resamp)
-    U_resamp = np.asarray(U_resamp)
+    X_resamp = X_interp.get_value(T_resamp)
+    U_resamp = U_interp.get_value(T_resamp)
     return T_resamp, X_resamp, U_resamp
@@ -3,6 +3,8 @@ import numpy as np
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 
+from double_pendulum.utils.trajectory import Trajectory
+
 
 def plot_timeseries(
     T,
@@ -306,6 +308,48 @@ def plot_timeseries(
     plt.close()
 
 
+def plot_trajectory(trajectory, t_start=None, t_end=None, dt=None, **kwargs):
+    """
+    Plot the timeseries of a trajectory file (see plot_timeseries).
+    Only the plotted time window and channels are loaded. For long
+    recordings, the trajectory can be resampled with a coarser time step.
+
+    Parameters
+    ----------
+    trajectory : string, path object or Trajectory object
+        trajectory file or Trajectory object (utils.trajectory)
+    t_start : float
+        start time of the plotted window, None for the beginning
+        (Default value = None)
+    t_end : float
+        end time of the plotted window, None for the end
+        (Default value = None)
+    dt : float
+        time step for resampling, None for the original time points
+        (Default value = None)
+    **kwargs
+        further arguments of plot_timeseries
+    """
+    if not isinstance(trajectory, Trajectory):
+        trajectory = Trajectory(trajectory)
+    trajectory = trajectory.window(t_start, t_end)
+    if dt is not None:
+        trajectory = trajectory.resample(dt)
+
+    x_channel = "X" if "X" in trajectory else "X_meas"
+    u_channel = "U" if "U" in trajectory else "U_con"
+    names = [
+        name
+        for name in ["ACC", "X_des", "X_meas", "X_filt", "U_con", "U_perturbation"]
+        if name in trajectory and name not in kwargs
+    ]
+    T, X, U, *values = trajectory.get("T", x_channel, u_channel, *names)
+    channels = dict(zip(names, values))
+    if "X_des" in channels and "T_des" not in kwargs:
+        channels["T_des"] = T
+    plot_timeseries(T, X=X, U=U, **channels, **kwargs)
+
+
 def plot_figures(
     save_dir,
     index,
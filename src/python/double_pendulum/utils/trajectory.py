@@ -0,0 +1,317 @@
+import os
+import struct
+import zipfile
+import numpy as np
+import pandas as pd
+
+from double_pendulum.utils.csv_trajectory import (
+    TRAJECTORY_CHANNELS,
+    binary_trajectory_path,
+    has_binary_trajectory,
+)
+
+# csv columns of the trajectory channels (see save_trajectory)
+CSV_COLUMNS = {
+    "T": ["time"],
+    "X": ["pos1", "pos2", "vel1", "vel2"],
+    "U": ["tau1", "tau2"],
+    "ACC": ["acc1", "acc2"],
+    "X_meas": ["pos_meas1", "pos_meas2", "vel_meas1", "vel_meas2"],
+    "X_filt": ["pos_filt1", "pos_filt2", "vel_filt1", "vel_filt2"],
+    "X_des": ["pos_des1", "pos_des2", "vel_des1", "vel_des2"],
+    "U_con": ["tau_con1", "tau_con2"],
+    "U_fric": ["tau_fric1", "tau_fric2"],
+    "U_meas": ["tau_meas1", "tau_meas2"],
+    "U_des": ["tau_des1", "tau_des2"],
+    "U_perturbation": ["tau_pert1", "tau_pert2"],
+    "K": ["K11", "K12", "K13", "K14", "K21", "K22", "K23", "K24"],
+    "k": ["k1", "k2"],
+}
+
+
+def load_npz_memmap(npz_path, name):
+    """
+    Memory map an array of an uncompressed .npz archive (as written by
+    np.savez). Compressed or object arrays are loaded into memory.
+
+    Parameters
+    ----------
+    npz_path : string or path object
+        path to the .npz file
+    name : string
+        name of the array in the archive
+
+    Returns
+    -------
+    numpy_array
+        read only memory map of the array
+    """
+    with zipfile.ZipFile(npz_path) as zf:
+        info = zf.getinfo(name + ".npy")
+    if info.compress_type == zipfile.ZIP_STORED:
+        with open(npz_path, "rb") as f:
+            # skip the local file header of the zip member
+            f.seek(info.header_offset)
+            header = f.read(30)
+            name_len, extra_len = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            elif version == (2, 0):
+                header = np.lib.format.read_array_header_2_0(f)
+            else:
+                header = None
+            offset = f.tell()
+        if header is not None:
+            shape, fortran_order, dtype = header
+            if not dtype.hasobject:
+                if np.prod(shape) == 0:
+                    return np.empty(shape, dtype=dtype)
+                return np.memmap(
+                    npz_path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=offset,
+                    shape=shape,
+                    order="F" if fortran_order else "C",
+                )
+    with np.load(npz_path) as data:
+        return data[name]
+
+
+class _BinarySource:
+    # channels of a binary trajectory file, memory mapped
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        with zipfile.ZipFile(self.path) as zf:
+            names = [n[:-4] for n in zf.namelist() if n.endswith(".npy")]
+        self.channels = [c for c in TRAJECTORY_CHANNELS if c in names]
+
+    def load(self, names):
+        # plain ndarray views on the memory maps
+        return {
+            name: np.asarray(load_npz_memmap(self.path, name)) for name in names
+        }
+
+
+class _CsvSource:
+    # channels of a trajectory csv file, only the requested columns are parsed
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        columns = pd.read_csv(self.path, nrows=0).columns
+        self.channels = [
+            c for c in TRAJECTORY_CHANNELS if all(k in columns for k in CSV_COLUMNS[c])
+        ]
+
+    def load(self, names):
+        usecols = [col for name in names for col in CSV_COLUMNS[name]]
+        data = pd.read_csv(self.path, usecols=usecols)
+        arrays = {}
+        for name in names:
+            arr = data[CSV_COLUMNS[name]].to_numpy()
+            if name == "T":
+                arr = arr[:, 0]
+            elif name == "K":
+                # same layout as load_trajectory_full: K[n, j, i] = K_(i+1)(j+1)
+                arr = np.swapaxes(arr.reshape(-1, 2, 4), 1, 2)
+            arrays[name] = arr
+        return arrays
+
+
+class _ArraySource:
+    # channels held in memory
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.channels = [c for c in TRAJECTORY_CHANNELS if c in arrays.keys()]
+
+    def load(self, names):
+        return {name: self.arrays[name] for name in names}
+
+
+class Trajectory:
+    """
+    Trajectory class
+    Lazy access to the channels of a trajectory file (T, X, U, ACC, X_meas,
+    X_filt, X_des, U_con, U_fric, U_meas, U_des, U_perturbation, K, k).
+    A channel is loaded on first access and then kept. Binary trajectory
+    files (.npz, see utils.csv_trajectory.save_trajectory_binary) are memory
+    mapped, so only the accessed parts of the file are read from disk.
+    For csv files, an up to date binary sibling is used if it exists,
+    otherwise only the columns of the accessed channels are parsed.
+
+    Channels can be accessed as attributes (traj.X_meas) or like a
+    dictionary (traj["X_meas"]). Channels which are not in the file
+    are None, as in the dictionary returned by load_trajectory_full.
+
+    Parameters
+    ----------
+    path : string or path object
+        path to a trajectory csv or .npz file
+    """
+
+    def __init__(self, path):
+        path = os.fspath(path)
+        self.path = path
+        if os.path.splitext(path)[1] == ".npz":
+            source = _BinarySource(path)
+        elif has_binary_trajectory(path):
+            source = _BinarySource(binary_trajectory_path(path))
+        else:
+            source = _CsvSource(path)
+        self._init(source, {}, slice(None))
+
+    def _init(self, source, cache, index):
+        self._source = source
+        # loaded channels (full length), shared between windows
+        self._cache = cache
+        self._index = index
+
+    @classmethod
+    def from_arrays(cls, **channels):
+        """
+        Create a trajectory from arrays in memory.
+
+        Parameters
+        ----------
+        **channels : array_like
+            trajectory channels, e.g. T=..., X=..., U=...
+
+        Returns
+        -------
+        Trajectory
+        """
+        for name in channels.keys():
+            if name not in TRAJECTORY_CHANNELS:
+                raise ValueError(f"Unknown trajectory channel {name}")
+        arrays = {
+            name: np.asarray(value)
+            for name, value in channels.items()
+            if value is not None
+        }
+        traj = cls.__new__(cls)
+        traj.path = None
+        traj._init(_ArraySource(arrays), {}, slice(None))
+        return traj
+
+    @property
+    def channels(self):
+        """
+        Names of the channels of the trajectory.
+        """
+        return list(self._source.channels)
+
+    def __contains__(self, name):
+        return name in self._source.channels
+
+    def get(self, *names):
+        """
+        Get multiple channels. The channels which are not loaded yet are
+        loaded together (for csv files in one pass over the file).
+
+        Parameters
+        ----------
+        *names : strings
+            channel names
+
+        Returns
+        -------
+        tuple of numpy_arrays
+            channels, None for channels which are not in the trajectory
+        """
+        for name in names:
+            if name not in TRAJECTORY_CHANNELS:
+                raise KeyError(name)
+        missing = [
+            n for n in dict.fromkeys(names) if n in self and n not in self._cache
+        ]
+        if len(missing) > 0:
+            self._cache.update(self._source.load(missing))
+        return tuple(
+            self._cache[n][self._index] if n in self._cache else None for n in names
+        )
+
+    def __getitem__(self, name):
+        return self.get(name)[0]
+
+    def __getattr__(self, name):
+        if name in TRAJECTORY_CHANNELS:
+            return self[name]
+        raise AttributeError(name)
+
+    def __len__(self):
+        if len(self.channels) == 0:
+            return 0
+        return len(self[self.channels[0]])
+
+    def __repr__(self):
+        return f"Trajectory({self.path!r}, channels={self.channels}, len={len(self)})"
+
+    def window(self, t_start=None, t_end=None):
+        """
+        Time window of the trajectory. The channels of the window are views
+        on the channels of this trajectory (no copy).
+
+        Parameters
+        ----------
+        t_start : float
+            start time (inclusive), None for the beginning
+            (Default value = None)
+        t_end : float
+            end time (inclusive), None for the end
+            (Default value = None)
+
+        Returns
+        -------
+        Trajectory
+        """
+        T = self["T"]
+        start = 0 if t_start is None else int(np.searchsorted(T, t_start, "left"))
+        stop = len(T) if t_end is None else int(np.searchsorted(T, t_end, "right"))
+        offset, _, _ = self._index.indices(len(self._cache["T"]))
+        window = Trajectory.__new__(Trajectory)
+        window.path = self.path
+        window._init(
+            self._source, self._cache, slice(offset + start, offset + max(start, stop))
+        )
+        return window
+
+    def resample(self, dt):
+        """
+        Resample all channels to equidistant time points with time step dt
+        by linear interpolation.
+
+        Parameters
+        ----------
+        dt : float
+            time step, units=[s]
+
+        Returns
+        -------
+        Trajectory
+            trajectory in memory
+        """
+        T = np.asarray(self["T"], dtype=float)
+        n = int(np.floor((T[-1] - T[0]) / dt + 1e-9)) + 1
+        T_new = T[0] + dt * np.arange(n)
+        channels = {"T": T_new}
+        names = [c for c in self.channels if c != "T"]
+        for name, value in zip(names, self.get(*names)):
+            value = np.asarray(value, dtype=float)
+            flat = value.reshape(len(value), -1)
+            resampled = np.empty((n, flat.shape[1]))
+            for j in range(flat.shape[1]):
+                resampled[:, j] = np.interp(T_new, T[: len(flat)], flat[:, j])
+            channels[name] = resampled.reshape((n,) + value.shape[1:])
+        return Trajectory.from_arrays(**channels)
+
+    def to_dict(self):
+        """
+        Get all channels as dictionary in the format of
+        load_trajectory_full.
+
+        Returns
+        -------
+        dict
+        """
+        return dict(zip(TRAJECTORY_CHANNELS, self.get(*TRAJECTORY_CHANNELS)))
@@ -1,26 +1,91 @@
 import numpy as np
 
 
-def wrap_angles(x):
-    y = np.copy(x)
-    y[0] = x[0] % (2*np.pi)
-    y[1] = x[1] % (2*np.pi)
-    return y
-
-
-def wrap_angles_top(x):
-    y = np.copy(x)
-    y[0] = x[0] % (2*np.pi)
-    y[1] = (x[1] + np.pi) % (2*np.pi) - np.pi
-    return y
-
-
-def wrap_angles_diff(x):
-    y = np.copy(x)
-    y[0] = x[0] % (2*np.pi)
-    y[1] = x[1] % (2*np.pi)
-    while np.abs(y[0]) > np.pi:
-        y[0] -= 2*np.pi
-    while np.abs(y[1]) > np.pi:
-        y[1] -= 2*np.pi
-    return y
+def _wrap_out(x, out):
+    # output array with the non angle entries of x
+    x = np.asarray(x)
+    if out is None:
+        out = np.array(x, dtype=np.result_type(x, float))
+    elif out is not x:
+        out[...] = x
+    return x, out
+
+
+def wrap_angles(x, out=None):
+    """
+    Wrap the angles of a state or of an array of states to [0, 2pi).
+
+    Parameters
+    ----------
+    x : array_like, shape=(..., 4), dtype=float,
+        state(s) of the double pendulum,
+        order=[angle1, angle2, velocity1, velocity2],
+        units=[rad, rad, rad/s, rad/s]
+    out : numpy_array, shape=(..., 4), dtype=float, optional
+        array in which the result is stored, can be x itself
+        (Default value=None)
+
+    Returns
+    -------
+    numpy_array
+        shape=(..., 4), wrapped state(s)
+    """
+    x, out = _wrap_out(x, out)
+    np.mod(x[..., :2], 2 * np.pi, out=out[..., :2])
+    return out
+
+
+def wrap_angles_top(x, out=None):
+    """
+    Wrap the first angle of a state or of an array of states to [0, 2pi)
+    and the second angle to [-pi, pi).
+
+    Parameters
+    ----------
+    x : array_like, shape=(..., 4), dtype=float,
+        state(s) of the double pendulum,
+        order=[angle1, angle2, velocity1, velocity2],
+        units=[rad, rad, rad/s, rad/s]
+    out : numpy_array, shape=(..., 4), dtype=float, optional
+        array in which the result is stored, can be x itself
+        (Default value=None)
+
+    Returns
+    -------
+    numpy_array
+        shape=(..., 4), wrapped state(s)
+    """
+    x, out = _wrap_out(x, out)
+    np.mod(x[..., 0], 2 * np.pi, out=out[..., 0])
+    a = out[..., 1]
+    np.add(x[..., 1], np.pi, out=a)
+    np.mod(a, 2 * np.pi, out=a)
+    np.subtract(a, np.pi, out=a)
+    return out
+
+
+def wrap_angles_diff(x, out=None):
+    """
+    Wrap the angles of a state (difference) or of an array of states
+    to (-pi, pi].
+
+    Parameters
+    ----------
+    x : array_like, shape=(..., 4), dtype=float,
+        state(s) of the double pendulum,
+        order=[angle1, angle2, velocity1, velocity2],
+        units=[rad, rad, rad/s, rad/s]
+    out : numpy_array, shape=(..., 4), dtype=float, optional
+        array in which the result is stored, can be x itself
+        (Default value=None)
+
+    Returns
+    -------
+    numpy_array
+        shape=(..., 4), wrapped state(s)
+    """
+    x, out = _wrap_out(x, out)
+    a = out[..., :2]
+    np.mod(x[..., :2], 2 * np.pi, out=a)
+    np.subtract(a, 2 * np.pi, out=a, where=a > np.pi)
+    return out
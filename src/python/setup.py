@@ -45,6 +45,7 @@ setup(
             "flax",
             "tqdm",
             "cloudpickle==3.0.0",
+            "numba",
         ],
         "doc": ["sphinx", "sphinx-rtd-theme", "numpydoc"],
         "test": ["pytest", "lark"],
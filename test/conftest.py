@@ -0,0 +1,9 @@
+import os
+import atexit
+import shutil
+import tempfile
+
+# keep the tests away from the cache of the user (see utils.cache.get_cache_dir)
+_cache_dir = tempfile.mkdtemp(prefix="double_pendulum_test_cache_")
+os.environ["DOUBLE_PENDULUM_CACHE_DIR"] = _cache_dir
+atexit.register(shutil.rmtree, _cache_dir, ignore_errors=True)
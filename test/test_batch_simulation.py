@@ -0,0 +1,176 @@
+"""
+Unit Tests
+==========
+"""
+
+import unittest
+import numpy as np
+
+
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.controller.lqr.lqr_controller import (
+    LQRController,
+    LQRController_nonsymbolic,
+)
+from double_pendulum.simulation.simulation import Simulator
+from double_pendulum.simulation.batch_simulation import BatchSimulator
+
+
+class Test(unittest.TestCase):
+    plant = DoublePendulumPlant(
+        mass=[0.606, 0.630],
+        length=[0.3, 0.2],
+        com=[0.275, 0.166],
+        damping=[0.081, 0.0],
+        gravity=9.81,
+        coulomb_fric=[0.093, 0.186],
+        inertia=[None, None],
+        motor_inertia=0.0,
+        gear_ratio=6,
+        torque_limit=[3.0, 3.0],
+    )
+
+    simulator = Simulator(plant)
+    batch_simulator = BatchSimulator(plant)
+
+    states = np.array(
+        [
+            [0.0, 0.0, 0.0, 0.0],
+            [np.pi, 0.0, 0.0, 0.0],
+            [0.0, 1.0, -5, 12.0],
+            [5 * np.pi, -3 * np.pi, -1e-5, 10],
+            [3.0, 0.1, 0.2, -0.2],
+            [1, 0, 0, 1],
+        ]
+    )
+
+    dts = [0.001, 0.01]
+
+    def test_0_set_and_get_state(self):
+        self.batch_simulator.set_state(1.0, self.states)
+        t, x = self.batch_simulator.get_state()
+        self.assertTrue(np.abs(t - 1.0) < 1e-5)
+        self.assertTrue(np.shape(x) == np.shape(self.states))
+
+        self.batch_simulator.set_state(0.0, self.states[0])
+        _, x = self.batch_simulator.get_state()
+        self.assertTrue(np.shape(x) == (1, 4))
+
+    def test_1_integrators(self):
+        u = np.ones((len(self.states), 2))
+        for integrator in ["euler_integrator", "runge_integrator"]:
+            res = getattr(self.batch_simulator, integrator)(self.states, 0.01, 0.0, u)
+            self.assertTrue(np.shape(res) == np.shape(self.states))
+            for x, r in zip(self.states, res):
+                r_single = getattr(self.simulator, integrator)(x, 0.01, 0.0, u[0])
+                self.assertTrue(np.max(np.abs(r - r_single)) < 1e-10)
+
+    def test_2_simulate(self):
+        for integrator in ["euler", "runge_kutta"]:
+            for dt in self.dts:
+                T, X, U = self.batch_simulator.simulate(
+                    0.0, self.states, 0.5, dt, None, integrator
+                )
+                N = len(T)
+                self.assertTrue(np.shape(X) == (len(self.states), N, 4))
+                self.assertTrue(np.shape(U) == (len(self.states), N - 1, 2))
+                for i, x0 in enumerate(self.states):
+                    T1, X1, U1 = self.simulator.simulate(
+                        0.0, x0, 0.5, dt, None, integrator
+                    )
+                    self.assertTrue(len(T1) == N)
+                    self.assertTrue(np.max(np.abs(X[i] - np.asarray(X1))) < 1e-8)
+
+    def test_3_simulate_lqr(self):
+        mpar = model_parameters()
+        mpar.set_torque_limit([0.0, 5.0])
+        controller = LQRController_nonsymbolic(model_pars=mpar)
+        controller.set_cost_matrices(
+            np.diag([0.97, 0.93, 0.39, 0.26]), np.diag((0.11, 0.11))
+        )
+        controller.set_parameters(failure_value=0.0, cost_to_go_cut=1000.0)
+        controller.set_friction_compensation(damping=[0.1, 0.1], coulomb_fric=[0.1, 0.1])
+        controller.init()
+
+        plant = DoublePendulumPlant(model_pars=mpar)
+        x0 = np.array(
+            [
+                [np.pi - 0.05, 0.05, 0.0, 0.0],
+                [np.pi + 0.1, -0.1, 0.1, 0.0],
+                [0.0, 0.0, 0.0, 0.0],
+            ]
+        )
+
+        U_batch = controller.get_control_output_batch(x0)
+        for x, u in zip(x0, U_batch):
+            u_single = controller.get_control_output(x)
+            self.assertTrue(np.max(np.abs(u - u_single)) < 1e-10)
+
+        T, X, U = BatchSimulator(plant).simulate(
+            0.0, x0, 1.0, 0.01, controller, "runge_kutta"
+        )
+        for i in range(len(x0)):
+            T1, X1, U1 = Simulator(plant).simulate(
+                0.0, x0[i], 1.0, 0.01, controller, "runge_kutta"
+            )
+            self.assertTrue(np.max(np.abs(X[i] - np.asarray(X1))) < 1e-8)
+            self.assertTrue(np.max(np.abs(U[i] - np.asarray(U1))) < 1e-8)
+
+    def test_4_perturbations(self):
+        n_steps = 100
+        pert = np.zeros((len(self.states), 2, n_steps))
+        pert[0, 1, 10:20] = 1.0
+        self.batch_simulator.set_disturbances(pert)
+        T, X, U = self.batch_simulator.simulate(
+            0.0, self.states, 0.5, 0.01, None, "runge_kutta"
+        )
+        self.batch_simulator.set_disturbances([[], []])
+        self.assertTrue(np.max(np.abs(U[0, 11:19, 1] - 1.0)) < 1e-10)
+        self.assertTrue(np.max(np.abs(U[1:])) < 1e-10)
+
+    def test_5_symbolic_plant(self):
+        mpar = model_parameters()
+        mpar.set_motor_inertia(1e-4)
+        mpar.set_torque_limit([0.0, 5.0])
+        plant = SymbolicDoublePendulum(model_pars=mpar)
+        u = np.ones((len(self.states), 2))
+        res = plant.rhs(0.0, self.states, u)
+        G = plant.gravity_vector(self.states)
+        for i, x in enumerate(self.states):
+            self.assertTrue(np.max(np.abs(res[i] - plant.rhs(0.0, x, u[i]))) < 1e-10)
+            self.assertTrue(np.max(np.abs(G[i] - plant.gravity_vector(x))) < 1e-10)
+
+        controller = LQRController(model_pars=mpar)
+        controller.set_cost_matrices(
+            np.diag([0.97, 0.93, 0.39, 0.26]), np.diag((0.11, 0.11))
+        )
+        controller.set_parameters(failure_value=0.0, cost_to_go_cut=1000.0)
+        controller.set_gravity_compensation(plant)
+        controller.init()
+        U_batch = controller.get_control_output_batch(self.states)
+        for x, u_batch in zip(self.states, U_batch):
+            u_single = controller.get_control_output(x)
+            self.assertTrue(np.max(np.abs(u_batch - u_single)) < 1e-10)
+
+        x0 = np.array([[np.pi - 0.05, 0.05, 0.0, 0.0], [np.pi + 0.1, -0.1, 0.1, 0.0]])
+        T, X, U = BatchSimulator(plant).simulate(
+            0.0, x0, 0.5, 0.01, controller, "runge_kutta"
+        )
+        for i in range(len(x0)):
+            T1, X1, U1 = Simulator(plant).simulate(
+                0.0, x0[i], 0.5, 0.01, controller, "runge_kutta"
+            )
+            self.assertTrue(np.max(np.abs(X[i] - np.asarray(X1))) < 1e-8)
+
+    def test_6_gravity_batch(self):
+        plant_spong = DoublePendulumPlant(
+            mass=[0.606, 0.630], length=[0.3, 0.2], com=[0.275, 0.166]
+        )
+        plant_spong.formulas = "Spong"
+        for plant in [self.plant, plant_spong]:
+            G = plant.gravity_vector(self.states)
+            self.assertTrue(np.shape(G) == (len(self.states), 2))
+            for x, g in zip(self.states, G):
+                self.assertTrue(np.max(np.abs(g - plant.gravity_vector(x))) < 1e-12)
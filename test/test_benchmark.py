@@ -0,0 +1,228 @@
+"""
+Unit Tests
+==========
+"""
+
+import os
+import tempfile
+import unittest
+from functools import partial
+import numpy as np
+
+
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.controller.lqr.lqr_controller import LQRController
+from double_pendulum.analysis.benchmark import benchmarker
+from double_pendulum.utils.wrap_angles import wrap_angles_top
+
+
+def baseline_success(ben, x_traj):
+    # state by state goal check as in the original benchmarker
+    up = []
+    for x in x_traj:
+        if ben.goal_check_method == "epsilon":
+            lp = wrap_angles_top(x)
+            up.append(all(abs(lp[i] - ben.goal[i]) < ben.epsilon[i] for i in range(4)))
+        elif ben.goal_check_method == "height":
+            ee_pos_y = ben.plant.forward_kinematics(x[:2])[1][1]
+            up.append(ee_pos_y > ben.goal_check_method_height * sum(ben.length))
+    if ben.goal_check_method == "epsilon":
+        return up[-1] if ben.check_only_final_state else True in up
+    return True in up if ben.check_only_final_state else up[-1]
+
+
+def make_controller(torque_limit):
+    mpar = model_parameters()
+    mpar.set_torque_limit(torque_limit)
+    controller = LQRController(model_pars=mpar)
+    controller.set_goal([np.pi, 0.0, 0.0, 0.0])
+    controller.set_cost_matrices(
+        np.diag([0.97, 0.93, 0.39, 0.26]), np.diag([0.11, 0.11])
+    )
+    controller.set_parameters(failure_value=0.0, cost_to_go_cut=15.0)
+    return controller
+
+
+class Test(unittest.TestCase):
+    torque_limit = [0.0, 5.0]
+
+    modelpar_var_lists = {
+        "Ir": [0.0, 1e-4],
+        "m1r1": [0.1],
+        "I1": [0.05],
+        "b1": [0.01],
+        "cf1": [0.1],
+        "m2r2": [0.1],
+        "m2": [0.6],
+        "I2": [0.03],
+        "b2": [0.0],
+        "cf2": [0.1],
+    }
+
+    def run_benchmark(
+        self, checkpoint_dir=None, early_termination={}, cost_par=None, **kwargs
+    ):
+        mpar = model_parameters()
+        mpar.set_torque_limit(self.torque_limit)
+        ben = benchmarker(
+            controller=make_controller(self.torque_limit),
+            x0=[np.pi - 0.05, 0.02, 0.0, 0.0],
+            dt=0.01,
+            t_final=1.0,
+            goal=[np.pi, 0.0, 0.0, 0.0],
+        )
+        ben.set_model_parameter(model_pars=mpar)
+        if cost_par is not None:
+            ben.set_cost_par(*cost_par)
+        ben.set_parallel_execution(**kwargs)
+        ben.set_checkpointing(checkpoint_dir)
+        ben.set_early_termination(**early_termination)
+        return ben.benchmark(
+            modelpar_var_lists=self.modelpar_var_lists,
+            repetitions=2,
+            meas_noise_sigma_list=[0.1],
+            u_noise_sigma_list=[0.1],
+            u_responses=[1.0, 1.5],
+            delays=[0.0, 0.02],
+            compute_perturbation_robustness=True,
+            perturbation_repetitions=2,
+            perturbation_min_t_dist=0.1,
+        )
+
+    def test_0_result_structure(self):
+        res = self.run_benchmark(seed=0)
+        self.assertTrue(len(res["model_robustness"]["Ir"]["free_costs"]) == 2)
+        self.assertTrue(
+            np.shape(res["meas_noise_robustness"]["None"]["successes"]) == (1, 2)
+        )
+        self.assertTrue(np.shape(res["u_noise_robustness"]["successes"]) == (1, 10))
+        self.assertTrue(len(res["u_responsiveness_robustness"]["free_costs"]) == 2)
+        self.assertTrue(len(res["delay_robustness"]["free_costs"]) == 2)
+        self.assertTrue(len(res["perturbation_robustness"]["mu_list"]) == 2)
+
+    def test_1_parallel(self):
+        res_serial = self.run_benchmark(seed=1)
+        res_parallel = self.run_benchmark(
+            seed=1,
+            n_workers=2,
+            controller_factory=partial(make_controller, self.torque_limit),
+        )
+        self.assertTrue(repr(res_serial) == repr(res_parallel))
+
+    def test_2_checkpoint(self):
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            res = self.run_benchmark(checkpoint_dir=checkpoint_dir)
+            path = os.path.join(checkpoint_dir, "benchmark_jobs.pkl")
+            size = os.path.getsize(path)
+
+            # all jobs are loaded from the checkpoint
+            res_resumed = self.run_benchmark(checkpoint_dir=checkpoint_dir)
+            self.assertTrue(os.path.getsize(path) == size)
+            self.assertTrue(repr(res) == repr(res_resumed))
+
+            # interrupted run with an incomplete last record
+            with open(path, "rb+") as f:
+                f.truncate(size // 2)
+            res_resumed = self.run_benchmark(checkpoint_dir=checkpoint_dir)
+            self.assertTrue(repr(res) == repr(res_resumed))
+
+    def test_3_early_termination(self):
+        cost_par = (np.diag([1.0, 1.0, 0.1, 0.1]), np.diag([0.1, 0.1]), np.eye(4))
+        res = self.run_benchmark(seed=2, cost_par=cost_par)
+        res_early = self.run_benchmark(
+            seed=2,
+            cost_par=cost_par,
+            early_termination={"max_velocity": 50.0, "goal_dwell_time": 0.2},
+        )
+        for criterion in res.keys():
+            self.assertTrue(res[criterion].keys() == res_early[criterion].keys())
+
+        def flatten(res_dict, key):
+            # values of key of all jobs, in the same order for both results
+            values = []
+            for criterion, r in sorted(res_dict.items()):
+                if criterion == "model_robustness":
+                    dicts = [r[mp] for mp in sorted(r.keys())]
+                elif criterion == "meas_noise_robustness":
+                    dicts = [r["None"]]
+                else:
+                    dicts = [r]
+                for d in dicts:
+                    for v in d[key]:
+                        values += list(v) if isinstance(v, list) else [v]
+            return values
+
+        reasons = flatten(res, "stop_reasons")
+        reasons_early = flatten(res_early, "stop_reasons")
+        costs = flatten(res, "free_costs")
+        costs_early = flatten(res_early, "free_costs")
+        self.assertTrue(len(reasons_early) == 29)
+        self.assertTrue(all(r is None for r in reasons))
+        self.assertTrue(set(reasons_early) <= {None, "velocity_limit", "goal_reached"})
+        self.assertTrue(any(r is not None for r in reasons_early))
+        for reason, cost, cost_early in zip(reasons_early, costs, costs_early):
+            # simulated until t_final with the same seed if no predicate fired
+            close = np.isclose(cost, cost_early, equal_nan=True)
+            self.assertTrue(close == (reason is None))
+
+    def test_4_evaluate_trajectories(self):
+        mpar = model_parameters()
+        ben = benchmarker(
+            controller=None,
+            x0=[0.0, 0.0, 0.0, 0.0],
+            dt=0.01,
+            t_final=1.0,
+            goal=[np.pi, 0.0, 0.0, 0.0],
+        )
+        ben.set_model_parameter(model_pars=mpar)
+        ben.set_cost_par(np.diag([1.0, 2.0, 0.1, 0.2]), np.eye(2), np.eye(4))
+        rng = np.random.default_rng(0)
+        # from close to the goal to far away, ending at the goal and
+        # hanging down
+        scale = np.array([0.02, 0.2, 1.0, 2.0, 3.0, 3.0, 3.0, 0.2])
+        X = rng.normal(size=(8, 101, 4)) * scale[:, None, None]
+        X[5:7, -1] = rng.normal(scale=0.02, size=(2, 4))
+        X += [np.pi, 0.0, 0.0, 0.0]
+        X[7] -= [np.pi, 0.0, 0.0, 0.0]
+        U = rng.normal(size=(8, 100, 2))
+        ben.t_traj, ben.x_traj, ben.u_traj = np.arange(101) * 0.01, X[0], U[0]
+        ben.traj_following = True
+
+        for method in ["epsilon", "height"]:
+            for final in [False, True]:
+                successes = []
+                ben.goal_check_method = method
+                ben.check_only_final_state = final
+                ev = ben.evaluate_trajectories(X, U)
+                for i in range(8):
+                    cost_free, cost_tf, succ = ben.compute_success_measure(X[i], U[i])
+                    self.assertTrue(np.isclose(ev["cost_free"][i], cost_free))
+                    self.assertTrue(np.isclose(ev["cost_tf"][i], cost_tf))
+                    self.assertTrue(ev["success"][i] == succ)
+                    self.assertTrue(succ == baseline_success(ben, X[i]))
+                    successes.append(bool(succ))
+
+                    mask = ben.goal_success_mask(X[i])
+                    first = np.argwhere(mask)[0][0] if np.any(mask) else -1
+                    self.assertTrue(ev["first_success"][i] == first)
+                # the trajectories pass and fail every check
+                self.assertTrue(0 < sum(successes) < len(successes))
+        self.assertTrue(np.isclose(ev["cost_tf"][0], 0.0))
+
+        # cost as with the separate sums
+        Xg = X[1, :-1] - ben.goal
+        xf = X[1, -1] - ben.goal
+        cost = (
+            np.sum((Xg @ ben.Q) * Xg) / 100
+            + np.sum((U[1] @ ben.R) * U[1]) / 100
+            + xf @ ben.Qf @ xf
+        )
+        self.assertTrue(np.isclose(ben.compute_cost(X[1], U[1]), cost))
+
+    def test_5_global_random_state(self):
+        np.random.seed(5)
+        state = np.random.get_state()
+        self.run_benchmark(seed=1)
+        new_state = np.random.get_state()
+        self.assertTrue(np.array_equal(state[1], new_state[1]))
+        self.assertTrue(state[2:] == new_state[2:])
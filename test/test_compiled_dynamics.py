@@ -0,0 +1,91 @@
+"""
+Unit Tests
+==========
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+
+from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.model.compiled_dynamics import plant_key
+from double_pendulum.simulation.simulation import Simulator
+
+
+class Test(unittest.TestCase):
+    plant = SymbolicDoublePendulum(
+        mass=[0.606, 0.630],
+        length=[0.3, 0.2],
+        com=[0.275, 0.166],
+        damping=[0.081, 0.0],
+        gravity=9.81,
+        coulomb_fric=[0.093, 0.186],
+        inertia=[None, None],
+        motor_inertia=0.0,
+        gear_ratio=6,
+        torque_limit=[0.0, 3.0],
+    )
+
+    states = [
+        [0.0, 0.0, 0.0, 0.0],
+        [np.pi, 0.0, 0.0, 0.0],
+        [0.0, 1.0, -5, 12.0],
+        [5 * np.pi, -3 * np.pi, -1e-5, 100],
+        [1, 0, 0, 1],
+    ]
+
+    actions = [
+        [0.0, 0.0],
+        [1.0, 0.0],
+        [-4.0, 5],
+    ]
+
+    def test_0_rhs(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.plant.compiled_dynamics = None
+            ref = [
+                [self.plant.rhs(0.0, x, u) for u in self.actions] for x in self.states
+            ]
+            self.plant.compile_dynamics(cache_dir)
+            self.assertTrue(
+                os.path.exists(
+                    os.path.join(cache_dir, f"dynamics_{plant_key(self.plant)}.py")
+                )
+            )
+            for i, x in enumerate(self.states):
+                for j, u in enumerate(self.actions):
+                    res = self.plant.rhs(0.0, x, u)
+                    self.assertTrue(np.shape(res) == (4,))
+                    self.assertTrue(
+                        np.allclose(res, ref[i][j], rtol=1e-10, atol=1e-10)
+                    )
+            self.plant.compiled_dynamics = None
+
+    def test_1_simulate(self):
+        sim = Simulator(self.plant)
+        x0 = [0.1, -0.2, 0.5, 0.0]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self.plant.compiled_dynamics = None
+            T1, X1, U1 = sim.simulate(0.0, x0, 1.0, 0.01)
+            self.plant.compile_dynamics(cache_dir)
+            T2, X2, U2 = sim.simulate(0.0, x0, 1.0, 0.01)
+            self.plant.compiled_dynamics = None
+        self.assertTrue(len(T1) == len(T2))
+        self.assertTrue(np.allclose(X1, X2, rtol=1e-10, atol=1e-10))
+
+    def test_2_key(self):
+        plant2 = SymbolicDoublePendulum(
+            mass=[0.606, 0.631],
+            length=[0.3, 0.2],
+            com=[0.275, 0.166],
+            damping=[0.081, 0.0],
+            gravity=9.81,
+            coulomb_fric=[0.093, 0.186],
+            inertia=[None, None],
+            motor_inertia=0.0,
+            gear_ratio=6,
+            torque_limit=[0.0, 3.0],
+        )
+        self.assertTrue(plant_key(self.plant) != plant_key(plant2))
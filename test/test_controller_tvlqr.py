@@ -12,6 +12,7 @@ from double_pendulum.model.model_parameters import model_parameters
 from double_pendulum.controller.tvlqr.tvlqr_controller import TVLQRController
 from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
 from double_pendulum.simulation.simulation import Simulator
+from double_pendulum.utils.trajectory import Trajectory
 
 
 class Test(unittest.TestCase):
@@ -92,3 +93,58 @@ class Test(unittest.TestCase):
                                 self.assertTrue(len(u) == 2)
                                 self.assertTrue(np.abs(u[0]) <= mpar.tl[0])
                                 self.assertTrue(np.abs(u[1]) <= mpar.tl[1])
+
+    def test_2_gain_table(self):
+        csv_path = os.path.join("../data/trajectories",
+                                "design_C.0",
+                                "model_3.1",
+                                "acrobot",
+                                "ilqr_2/trajectory.csv")
+        mpar = model_parameters(model_design="design_C.0",
+                                model_id="model_3.1",
+                                robot="acrobot")
+
+        controller = TVLQRController(
+                model_pars=mpar,
+                csv_path=csv_path)
+        controller.set_cost_parameters(Q=self.Qs[0], R=self.Rs[0], Qf=self.Qfs[0])
+        controller.init()
+        times = controller.dt*np.arange(0, len(controller.T) + 100, 7)
+        u_interp = [[controller.get_control_output_(x, t) for t in times]
+                    for x in self.states]
+
+        controller.set_gain_table()
+        controller.init()
+        self.assertTrue(np.shape(controller.K_table) == (len(controller.T), 2, 4))
+        u_table = [[controller.get_control_output_(x, t) for t in times]
+                   for x in self.states]
+        self.assertTrue(np.allclose(u_interp, u_table))
+
+    def test_3_trajectory_window(self):
+        csv_path = os.path.join("../data/trajectories",
+                                "design_C.0",
+                                "model_3.1",
+                                "acrobot",
+                                "ilqr_2/trajectory.csv")
+        mpar = model_parameters(model_design="design_C.0",
+                                model_id="model_3.1",
+                                robot="acrobot")
+        traj = Trajectory(csv_path)
+        t0 = traj.T[100]
+        window = traj.window(t_start=t0)
+
+        controller = TVLQRController(model_pars=mpar, csv_path=window)
+        self.assertTrue(np.allclose(controller.T, window.T - t0))
+        self.assertTrue(np.isclose(controller.max_t, traj.T[-1] - t0))
+
+        # same as a trajectory which starts at t=0
+        shifted = Trajectory.from_arrays(T=window.T - t0, X=window.X, U=window.U)
+        controller_shifted = TVLQRController(model_pars=mpar, csv_path=shifted)
+        for con in [controller, controller_shifted]:
+            con.set_cost_parameters(Q=self.Qs[0], R=self.Rs[0], Qf=self.Qfs[0])
+            con.set_gain_table()
+            con.init()
+        self.assertTrue(np.allclose(controller.X_table, controller_shifted.X_table))
+        self.assertTrue(np.allclose(controller.K_table, controller_shifted.K_table))
+        # the table starts at the beginning of the window
+        self.assertTrue(np.allclose(controller.X_table[0], traj.X[100], atol=1e-2))
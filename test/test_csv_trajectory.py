@@ -0,0 +1,120 @@
+"""
+Unit Tests
+==========
+"""
+
+import os
+import time
+import tempfile
+import unittest
+import numpy as np
+
+
+from double_pendulum.utils.csv_trajectory import (
+    save_trajectory,
+    load_trajectory,
+    load_trajectory_full,
+    binary_trajectory_path,
+    has_binary_trajectory,
+    convert_to_binary,
+)
+from double_pendulum.utils.convert_trajectories import convert_trajectories
+from double_pendulum.utils.trajectory import Trajectory
+
+
+class Test(unittest.TestCase):
+    N = 50
+    rng = np.random.default_rng(0)
+    channels = {
+        "T": np.linspace(0.0, 1.0, N),
+        "X": rng.normal(size=(N, 4)),
+        "U": rng.normal(size=(N, 2)),
+        "X_meas": rng.normal(size=(N, 4)),
+        "X_des": rng.normal(size=(N - 5, 4)),
+        "U_con": rng.normal(size=(N, 2)),
+        "K": rng.normal(size=(N, 4, 2)),
+        "k": rng.normal(size=(N, 2)),
+    }
+
+    def assert_same_trajectory(self, traj1, traj2):
+        self.assertTrue(traj1.keys() == traj2.keys())
+        for key in traj1.keys():
+            if traj1[key] is None:
+                self.assertTrue(traj2[key] is None)
+            else:
+                # the csv parser of pandas is not exact in the last digit
+                self.assertTrue(np.allclose(traj1[key], traj2[key], rtol=1e-15))
+
+    def test_0_binary_format(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "trajectory.csv")
+            npz_path = os.path.join(tmp_dir, "other.npz")
+            save_trajectory(csv_path, **self.channels)
+            save_trajectory(npz_path, **self.channels)
+            traj_csv = load_trajectory_full(csv_path)
+            traj_npz = load_trajectory_full(npz_path)
+            self.assert_same_trajectory(traj_csv, traj_npz)
+            self.assertTrue(np.shape(traj_npz["X_des"]) == (self.N, 4))
+            self.assertTrue(np.all(traj_npz["X_des"][-5:] == 0.0))
+
+    def test_1_prefer_binary(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "trajectory.csv")
+            save_trajectory(csv_path, **self.channels)
+            traj = load_trajectory_full(csv_path)
+            self.assertFalse(has_binary_trajectory(csv_path))
+
+            npz_path = convert_to_binary(csv_path)
+            self.assertTrue(npz_path == binary_trajectory_path(csv_path))
+            self.assertTrue(has_binary_trajectory(csv_path))
+            self.assert_same_trajectory(traj, load_trajectory_full(csv_path))
+            T, X, U = load_trajectory(csv_path)
+            self.assertTrue(np.array_equal(X, traj["X"]))
+
+            # the binary sibling is ignored when the csv file is newer
+            channels = dict(self.channels)
+            channels["X"] = 2.0 * channels["X"]
+            save_trajectory(csv_path, **channels)
+            os.utime(csv_path, (time.time() + 10.0, time.time() + 10.0))
+            self.assertFalse(has_binary_trajectory(csv_path))
+            T, X, U = load_trajectory(csv_path)
+            self.assertTrue(np.allclose(X, channels["X"], rtol=1e-15))
+
+    def test_2_convert_directory(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "run"))
+            csv_path = os.path.join(tmp_dir, "run", "trajectory.csv")
+            save_trajectory(csv_path, **self.channels)
+            with open(os.path.join(tmp_dir, "scores.txt.csv"), "w") as f:
+                f.write("Controller,Score\nabc,1.0\n")
+
+            npz_paths = convert_trajectories([tmp_dir], verbose=False)
+            self.assertTrue(npz_paths == [binary_trajectory_path(csv_path)])
+            self.assertTrue(convert_trajectories([tmp_dir], verbose=False) == [])
+            self.assertTrue(
+                len(convert_trajectories([tmp_dir], force=True, verbose=False)) == 1
+            )
+
+    def test_3_convert_all_channels(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = os.path.join(tmp_dir, "trajectory.csv")
+            channels = dict(self.channels)
+            channels["U_perturbation"] = self.rng.normal(size=(self.N - 10, 2))
+            save_trajectory(csv_path, **channels)
+            traj = load_trajectory_full(csv_path)
+            names = Trajectory(csv_path).channels
+            self.assertTrue("U_perturbation" in names)
+
+            convert_to_binary(csv_path)
+            self.assertTrue(has_binary_trajectory(csv_path))
+            self.assertTrue(Trajectory(csv_path).channels == names)
+            traj_npz = load_trajectory_full(csv_path)
+            self.assert_same_trajectory(traj, traj_npz)
+            self.assertTrue(np.shape(traj_npz["U_perturbation"]) == (self.N, 2))
+            self.assertTrue(
+                np.allclose(
+                    traj_npz["U_perturbation"][: self.N - 10],
+                    channels["U_perturbation"],
+                    rtol=1e-15,
+                )
+            )
@@ -0,0 +1,76 @@
+"""
+Unit Tests
+==========
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+
+from double_pendulum.utils.grid_map import grid_map
+
+
+def step_function(p):
+    # non zero only in a disc, like RoA volumes over a design grid
+    return float(np.hypot(p[0], p[1]) < 0.6) * (1.0 + p[0])
+
+
+class counting_function:
+    def __init__(self):
+        self.n_calls = 0
+
+    def __call__(self, p):
+        self.n_calls += 1
+        return step_function(p)
+
+
+class Test(unittest.TestCase):
+    axes = [np.linspace(0.0, 1.0, 33), np.linspace(0.0, 1.0, 21)]
+
+    def test_0_full_grid(self):
+        values, evaluated = grid_map(step_function, self.axes)
+        self.assertTrue(values.shape == (33, 21))
+        self.assertTrue(np.all(evaluated))
+        point = (self.axes[0][3], self.axes[1][5])
+        self.assertTrue(values[3, 5] == step_function(point))
+
+    def test_1_refinement(self):
+        full, _ = grid_map(step_function, self.axes)
+        values, evaluated = grid_map(step_function, self.axes, refine_levels=3)
+        self.assertTrue(np.sum(evaluated) < 0.3 * evaluated.size)
+        self.assertTrue(np.allclose(values, full))
+
+        # all grid points next to the boundary are evaluated
+        inside = full > 0.0
+        boundary = np.zeros_like(inside)
+        boundary[:-1] |= inside[:-1] != inside[1:]
+        boundary[1:] |= inside[:-1] != inside[1:]
+        boundary[:, :-1] |= inside[:, :-1] != inside[:, 1:]
+        boundary[:, 1:] |= inside[:, :-1] != inside[:, 1:]
+        self.assertTrue(np.all(evaluated[boundary]))
+
+    def test_2_resume(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_file = os.path.join(tmp_dir, "grid.npy")
+            values, evaluated = grid_map(
+                step_function,
+                self.axes,
+                n_workers=2,
+                save_file=save_file,
+                key="disc",
+                refine_levels=2,
+            )
+            self.assertTrue(np.array_equal(np.isnan(np.load(save_file)), ~evaluated))
+
+            fct = counting_function()
+            values2, _ = grid_map(
+                fct, self.axes, save_file=save_file, key="disc", refine_levels=2
+            )
+            self.assertTrue(fct.n_calls == 0)
+            self.assertTrue(np.array_equal(values, values2))
+
+            # a different key starts from scratch
+            grid_map(fct, self.axes, save_file=save_file, key="other")
+            self.assertTrue(fct.n_calls == 33 * 21)
@@ -0,0 +1,226 @@
+"""
+Unit Tests
+==========
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.utils.csv_trajectory import load_trajectory_full, save_trajectory
+from double_pendulum.analysis.leaderboard import (
+    leaderboard_scores,
+    compute_leaderboard_metrics,
+    StreamingLeaderboardMetrics,
+    stream_trajectory,
+    get_swingup_time,
+    get_max_tau,
+    get_energy,
+    get_integrated_torque,
+    get_torque_cost,
+    get_tau_smoothness,
+    get_velocity_cost,
+    _swingup_index,
+)
+
+
+def reference_swingup_time(T, X, mpar, height=0.9):
+    # swingup time as computed with the symbolic plant and the backward loop
+    plant = SymbolicDoublePendulum(model_pars=mpar)
+    ee_pos_y = plant.forward_kinematics(X.T[:2])[1][1]
+    up = ee_pos_y > height * (mpar.l[0] + mpar.l[1])
+    time_index = len(T) - 1
+    for i in range(len(up) - 2, 0, -1):
+        if up[i]:
+            time_index = i
+        else:
+            break
+    return T[time_index]
+
+
+class Test(unittest.TestCase):
+    mpar = model_parameters(
+        filepath=os.path.join(
+            "..",
+            "data",
+            "system_identification",
+            "identified_parameters",
+            "design_C.0",
+            "model_3.1",
+            "model_parameters.yml",
+        )
+    )
+    traj_dir = os.path.join("..", "data", "trajectories", "design_C.0", "model_3.1")
+    traj_paths = [
+        os.path.join(traj_dir, "acrobot", "ilqr_1", "trajectory.csv"),
+        os.path.join(traj_dir, "pendubot", "ilqr_1", "trajectory.csv"),
+    ]
+
+    def load(self, path):
+        traj = load_trajectory_full(path)
+        return traj["T"], traj["X"], traj["U"]
+
+    def check_metrics(self, metrics, T, X, U):
+        self.assertTrue(
+            metrics["swingup_time"] == reference_swingup_time(T, X, self.mpar)
+        )
+        self.assertTrue(metrics["success"] == (metrics["swingup_time"] < T[-1]))
+        self.assertTrue(np.isclose(metrics["max_tau"], get_max_tau(U)))
+        self.assertTrue(np.isclose(metrics["energy"], get_energy(X, U)))
+        self.assertTrue(np.isclose(metrics["integ_tau"], get_integrated_torque(T, U)))
+        self.assertTrue(np.isclose(metrics["tau_cost"], get_torque_cost(T, U)))
+        self.assertTrue(np.isclose(metrics["tau_smoothness"], get_tau_smoothness(U)))
+        self.assertTrue(np.isclose(metrics["velocity_cost"], get_velocity_cost(T, X)))
+
+    def test_0_single_trajectory(self):
+        for path in self.traj_paths:
+            T, X, U = self.load(path)
+            metrics = compute_leaderboard_metrics(T, X, U, self.mpar)
+            self.check_metrics(metrics, T, X, U)
+            self.assertTrue(
+                get_swingup_time(T, X, mpar=self.mpar, method="height")
+                == metrics["swingup_time"]
+            )
+
+    def test_1_batch(self):
+        trajs = [self.load(path) for path in self.traj_paths]
+        # ragged batch
+        T = [trajs[0][0], trajs[1][0][:-10]]
+        X = [trajs[0][1], trajs[1][1][:-10]]
+        U = [trajs[0][2], trajs[1][2][:-10]]
+        metrics = compute_leaderboard_metrics(T, X, U, self.mpar)
+        for i in range(2):
+            self.check_metrics(
+                {key: val[i] for key, val in metrics.items()}, T[i], X[i], U[i]
+            )
+
+        # stacked batch
+        N = min(len(t) for t, _, _ in trajs)
+        T = np.array([t[:N] for t, _, _ in trajs])
+        X = np.array([x[:N] for _, x, _ in trajs])
+        U = np.array([u[:N] for _, _, u in trajs])
+        metrics = compute_leaderboard_metrics(T, X, U, self.mpar)
+        self.assertTrue(np.shape(metrics["energy"]) == (2,))
+        for i in range(2):
+            self.check_metrics(
+                {key: val[i] for key, val in metrics.items()}, T[i], X[i], U[i]
+            )
+
+    def test_2_swingup_index(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            N = rng.integers(1, 12)
+            up = rng.random(N) < 0.7
+            time_index = N - 1
+            for i in range(N - 2, 0, -1):
+                if up[i]:
+                    time_index = i
+                else:
+                    break
+            self.assertTrue(_swingup_index(up) == time_index)
+            self.assertTrue(
+                _swingup_index(up, has_to_stay=False)
+                == (np.argwhere(up)[0][0] if np.any(up) else N - 1)
+            )
+
+    def test_3_score_cache(self):
+        weights = {
+            "swingup_time": 0.2,
+            "max_tau": 0.1,
+            "energy": 0.1,
+            "integ_tau": 0.1,
+            "tau_cost": 0.1,
+            "tau_smoothness": 0.2,
+            "velocity_cost": 0.2,
+        }
+        normalize = {
+            "swingup_time": 10.0,
+            "max_tau": 6.0,
+            "energy": 100.0,
+            "integ_tau": 60.0,
+            "tau_cost": 360.0,
+            "tau_smoothness": 12.0,
+            "velocity_cost": 1000,
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_paths = {}
+            for i, path in enumerate(self.traj_paths):
+                T, X, U = self.load(path)
+                csv_path = os.path.join(tmp_dir, f"con{i}", "sim_swingup.csv")
+                os.makedirs(os.path.dirname(csv_path))
+                save_trajectory(csv_path, T=T, X_meas=X, U_con=U)
+                data_paths[f"con{i}"] = {
+                    "csv_path": csv_path,
+                    "name": f"con{i}",
+                    "username": "user",
+                    "short_description": "",
+                }
+            cache_dir = os.path.join(tmp_dir, "score_cache")
+
+            def run(**kwargs):
+                save_to = os.path.join(tmp_dir, "leaderboard.csv")
+                leaderboard_scores(
+                    data_paths, save_to, self.mpar, weights, normalize, **kwargs
+                )
+                with open(save_to, "r") as f:
+                    return f.read()
+
+            leaderboard = run()
+            self.assertTrue(run(cache_dir=cache_dir) == leaderboard)
+            self.assertTrue(len(os.listdir(cache_dir)) == 2)
+
+            # cached scores are used
+            scores_path = os.path.join(tmp_dir, "con0", "scores.csv")
+            mtime = os.path.getmtime(scores_path)
+            self.assertTrue(run(cache_dir=cache_dir, n_workers=2) == leaderboard)
+            self.assertTrue(os.path.getmtime(scores_path) == mtime)
+            self.assertTrue(len(os.listdir(cache_dir)) == 2)
+
+            # changed scoring configuration
+            normalize["velocity_cost"] = 500
+            self.assertTrue(run(cache_dir=cache_dir, n_workers=2) != leaderboard)
+            self.assertTrue(len(os.listdir(cache_dir)) == 4)
+
+    def check_streaming(self, T, X, U, chunksize, has_to_stay=True):
+        metrics = compute_leaderboard_metrics(
+            T, X, U, self.mpar, has_to_stay=has_to_stay
+        )
+        stream = StreamingLeaderboardMetrics(self.mpar, has_to_stay=has_to_stay)
+        for i in range(0, len(T), chunksize):
+            stream.update(
+                T[i : i + chunksize], X[i : i + chunksize], U[i : i + chunksize]
+            )
+        stream_metrics = stream.get_metrics()
+        for key in metrics.keys():
+            self.assertTrue(np.isclose(metrics[key], stream_metrics[key]))
+
+    def test_4_streaming(self):
+        for path in self.traj_paths:
+            T, X, U = self.load(path)
+            for chunksize in [1, 2, 7, 1000, len(T)]:
+                self.check_streaming(T, X, U, chunksize)
+                self.check_streaming(T, X, U, chunksize, has_to_stay=False)
+
+        # short trajectories, random swingups
+        rng = np.random.default_rng(1)
+        for _ in range(100):
+            N = rng.integers(2, 10)
+            T = np.arange(N) * 0.1
+            X = rng.normal(size=(N, 4))
+            X[:, 0] = np.where(rng.random(N) < 0.7, np.pi, 0.0)
+            X[:, 1] = 0.0
+            U = rng.normal(size=(N, 2))
+            self.check_streaming(T, X, U, rng.integers(1, 4))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            T, X, U = self.load(self.traj_paths[0])
+            csv_path = os.path.join(tmp_dir, "trajectory.csv")
+            save_trajectory(csv_path, T=T, X=X, X_meas=X, U=U, U_con=U)
+            chunks = list(stream_trajectory(csv_path, chunksize=1000))
+            self.assertTrue(len(chunks) == int(np.ceil(len(T) / 1000)))
+            self.assertTrue(np.allclose(np.concatenate([c[1] for c in chunks]), X))
+            self.assertTrue(np.allclose(np.concatenate([c[2] for c in chunks]), U))
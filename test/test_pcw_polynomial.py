@@ -0,0 +1,97 @@
+"""
+Unit Tests
+==========
+"""
+
+import unittest
+import numpy as np
+from scipy.optimize import curve_fit
+
+
+from double_pendulum.utils.pcw_polynomial import (
+    FitPiecewisePolynomial,
+    InterpolateVector,
+    InterpolateMatrix,
+    fit_polynomials,
+    poly1,
+    poly2,
+    poly3,
+)
+
+
+def reference_value(pol, value):
+    # section lookup of the original implementation
+    poly_index = min(
+        [
+            index
+            for index, element in enumerate(
+                [any(poly >= value) for poly in pol.x_sec_data]
+            )
+            if element
+        ]
+    )
+    return poly3(value, *pol.coeff_sec_data[poly_index])
+
+
+class Test(unittest.TestCase):
+    N = 500
+    T = np.linspace(0.0, 5.0, N)
+    rng = np.random.default_rng(0)
+    X = np.array([np.sin(T), np.cos(2 * T), T**2, np.zeros(N)]).T
+    K = rng.normal(size=(N, 2, 4)).cumsum(axis=0) * 0.01
+
+    def test_0_polynomial(self):
+        pol = FitPiecewisePolynomial(self.T, self.X[:, 0], 20, 3)
+        times = np.concatenate([self.T, self.rng.uniform(-0.1, 5.0, 100)])
+        for t in times:
+            self.assertTrue(np.isclose(pol.get_value(t), reference_value(pol, t)))
+        ref = np.array([reference_value(pol, t) for t in times])
+        self.assertTrue(np.allclose(pol.get_value(times), ref))
+        with self.assertRaises(ValueError):
+            pol.get_value(5.1)
+
+    def test_1_vector(self):
+        interp = InterpolateVector(self.T, self.X, num_break=40, poly_degree=3)
+        self.assertTrue(interp.X[3] is None)
+        # monotone (cursor), repeated and random query times
+        times = np.concatenate(
+            [
+                self.T,
+                self.T[::-7],
+                np.repeat(self.T[:10], 3),
+                self.rng.uniform(0, 5, 50),
+            ]
+        )
+        for t in times:
+            ref = [
+                0.0 if pol is None else reference_value(pol, t) for pol in interp.X
+            ]
+            self.assertTrue(np.allclose(interp.get_value(t), ref))
+        batch = interp.get_value(times)
+        self.assertTrue(np.shape(batch) == (len(times), 4))
+        for i, t in enumerate(times):
+            self.assertTrue(np.array_equal(batch[i], interp.get_value(t)))
+
+    def test_2_matrix(self):
+        interp = InterpolateMatrix(self.T, self.K, num_break=40, poly_degree=3)
+        times = self.rng.uniform(0, 5, 50)
+        for t in times:
+            ref = [[reference_value(pol, t) for pol in Xd1] for Xd1 in interp.X]
+            self.assertTrue(np.allclose(interp.get_value(t), ref))
+        self.assertTrue(np.shape(interp.get_value(times)) == (50, 2, 4))
+
+    def test_3_least_squares(self):
+        x = np.array_split(self.T, 40)
+        y = np.array_split(self.X[:, 2] + np.sin(5 * self.T), 40)
+        for degree, func in [(1, poly1), (2, poly2), (3, poly3)]:
+            coeffs = fit_polynomials(x, y, degree)
+            self.assertTrue(np.shape(coeffs) == (40, degree + 1))
+            for i in range(40):
+                vander = np.vander(x[i], degree + 1)
+                lstsq = np.linalg.lstsq(vander, y[i], rcond=None)[0]
+                self.assertTrue(np.allclose(coeffs[i], lstsq))
+                # as good as the iterative fit (up to rounding)
+                p_coeff, _ = curve_fit(func, x[i], y[i], maxfev=2000)
+                res = np.sum((vander @ coeffs[i] - y[i]) ** 2)
+                res_cf = np.sum((vander @ p_coeff - y[i]) ** 2)
+                self.assertTrue(res <= res_cf * (1.0 + 1e-4))
@@ -238,5 +238,27 @@ class Test(unittest.TestCase):
                     self.assertTrue(np.shape(B) == (4,2))
                     self.assertTrue(not None in B)
 
+    def test_18_forward_dynamics_vectorized(self):
+
+        X = np.array(self.states, dtype=float)
+        for p in self.plants:
+            for u in self.actions:
+                U = np.tile(u, (len(X), 1))
+                accn = p.forward_dynamics(X, U)
+                self.assertTrue(np.shape(accn) == (len(X), 2))
+                res = p.rhs(0., X, U)
+                self.assertTrue(np.shape(res) == (len(X), 4))
+                for i, x in enumerate(X):
+                    M = p.mass_matrix(x)
+                    C = p.coriolis_matrix(x)
+                    G = p.gravity_vector(x)
+                    F = p.coulomb_vector(x)
+                    ref = np.linalg.inv(M).dot(
+                        G + p.B.dot(u) - C.dot(x[2:]) - F)
+                    tol = 1e-12*np.maximum(1., np.abs(ref))
+                    self.assertTrue(np.all(np.abs(accn[i] - ref) <= tol))
+                    self.assertTrue(np.all(np.abs(res[i, 2:] - ref) <= tol))
+                    self.assertTrue(np.all(res[i, :2] == x[2:]))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,136 @@
+"""
+Unit Tests
+==========
+"""
+
+import unittest
+import numpy as np
+
+
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.simulation.simulation import Simulator
+from double_pendulum.simulation.batch_simulation import BatchSimulator
+from double_pendulum.controller.lqr.lqr_controller import LQRController
+from double_pendulum.controller.lqr.roa.ellipsoid import (
+    directSphereBatch,
+    quadForm,
+    volEllipsoid,
+    sampleFromEllipsoid,
+    sampleFromEllipsoidBatch,
+)
+from double_pendulum.controller.lqr.roa.prob_roa import (
+    compute_roa_prob,
+    compute_roa_prob_batch,
+    check_x0,
+    check_x0_batch,
+)
+
+
+class Test(unittest.TestCase):
+    mpar = model_parameters()
+    mpar.set_torque_limit([0.0, 5.0])
+    plant = DoublePendulumPlant(model_pars=mpar)
+    controller = LQRController(model_pars=mpar)
+    controller.set_goal([np.pi, 0.0, 0.0, 0.0])
+    controller.set_cost_matrices(
+        np.diag([0.97, 0.93, 0.39, 0.26]), np.diag([0.11, 0.11])
+    )
+    controller.set_parameters(failure_value=0.0, cost_to_go_cut=15.0)
+    controller.init()
+    S = np.asarray(controller.S)
+
+    def test_0_ellipsoid_sampling(self):
+        rng = np.random.default_rng(0)
+        x = sampleFromEllipsoidBatch(self.S, 2.0, 5000, rInner=0.5, rng=rng)
+        self.assertTrue(np.shape(x) == (5000, 4))
+        V = np.einsum("ij,jk,ik->i", x, self.S, x)
+        self.assertTrue(np.all(V < 2.0 + 1e-9))
+        self.assertTrue(np.all(V > 0.5 * 2.0 - 1e-9))
+
+        # single samples use the random numbers like the scalar version
+        rng1 = np.random.default_rng(1)
+        rng2 = np.random.default_rng(1)
+        for _ in range(3):
+            x = sampleFromEllipsoidBatch(self.S, 2.0, 1, rng=rng1)
+            y = sampleFromEllipsoid(self.S, 2.0, rng=rng2)
+            self.assertTrue(np.allclose(x[0], y))
+            self.assertTrue(np.isclose(quadForm(self.S, x[0]), quadForm(self.S, y)))
+
+    def test_1_prob_roa_batch(self):
+        simulator = Simulator(self.plant)
+        batch_simulator = BatchSimulator(self.plant)
+        goal = np.array([np.pi, 0.0, 0.0, 0.0])
+        X0 = goal + sampleFromEllipsoidBatch(
+            self.S, 1e-4, 20, rng=np.random.default_rng(0)
+        )
+        valid = check_x0_batch(batch_simulator, self.controller, X0, 0.01, 0.5)
+        self.assertTrue(np.any(valid) and not np.all(valid))
+        for x0, v in zip(X0, valid):
+            self.assertTrue(check_x0(simulator, self.controller, x0, 0.01, 0.5) == v)
+
+        # one state per round reproduces the sequential estimation
+        rng = np.random.default_rng(1)
+        vol = compute_roa_prob(simulator, self.controller, 0.01, 0.5, n_iter=30, rng=rng)
+        rng = np.random.default_rng(1)
+        vol_1, rho_hist = compute_roa_prob_batch(
+            batch_simulator, self.controller, 0.01, 0.5, n_iter=30, batch_size=1, rng=rng
+        )
+        self.assertTrue(np.isclose(vol, vol_1))
+        self.assertTrue(len(rho_hist) == 31)
+        self.assertTrue(np.all(np.diff(rho_hist) <= 0.0))
+
+        rng = np.random.default_rng(2)
+        _, rho_hist = compute_roa_prob_batch(
+            simulator, self.controller, 0.01, 0.5, n_iter=300, batch_size=100, rng=rng
+        )
+        self.assertTrue(len(rho_hist) == 4)
+        self.assertTrue(np.all(np.diff(rho_hist) <= 0.0))
+        self.assertTrue(rho_hist[-1] < rho_hist[0])
+
+        # the noise settings of a Simulator are used for the batched rollouts
+        simulator.set_process_noise([0.0, 0.0, 0.5, 0.5])
+        simulator.set_motor_parameters(u_noise_sigmas=[0.0, 0.5])
+        simulator.set_random_generator(np.random.default_rng(3))
+        batch_simulator.set_process_noise([0.0, 0.0, 0.5, 0.5])
+        batch_simulator.set_motor_parameters(u_noise_sigmas=[0.0, 0.5])
+        batch_simulator.set_random_generator(np.random.default_rng(3))
+        noise_state = simulator.rng.bit_generator.state
+        rho_hists = []
+        for sim in [simulator, batch_simulator]:
+            _, rho_hist = compute_roa_prob_batch(
+                sim,
+                self.controller,
+                0.01,
+                0.5,
+                n_iter=200,
+                batch_size=100,
+                rng=np.random.default_rng(2),
+            )
+            rho_hists.append(rho_hist)
+        self.assertTrue(np.allclose(rho_hists[0], rho_hists[1]))
+        self.assertTrue(simulator.rng.bit_generator.state != noise_state)
+        self.assertTrue(
+            simulator.rng.bit_generator.state == batch_simulator.rng.bit_generator.state
+        )
+
+    def test_2_stacked_ellipsoid_functions(self):
+        rng = np.random.default_rng(4)
+        x = directSphereBatch(4, 1000, r_i=0.2, r_o=1.0, rng=rng)
+        r = np.linalg.norm(x, axis=1)
+        self.assertTrue(np.all(r <= 1.0) and np.all(r >= 0.2 ** (1 / 4)))
+
+        V = quadForm(self.S, x)
+        self.assertTrue(V.shape == (1000,))
+        self.assertTrue(np.allclose(V, [quadForm(self.S, xi) for xi in x]))
+        M = np.stack([self.S, 2.0 * self.S])
+        self.assertTrue(np.allclose(quadForm(M, x[:2]), [V[0], 2.0 * V[1]]))
+
+        # volume of the unit ball in 4 dimensions
+        self.assertTrue(np.isclose(volEllipsoid(1.0, np.eye(4)), np.pi**2 / 2))
+        rho = np.array([0.5, 1.0, 2.0])
+        vols = volEllipsoid(rho, self.S)
+        self.assertTrue(vols.shape == (3,))
+        self.assertTrue(np.allclose(vols, [volEllipsoid(r, self.S) for r in rho]))
+        self.assertTrue(np.allclose(vols[1:] / vols[:-1], 4.0))
+        self.assertTrue(np.isclose(volEllipsoid(1.0, M)[1], vols[1] / 4.0))
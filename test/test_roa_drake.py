@@ -0,0 +1,146 @@
+"""
+Unit Tests
+==========
+"""
+
+import unittest
+import numpy as np
+
+
+from double_pendulum.model.plant import DoublePendulumPlant
+from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.controller.lqr.lqr_controller import LQRController
+from double_pendulum.controller.lqr.roa.coopt_interface import najafi, najafi_batch
+from double_pendulum.controller.lqr.roa.check import lqr_check_ctg
+from double_pendulum.controller.lqr.roa.ellipsoid import sampleFromEllipsoidBatch
+from double_pendulum.controller.lqr.roa.roa_estimation import (
+    probTIROA,
+    SosRoaVerifier,
+    verify_double_pendulum_rho,
+    bisect_and_verify,
+)
+from double_pendulum.controller.lqr.roa.roa_grid_map import roa_grid_map
+
+
+class Test(unittest.TestCase):
+    mpar = model_parameters()
+    mpar.set_torque_limit([0.0, 5.0])
+    plant = DoublePendulumPlant(model_pars=mpar)
+    controller = LQRController(model_pars=mpar)
+    controller.set_goal([np.pi, 0.0, 0.0, 0.0])
+    controller.set_cost_matrices(
+        np.diag([0.97, 0.93, 0.39, 0.26]), np.diag([0.11, 0.11])
+    )
+    controller.init()
+    S = np.asarray(controller.S)
+
+    def test_0_najafi_batch(self):
+        n = 2000
+        rng = np.random.default_rng(2)
+        rho = najafi(self.plant, self.controller, self.S, n, rng=rng)
+        rng = np.random.default_rng(2)
+        rho_1 = najafi_batch(
+            self.plant, self.controller, self.S, n, block_size=1, rng=rng
+        )
+        self.assertTrue(np.isclose(rho, rho_1))
+
+        # the block wise sampling follows the same distribution of rho
+        rho_seq = [
+            najafi(self.plant, self.controller, self.S, n, rng=np.random.default_rng(s))
+            for s in range(8)
+        ]
+        rho_block = [
+            najafi_batch(
+                self.plant,
+                self.controller,
+                self.S,
+                n,
+                block_size=100,
+                rng=np.random.default_rng(100 + s),
+            )
+            for s in range(8)
+        ]
+        self.assertTrue(np.isclose(np.mean(rho_block), np.mean(rho_seq), rtol=0.2))
+        self.assertTrue(1 / 3 < np.std(rho_block) / np.std(rho_seq) < 3)
+
+    def test_1_sos_verifier(self):
+        params = {
+            "I": self.mpar.I,
+            "m": self.mpar.m,
+            "l": self.mpar.l,
+            "lc": self.mpar.r,
+            "b": self.mpar.b,
+            "fc": self.mpar.cf,
+            "g": self.mpar.g,
+            "tau_max": self.mpar.tl,
+        }
+        K = np.asarray(self.controller.K)
+        hyper_params = {"taylor_deg": 3, "lambda_deg": 2, "mode": 2}
+        verifier = SosRoaVerifier(params, self.S, K, "acrobot", 3, 2, 2)
+        for rho in [0.01, 1.0, 5.0]:
+            self.assertTrue(
+                verifier.verify(rho)
+                == verify_double_pendulum_rho(
+                    rho, params, self.S, K, "acrobot", 3, 2, 2
+                )
+            )
+        rho = bisect_and_verify(params, self.S, K, "acrobot", hyper_params, maxiter=8)
+        self.assertTrue(
+            verify_double_pendulum_rho(rho, params, self.S, K, "acrobot", 3, 2, 2)
+        )
+
+    def test_2_roa_grid_map(self):
+        design_params = {
+            "m": [0.6, 0.6],
+            "l": [0.3, 0.2],
+            "lc": [0.3, 0.2],
+            "b": [0.0, 0.0],
+            "fc": [0.0, 0.0],
+            "g": 9.81,
+            "I": [0.6 * 0.3**2, 0.6 * 0.2**2],
+            "tau_max": [0.0, 6.0],
+        }
+        grid = {"l1": np.linspace(0.2, 0.4, 3), "l2": np.linspace(0.2, 0.4, 3)}
+        vols, computed = roa_grid_map(
+            grid, design_params, np.eye(4), np.eye(2), backend="sos", n_workers=2
+        )
+        self.assertTrue(vols.shape == (3, 3))
+        self.assertTrue(np.all(computed))
+        self.assertTrue(np.all(vols >= 0.0))
+
+    def test_3_prob_tiroa_batch(self):
+        check = lqr_check_ctg(self.plant, self.controller, tf=1.0)
+        goal = np.array([np.pi, 0.0, 0.0, 0.0])
+        X0 = goal + sampleFromEllipsoidBatch(
+            self.S, 5e-5, 20, rng=np.random.default_rng(0)
+        )
+        success = check.sim_callback_batch(X0)
+        self.assertTrue(np.any(success) and not np.all(success))
+        self.assertTrue(list(success) == [check.sim_callback(x0) for x0 in X0])
+
+        conf = {
+            "x0Star": goal,
+            "S": self.S,
+            "xBar0Max": np.array([0.5, 0.0, 0.0, 0.0]),
+            "nSimulations": 250,
+        }
+        rho_serial = []
+        rho_batch = []
+        for seed in range(4):
+            estimator = probTIROA(
+                conf, check.sim_callback, rng=np.random.default_rng(seed)
+            )
+            rho_hist, _ = estimator.doEstimate()
+            rho_serial.append(rho_hist[-1])
+
+            estimator = probTIROA(
+                conf,
+                check.sim_callback,
+                rng=np.random.default_rng(seed),
+                batchSimFct=check.sim_callback_batch,
+            )
+            rho_hist, success_hist = estimator.doEstimate(batchSize=10)
+            self.assertTrue(len(rho_hist) == 251 and len(success_hist) == 250)
+            self.assertTrue(np.all(np.diff(rho_hist) <= 0.0))
+            rho_batch.append(rho_hist[-1])
+        self.assertTrue(np.isclose(np.mean(rho_batch), np.mean(rho_serial), rtol=0.25))
@@ -9,6 +9,11 @@ import numpy as np
 
 from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
 from double_pendulum.simulation.simulation import Simulator
+from double_pendulum.simulation.termination import (
+    LeftEpsilonTube,
+    VelocityLimit,
+    GoalDwell,
+)
 
 
 class Test(unittest.TestCase):
@@ -152,3 +157,92 @@ class Test(unittest.TestCase):
                                 self.assertTrue(np.shape(T) in [(N,), (N + 1,)])
                                 self.assertTrue(np.shape(X) in [(N, 4), (N + 1, 4)])
                                 self.assertTrue(np.shape(U) in [(N - 1, 2), (N, 2)])
+
+    def test_7_recording_modes(self):
+        sim = Simulator(self.plant)
+        x0 = [0.1, -0.2, 0.5, 0.0]
+        sim.set_measurement_parameters(delay=0.05, delay_mode="posvel")
+        T, X, U = sim.simulate(0.0, x0, 2.0, 0.01)
+        X_meas = np.copy(sim.meas_x_values)
+
+        sim.set_data_recording("ring", ring_size=50)
+        T2, X2, U2 = sim.simulate(0.0, x0, 2.0, 0.01)
+        self.assertTrue(np.shape(T2) == (50,))
+        self.assertTrue(np.shape(X2) == (50, 4))
+        self.assertTrue(np.allclose(T2, T[-50:]))
+        self.assertTrue(np.allclose(X2, X[-50:]))
+        self.assertTrue(np.allclose(U2, U[-50:]))
+        self.assertTrue(np.allclose(sim.meas_x_values, X_meas[-50:]))
+
+        sim.set_data_recording("none")
+        T3, X3, U3 = sim.simulate(0.0, x0, 2.0, 0.01)
+        self.assertTrue(len(T3) < 10)
+        self.assertTrue(np.allclose(X3[-1], X[-1]))
+        self.assertTrue(np.allclose(sim.meas_x_values[-1], X_meas[-1]))
+
+        # data of earlier simulations is not overwritten
+        sim.set_data_recording("full")
+        T4, X4, U4 = sim.simulate(0.0, [0.0, 0.0, 0.0, 0.0], 1.0, 0.01)
+        self.assertTrue(np.shape(X) == (len(T), 4))
+        self.assertTrue(np.allclose(X[0], x0))
+
+    def test_8_termination(self):
+        sim = Simulator(self.plant)
+        goal = [0.0, 0.0, 0.0, 0.0]
+        eps = [0.2, 0.2, 1.0, 1.0]
+
+        T, X, U = sim.simulate(
+            0.0, goal, 5.0, 0.01, termination=[GoalDwell(goal, eps, 0.5)]
+        )
+        self.assertTrue(sim.stop_reason == "goal_reached")
+        self.assertTrue(sim.stop_success)
+        self.assertTrue(np.abs(T[-1] - 0.5) < 0.015)
+
+        T, X, U = sim.simulate(
+            0.0,
+            [np.pi / 2, 0.0, 0.0, 0.0],
+            5.0,
+            0.01,
+            termination=[
+                LeftEpsilonTube(goal, [2.0, 2.0, 3.0, 3.0]),
+                VelocityLimit(1.0),
+            ],
+        )
+        self.assertTrue(sim.stop_reason == "velocity_limit")
+        self.assertFalse(sim.stop_success)
+        self.assertTrue(T[-1] < 1.0)
+        self.assertTrue(np.max(np.abs(X[-1, 2:])) > 1.0)
+        self.assertTrue(np.max(np.abs(X[-2, 2:])) <= 1.0)
+
+        T, X, U = sim.simulate(
+            0.0,
+            [1.0, 0.0, 0.0, 0.0],
+            5.0,
+            0.01,
+            termination=[LeftEpsilonTube(goal, eps)],
+        )
+        self.assertTrue(sim.stop_reason == "left_tube")
+        self.assertTrue(len(T) == 1)
+
+        T, X, U = sim.simulate(0.0, goal, 1.0, 0.01, termination=[VelocityLimit(10.0)])
+        self.assertTrue(sim.stop_reason is None)
+
+    def test_9_random_generator(self):
+        sim = Simulator(self.plant)
+        sim.set_process_noise([0.001, 0.001, 0.01, 0.01])
+        sim.set_measurement_parameters(meas_noise_sigmas=[0.0, 0.0, 0.1, 0.1])
+        sim.set_motor_parameters(u_noise_sigmas=[0.1, 0.1])
+        x0 = [0.1, -0.2, 0.5, 0.0]
+
+        sim.set_random_generator(np.random.default_rng(3))
+        T1, X1, U1 = sim.simulate(0.0, x0, 1.0, 0.01)
+        X1 = np.copy(X1)
+        np.random.seed(0)
+        sim.set_random_generator(np.random.default_rng(3))
+        T2, X2, U2 = sim.simulate(0.0, x0, 1.0, 0.01)
+        sim.set_random_generator(np.random.default_rng(4))
+        T3, X3, U3 = sim.simulate(0.0, x0, 1.0, 0.01)
+        sim.set_random_generator(None)
+
+        self.assertTrue(np.array_equal(X1, X2))
+        self.assertFalse(np.array_equal(X1, X3))
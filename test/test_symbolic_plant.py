@@ -7,8 +7,9 @@ import unittest
 import numpy as np
 
 
-from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum
+from double_pendulum.model.symbolic_plant import SymbolicDoublePendulum, get_plant_template
 from double_pendulum.model.model_parameters import model_parameters
+from double_pendulum.model import symbolic_cache
 
 
 class Test(unittest.TestCase):
@@ -242,5 +243,77 @@ class Test(unittest.TestCase):
                     diff = np.max(np.abs(tau - u))
                     self.assertTrue(diff < epsilon)
 
+    def test_18_cache(self):
+
+        p_ref = self.plants[0]
+        pars = dict(mass=p_ref.m, length=p_ref.l, com=p_ref.com,
+                    damping=p_ref.b, gravity=p_ref.g,
+                    coulomb_fric=p_ref.coulomb_fric, inertia=p_ref.I,
+                    motor_inertia=p_ref.Ir, gear_ratio=p_ref.gr,
+                    torque_limit=p_ref.torque_limit)
+        p_nocache = SymbolicDoublePendulum(use_cache=False, **pars)
+        # first construction fills the cache, second one loads from it
+        SymbolicDoublePendulum(use_cache=True, **pars)
+        p_cached = SymbolicDoublePendulum(use_cache=True, **pars)
+        self.assertTrue(p_cached.f == p_nocache.f)
+        for x in self.states:
+            self.assertTrue(np.allclose(p_cached.mass_matrix(x),
+                                        p_nocache.mass_matrix(x)))
+            self.assertTrue(np.allclose(p_cached.total_energy(x),
+                                        p_nocache.total_energy(x)))
+            for u in self.actions:
+                self.assertTrue(np.allclose(p_cached.rhs(0., x, u),
+                                            p_nocache.rhs(0., x, u)))
+                A1, B1 = p_cached.linear_matrices(x, u)
+                A2, B2 = p_nocache.linear_matrices(x, u)
+                self.assertTrue(np.allclose(A1, A2))
+                self.assertTrue(np.allclose(B1, B2))
+
+        # the cache is not used by another version of the source code
+        keys = [symbolic_cache.derivation_key(p_ref),
+                symbolic_cache.lambdify_key(p_ref),
+                symbolic_cache.template_key(get_plant_template(p_ref.torque_limit))]
+        source_hash = symbolic_cache.source_hash()
+        try:
+            symbolic_cache._source_hash = "edited"
+            new_keys = [symbolic_cache.derivation_key(p_ref),
+                        symbolic_cache.lambdify_key(p_ref),
+                        symbolic_cache.template_key(
+                            get_plant_template(p_ref.torque_limit))]
+        finally:
+            symbolic_cache._source_hash = source_hash
+        for key, new_key in zip(keys, new_keys):
+            self.assertTrue(key != new_key)
+
+    def test_19_template(self):
+
+        for p_ref in self.plants:
+            template = get_plant_template(p_ref.torque_limit)
+            p = template.plant(mass=p_ref.m, length=p_ref.l, com=p_ref.com,
+                               damping=p_ref.b, gravity=p_ref.g,
+                               coulomb_fric=p_ref.coulomb_fric,
+                               inertia=p_ref.I, motor_inertia=p_ref.Ir,
+                               gear_ratio=p_ref.gr,
+                               torque_limit=p_ref.torque_limit)
+            self.assertTrue(get_plant_template(p_ref.torque_limit) is template)
+            for x in self.states:
+                self.assertTrue(np.allclose(p.mass_matrix(x),
+                                            p_ref.mass_matrix(x)))
+                self.assertTrue(np.allclose(p.coriolis_matrix(x),
+                                            p_ref.coriolis_matrix(x)))
+                self.assertTrue(np.allclose(p.gravity_vector(x),
+                                            p_ref.gravity_vector(x)))
+                self.assertTrue(np.allclose(p.coulomb_vector(x),
+                                            p_ref.coulomb_vector(x)))
+                self.assertTrue(np.allclose(p.total_energy(x),
+                                            p_ref.total_energy(x)))
+                for u in self.actions:
+                    self.assertTrue(np.allclose(p.rhs(0., x, u),
+                                                p_ref.rhs(0., x, u)))
+                    A1, B1 = p.linear_matrices(x, u)
+                    A2, B2 = p_ref.linear_matrices(x, u)
+                    self.assertTrue(np.allclose(A1, A2))
+                    self.assertTrue(np.allclose(B1, B2))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,87 @@
+"""
+Unit Tests
+==========
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+
+from double_pendulum.utils.csv_trajectory import (
+    save_trajectory,
+    load_trajectory_full,
+    convert_to_binary,
+)
+from double_pendulum.utils.trajectory import Trajectory, load_npz_memmap
+
+
+class Test(unittest.TestCase):
+    N = 101
+    rng = np.random.default_rng(0)
+    channels = {
+        "T": np.linspace(0.0, 1.0, N),
+        "X": rng.normal(size=(N, 4)),
+        "U": rng.normal(size=(N, 2)),
+        "X_meas": rng.normal(size=(N, 4)),
+        "U_con": rng.normal(size=(N, 2)),
+        "K": rng.normal(size=(N, 4, 2)),
+        "k": rng.normal(size=(N, 2)),
+    }
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "trajectory.csv")
+        save_trajectory(self.csv_path, **self.channels)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def check_channels(self, traj):
+        traj_full = load_trajectory_full(self.csv_path)
+        for name, value in traj_full.items():
+            if value is None:
+                self.assertTrue(traj[name] is None)
+                self.assertFalse(name in traj)
+            else:
+                self.assertTrue(np.array_equal(traj[name], value))
+        self.assertTrue(np.array_equal(traj.X_meas, traj_full["X_meas"]))
+        self.assertTrue(len(traj) == self.N)
+
+    def test_0_csv(self):
+        traj = Trajectory(self.csv_path)
+        self.assertTrue(traj.channels == ["T", "X", "U", "X_meas", "U_con", "K", "k"])
+        self.check_channels(traj)
+
+    def test_1_memory_map(self):
+        npz_path = convert_to_binary(self.csv_path)
+        self.assertTrue(isinstance(load_npz_memmap(npz_path, "X"), np.memmap))
+
+        traj = Trajectory(self.csv_path)
+        self.assertTrue(traj._source.path == npz_path)
+        self.assertTrue(len(traj._cache) == 0)
+        self.check_channels(traj)
+        self.assertTrue(len(traj._cache) == len(traj.channels))
+        self.assertFalse(traj.X.flags.writeable)
+
+    def test_2_window(self):
+        convert_to_binary(self.csv_path)
+        traj = Trajectory(self.csv_path)
+        window = traj.window(0.2, 0.5)
+        self.assertTrue(np.shares_memory(window.X, traj.X))
+        self.assertTrue(np.allclose(window.T, self.channels["T"][20:51]))
+        self.assertTrue(np.array_equal(window.K, traj.K[20:51]))
+
+        window2 = window.window(0.3)
+        self.assertTrue(np.array_equal(window2.T, traj.T[30:51]))
+        self.assertTrue(len(traj.window(0.5, 0.2)) == 0)
+
+    def test_3_resample(self):
+        T = np.linspace(0.0, 1.0, 11)
+        X = np.array([T, 2 * T, 3 * T, 4 * T]).T
+        traj = Trajectory.from_arrays(T=T, X=X)
+        resampled = traj.resample(0.025)
+        self.assertTrue(len(resampled) == 41)
+        self.assertTrue(np.allclose(resampled.X, np.outer(resampled.T, [1, 2, 3, 4])))
+        self.assertTrue(resampled.U is None)
@@ -0,0 +1,56 @@
+"""
+Unit Tests
+==========
+"""
+
+import unittest
+import numpy as np
+
+
+from double_pendulum.utils.wrap_angles import (
+    wrap_angles,
+    wrap_angles_top,
+    wrap_angles_diff,
+)
+
+
+class Test(unittest.TestCase):
+    rng = np.random.default_rng(0)
+    X = rng.normal(scale=20.0, size=(1000, 4))
+    X[:50, :2] = np.pi * rng.integers(-5, 5, size=(50, 2))
+
+    def check_batch(self, func):
+        Y = func(self.X)
+        self.assertTrue(np.shape(Y) == np.shape(self.X))
+        self.assertTrue(np.array_equal(Y[:, 2:], self.X[:, 2:]))
+        for x, y in zip(self.X, Y):
+            self.assertTrue(np.array_equal(func(x), y))
+        stacked = func(self.X.reshape(10, 100, 4))
+        self.assertTrue(np.array_equal(stacked.reshape(-1, 4), Y))
+
+        # output buffer, in place
+        out = np.empty_like(self.X)
+        self.assertTrue(func(self.X, out=out) is out)
+        self.assertTrue(np.array_equal(out, Y))
+        X = np.copy(self.X)
+        func(X, out=X)
+        self.assertTrue(np.array_equal(X, Y))
+        return Y
+
+    def test_0_wrap_angles(self):
+        Y = self.check_batch(wrap_angles)
+        self.assertTrue(np.all(Y[:, :2] >= 0.0) and np.all(Y[:, :2] < 2 * np.pi))
+
+    def test_1_wrap_angles_top(self):
+        Y = self.check_batch(wrap_angles_top)
+        self.assertTrue(np.all(Y[:, 0] >= 0.0) and np.all(Y[:, 0] < 2 * np.pi))
+        self.assertTrue(np.all(Y[:, 1] >= -np.pi) and np.all(Y[:, 1] < np.pi))
+
+    def test_2_wrap_angles_diff(self):
+        Y = self.check_batch(wrap_angles_diff)
+        self.assertTrue(np.all(np.abs(Y[:, :2]) <= np.pi))
+        self.assertTrue(np.allclose(np.sin(Y[:, :2]), np.sin(self.X[:, :2])))
+        self.assertTrue(np.allclose(np.cos(Y[:, :2]), np.cos(self.X[:, :2])))
+        self.assertTrue(
+            np.array_equal(wrap_angles_diff([np.pi, -np.pi, 0, 0]), [np.pi, np.pi, 0, 0])
+        )